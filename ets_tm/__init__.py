@@ -9,7 +9,16 @@ from .app_io import (
     ensure_log_header as ensure_log_header,
     append_log_line as append_log_line,
 )
-from .ui import build_table as build_table
+from .results import ResultStore as ResultStore
+from .sorting import SortIndex as SortIndex
 from .domain import Server as Server, Settings as Settings, Stats as Stats, StatsEntry as StatsEntry
 from .repo import FileRepository as FileRepository
-from .services import MonitoringService as MonitoringService
\ No newline at end of file
+from .services import MonitoringService as MonitoringService
+
+
+def __getattr__(name: str):
+    # Rich is only needed for rendering; the headless daemon never loads it.
+    if name == "build_table":
+        from .ui import build_table
+        return build_table
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
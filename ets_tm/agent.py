@@ -0,0 +1,220 @@
+import gzip
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import codec
+from .remote import RemoteClient
+
+AGENT_BATCH_SIZE = 500
+# Oldest spooled batches are dropped beyond this many while the central
+# node is unreachable.
+SPOOL_MAX_BATCHES = 1000
+INGEST_PATH = "/ingest"
+# After a failed send the sender thread waits this long before the next
+# attempt, doubling up to SHIP_BACKOFF_MAX while the failures continue.
+SHIP_BACKOFF_MIN = 1.0
+SHIP_BACKOFF_MAX = 60.0
+# Decompressed size limit for one batch on the ingest side.
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_log = logging.getLogger(__name__)
+
+
+def valid_id(value: str) -> bool:
+    return bool(_ID_RE.match(value or ""))
+
+
+def encode_batch(records: List[Dict[str, Any]]) -> bytes:
+    # Gzipped NDJSON, one result per line.
+    return gzip.compress(b"".join(codec.dumps_bytes(r) + b"\n" for r in records))
+
+
+def decode_batch(body: bytes, max_bytes: int = MAX_BATCH_BYTES) -> List[Dict[str, Any]]:
+    if body[:2] == b"\x1f\x8b":
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = d.decompress(body, max_bytes)
+        if d.unconsumed_tail:
+            raise ValueError("batch too large")
+    elif len(body) > max_bytes:
+        raise ValueError("batch too large")
+    return [codec.loads(line) for line in body.splitlines() if line.strip()]
+
+
+def parse_record(rec: Any) -> Optional[Tuple[str, float, bool, Optional[float]]]:
+    # -> (server key, ts, up, rtt); None for malformed records.
+    try:
+        key = rec["key"]
+        if not isinstance(key, str) or not key:
+            return None
+        rtt = rec.get("rtt")
+        return (key, float(rec["ts"]), bool(rec["up"]), None if rtt is None else float(rtt))
+    except Exception:
+        return None
+
+
+class AgentShipper:
+    # Collects BackgroundMonitor results and ships them to a central API.
+    # Every batch is written to the spool before it is sent and removed only
+    # once accepted, so nothing is lost while the central node is down; the
+    # batch id travels with it and makes resends idempotent. ship() hands the
+    # work to a sender thread, so the probe cycle never waits on the network.
+    def __init__(
+        self,
+        url: str,
+        agent_id: str,
+        spool_dir: str,
+        timeout: float = 5.0,
+        batch_size: int = AGENT_BATCH_SIZE,
+        max_batches: int = SPOOL_MAX_BATCHES,
+    ) -> None:
+        if not valid_id(agent_id):
+            raise ValueError(f"invalid agent id: {agent_id!r}")
+        self.agent_id = agent_id
+        self.spool_dir = spool_dir
+        self.batch_size = max(1, int(batch_size))
+        self.max_batches = max(1, int(max_batches))
+        # The client itself does not back off; the sender thread does.
+        self.client = RemoteClient(url.rstrip("/"), timeout=timeout, pool_size=1, backoff=0.0)
+        self.sent_batches = 0
+        self.last_error: Optional[str] = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._last_ns = 0
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._closing = False
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def record(self, key: str, srv: Dict[str, Any], rtt: Optional[float], is_up: bool, ts: Optional[float] = None) -> None:
+        entry = {
+            "key": key,
+            "name": srv.get("name", ""),
+            "group": srv.get("group"),
+            "ts": time.time() if ts is None else float(ts),
+            "up": bool(is_up),
+            "rtt": rtt,
+        }
+        with self._lock:
+            self._buffer.append(entry)
+
+    def _spool(self) -> None:
+        with self._lock:
+            buffered, self._buffer = self._buffer, []
+        for i in range(0, len(buffered), self.batch_size):
+            # Time-prefixed so a sorted listing is oldest first.
+            self._last_ns = max(time.time_ns(), self._last_ns + 1)
+            batch_id = f"{self._last_ns:020d}-{uuid.uuid4().hex[:12]}"
+            tmp = os.path.join(self.spool_dir, f".{batch_id}.tmp")
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(encode_batch(buffered[i:i + self.batch_size]))
+                os.replace(tmp, os.path.join(self.spool_dir, f"{batch_id}.ndjson.gz"))
+            except OSError as e:
+                # Keep the unwritten results for the next attempt, within the
+                # same bound as the spool itself.
+                with self._lock:
+                    self._buffer[:0] = buffered[i:]
+                    del self._buffer[:max(0, len(self._buffer) - self.max_batches * self.batch_size)]
+                self.last_error = f"spool: {e}"
+                _log.warning("agent spool write failed in %s: %s", self.spool_dir, e)
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                break
+        spooled = self.pending()
+        for name in spooled[:max(0, len(spooled) - self.max_batches)]:
+            try:
+                os.remove(os.path.join(self.spool_dir, name))
+            except OSError:
+                pass
+
+    def pending(self) -> List[str]:
+        try:
+            return sorted(n for n in os.listdir(self.spool_dir) if n.endswith(".ndjson.gz"))
+        except OSError:
+            return []
+
+    def flush(self) -> int:
+        # Spools buffered results, then sends spooled batches oldest first and
+        # stops at the first failure. Returns the number of batches accepted.
+        self._spool()
+        sent = 0
+        for name in self.pending():
+            path = os.path.join(self.spool_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+                status, _ = self.client.post(INGEST_PATH, body, {
+                    "Content-Type": "application/x-ndjson",
+                    "Content-Encoding": "gzip",
+                    "X-Agent-Id": self.agent_id,
+                    "X-Batch-Id": name[:-len(".ndjson.gz")],
+                })
+            except Exception as e:
+                self.last_error = str(e) or e.__class__.__name__
+                break
+            if status >= 500:
+                self.last_error = f"HTTP {status}"
+                break
+            # 4xx means the batch itself is bad; resending will not help.
+            os.remove(path)
+            if status < 300:
+                sent += 1
+            else:
+                self.last_error = f"HTTP {status}"
+        if sent:
+            self.last_error = None
+        self.sent_batches += sent
+        return sent
+
+    def ship(self) -> None:
+        # Called after every probe cycle: wakes the sender thread (started on
+        # first use), which spools the buffer and sends what it can.
+        if self._thread is None or not self._thread.is_alive():
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="ets-tm-agent", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closing:
+                return
+            try:
+                if time.monotonic() < self._retry_at:
+                    # Backing off: keep results on disk, send nothing yet.
+                    self._spool()
+                    continue
+                self.flush()
+                if self.pending():
+                    self._backoff = min(SHIP_BACKOFF_MAX, max(SHIP_BACKOFF_MIN, self._backoff * 2))
+                    self._retry_at = time.monotonic() + self._backoff
+                    _log.warning("agent shipping failed (%s); retrying in %.0fs", self.last_error, self._backoff)
+                else:
+                    self._backoff = 0.0
+            except Exception:
+                _log.exception("agent sender failed")
+
+    def close(self) -> None:
+        # Stops the sender and spools whatever is still buffered; ship()
+        # starts a new sender if the shipper is used again.
+        th = self._thread
+        if th is not None:
+            self._closing = True
+            self._wake.set()
+            th.join(self.client.timeout + 1.0)
+            self._thread = None
+        self._spool()
+        self.client.close()
@@ -1,13 +1,28 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
+import base64
+import hashlib
 from pathlib import Path
+import os
+from contextlib import asynccontextmanager
 import asyncio
-import json
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+import time
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from . import app_io, codec
+from .agent import decode_batch, parse_record, valid_id
+from .background import BackgroundMonitor, server_key
+from .domain import DEFAULT_SETTINGS
+from .events import EventLog
+from .history import HistoryStore, agent_log_row
+from .hub import BroadcastHub
+from .metrics import RttHistograms, render_prometheus
+from .sorting import SORT_KEYS
 from .repo import FileRepository
 from .services import MonitoringService
-from . import app_io
-from pydantic import BaseModel
+from .state import STATE_POLL_INTERVAL, StateService
+from pydantic import BaseModel, Field
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SERVERS_FILE = str(BASE_DIR / "servers.txt")
@@ -15,19 +30,18 @@ BACKUP_FILE = str(BASE_DIR / "servers.bak")
 STATS_FILE = str(BASE_DIR / "server_stats.json")
 SETTINGS_FILE = str(BASE_DIR / "config.json")
 LOG_FILE = str(BASE_DIR / "monitor.log")
-
-DEFAULTS = {
-    "refresh_interval": 2.0,
-    "ping_timeout": 1.5,
-    "port_timeout": 1.5,
-    "live_fullscreen": True,
-    "refresh_per_second": 4,
-    "prefer_system_ping": False,
-    "max_concurrent_checks": 20,
-    "page_size": 20,
-    "retry_attempts": 3,
-    "retry_base_delay": 0.2,
-}
+# Set to 1 to run the background monitor inside the API process.
+MONITOR_ENV = "ETS_TM_API_MONITOR"
+# Clients may keep responses but must revalidate them (cheap with ETags).
+CACHE_CONTROL = "no-cache"
+MAX_PAGE_LIMIT = 1000
+# Responses smaller than this are sent uncompressed.
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+MAX_CHECK_DEADLINE = 120.0
+DEFAULT_GROUP = "General"
+
+DEFAULTS: Dict[str, Any] = dict(DEFAULT_SETTINGS)
 
 class ServerModel(BaseModel):
     group: Optional[str] = None
@@ -35,6 +49,7 @@ class ServerModel(BaseModel):
     host: str
     service: str
     port: int
+    depends_on: Optional[str] = None
 
 
 class SettingsModel(BaseModel):
@@ -67,17 +82,81 @@ class ServerCheckResult(BaseModel):
     port_open: bool
 
 
+class ProbeResultModel(BaseModel):
+    key: str
+    status: str
+    rtt: Optional[float] = None
+    p95: Optional[float] = None
+    uptime: Optional[float] = None
+    checked_at: float
+    changed_at: float
+    breaker: Optional[str] = None
+
+
+class BatchOperation(BaseModel):
+    op: Literal["add", "update", "delete"]
+    index: Optional[int] = None
+    server: Optional[ServerModel] = None
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+
+class BatchResult(BaseModel):
+    added: int
+    updated: int
+    deleted: int
+    total: int
+
+
+class CheckBatchRequest(BaseModel):
+    servers: Optional[List[ServerModel]] = None
+    indices: Optional[List[int]] = None
+    deadline: float = 10.0
+
+
+class HistoryPoint(BaseModel):
+    t: float
+    up: int
+    down: int
+    uptime: Optional[float] = None
+    rtt_avg: Optional[float] = None
+    rtt_min: Optional[float] = None
+    rtt_max: Optional[float] = None
+
+
+class HistoryResponse(BaseModel):
+    from_: float = Field(alias="from")
+    to: float
+    step: float
+    resolution: int
+    servers: List[str]
+    points: List[HistoryPoint]
+
+
+class IngestResult(BaseModel):
+    agent: str
+    batch: str
+    accepted: int
+    rejected: int = 0
+    duplicate: bool = False
+
+
 class VersionInfo(BaseModel):
     app: str
     version: str
 
 
 def _validate_server(s: Dict[str, Any]) -> Dict[str, Any]:
-    return ServerModel(**s).dict()
+    out = ServerModel(**s).model_dump()
+    if out.get("depends_on") is None:
+        out.pop("depends_on", None)
+    return out
 
 
 def _validate_settings(s: Dict[str, Any]) -> Dict[str, Any]:
-    return SettingsModel(**s).dict()
+    return SettingsModel(**s).model_dump()
 
 
 repo = FileRepository(
@@ -89,100 +168,456 @@ repo = FileRepository(
     settings_validator=_validate_settings,
 )
 
-app = FastAPI(title="ETS Terminal Monitoring API", version="2.7.1")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+router = APIRouter()
 
 
-@app.get("/servers", response_model=List[ServerModel])
-def list_servers() -> List[Dict[str, Any]]:
-    return repo.get_servers()
+class FastJSONResponse(JSONResponse):
+    # orjson when installed, compact stdlib JSON otherwise.
+    def render(self, content: Any) -> bytes:
+        return codec.dumps_bytes(content)
 
 
-@app.post("/servers", response_model=ServerModel)
-def add_server(server: ServerModel) -> Dict[str, Any]:
-    servers = repo.get_servers()
-    servers.append(server.dict())
-    repo.save_servers(servers)
-    return server.dict()
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag == etag or (tag.startswith("W/") and tag[2:] == etag):
+            return True
+    return False
 
 
-@app.put("/servers/{index}", response_model=ServerModel)
-def update_server(index: int, server: ServerModel) -> Dict[str, Any]:
-    servers = repo.get_servers()
-    if index < 0 or index >= len(servers):
+def _send(request: Request, etag: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    out = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    out.update(headers or {})
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=out)
+    return Response(body, media_type="application/json", headers=out)
+
+
+def _conditional(request: Request, state: StateService, name: str) -> Response:
+    etag, body = state.encoded(name)
+    return _send(request, etag, body)
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return max(0, int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def get_state(request: Request) -> StateService:
+    return request.app.state.svc
+
+
+def get_prober(request: Request) -> BackgroundMonitor:
+    return request.app.state.prober
+
+
+def _make_prober(repository: FileRepository, log_path: str, state: StateService) -> BackgroundMonitor:
+    s = state.settings
+    return BackgroundMonitor(
+        repository,
+        MonitoringService(
+            float(s.get("ping_timeout", 1.5)),
+            float(s.get("port_timeout", 1.5)),
+            bool(s.get("prefer_system_ping", False)),
+        ),
+        log_path,
+        float(s.get("refresh_interval", 2.0)),
+        int(s.get("max_concurrent_checks", 20)),
+        int(s.get("retry_attempts", 3)),
+        float(s.get("retry_base_delay", 0.2)),
+        results=state.results,
+        servers_provider=lambda: state.servers,
+    )
+
+
+async def _history_loop(history: HistoryStore, log_path: str) -> None:
+    # Follows the CSV log incrementally; only appended rows are parsed.
+    while True:
+        await asyncio.sleep(STATE_POLL_INTERVAL)
+        try:
+            await asyncio.to_thread(history.tail_log, log_path)
+        except Exception:
+            pass
+
+
+def create_app(repository: FileRepository, log_path: str, embed_monitor: bool = False) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        history = HistoryStore()
+        state = StateService(repository, DEFAULTS, history)
+        await state.load()
+        app.state.svc = state
+        app.state.prober = _make_prober(repository, log_path, state)
+        app.state.hub = BroadcastHub(state)
+        app.state.rtt = RttHistograms()
+        app.state.history = history
+        # Rows ingested from agents are kept next to the probe log, so their
+        # history survives a restart like the local one.
+        app.state.agent_log = os.path.splitext(log_path)[0] + ".agents.log"
+        await asyncio.to_thread(history.load_agent_log, app.state.agent_log)
+        await asyncio.to_thread(history.load_log, log_path)
+        state.results.subscribe(app.state.rtt.observe)
+        app.state.events = EventLog(state)
+        app.state.events.attach(asyncio.get_running_loop())
+        tasks = [
+            asyncio.create_task(state.run_refresh()),
+            asyncio.create_task(app.state.hub.run()),
+            asyncio.create_task(_history_loop(app.state.history, log_path)),
+        ]
+        prober = app.state.prober
+        # The embedded monitor runs on the server loop with its own probe pool.
+        monitor = asyncio.create_task(prober.run(settings=lambda: state.settings)) if embed_monitor else None
+        try:
+            yield
+        finally:
+            if monitor is not None:
+                prober.request_stop()
+                await monitor
+            prober.close()
+            state.results.unsubscribe(app.state.rtt.observe)
+            app.state.events.detach()
+            for task in tasks:
+                task.cancel()
+            for task in tasks:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    application = FastAPI(
+        title="ETS Terminal Monitoring API",
+        version="2.7.1",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
+    application.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    application.include_router(router)
+    return application
+
+
+@router.get("/servers", response_model=List[ServerModel])
+async def list_servers(
+    request: Request,
+    group: Optional[str] = None,
+    service: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: Optional[str] = None,
+    desc: bool = False,
+    page: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    state: StateService = Depends(get_state),
+) -> Response:
+    if not any((group, service, q, sort, desc, page, cursor, limit)):
+        return _conditional(request, state, "servers")
+    if sort is not None and sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"unknown sort key; expected one of {', '.join(SORT_KEYS)}")
+    size = limit or int(state.settings.get("page_size", 20))
+    start = _decode_cursor(cursor) if cursor else ((page or 1) - 1) * size
+    items, total = state.query_servers(sort or "name", desc, start, start + size, DEFAULT_GROUP, group, q, service)
+    body = codec.dumps_bytes(items)
+    headers = {"X-Total-Count": str(total)}
+    if start + size < total:
+        headers["X-Next-Cursor"] = _encode_cursor(start + size)
+    return _send(request, f'"{hashlib.sha1(body).hexdigest()}-{total}"', body, headers)
+
+
+@router.post("/servers", response_model=ServerModel)
+async def add_server(server: ServerModel, state: StateService = Depends(get_state)) -> Dict[str, Any]:
+    return await state.add_server(server.model_dump())
+
+
+@router.post("/servers:batch", response_model=BatchResult)
+async def batch_servers(payload: BatchRequest, state: StateService = Depends(get_state)) -> Dict[str, int]:
+    ops: List[Dict[str, Any]] = []
+    for i, op in enumerate(payload.operations):
+        if op.op in ("add", "update") and op.server is None:
+            raise HTTPException(status_code=400, detail=f"operation {i}: server is required")
+        ops.append({"op": op.op, "index": op.index, "server": op.server.model_dump() if op.server else None})
+    try:
+        return await state.apply_batch(ops)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/servers/{index}", response_model=ServerModel)
+async def update_server(index: int, server: ServerModel, state: StateService = Depends(get_state)) -> Dict[str, Any]:
+    updated = await state.update_server(index, server.model_dump())
+    if updated is None:
         raise HTTPException(status_code=404, detail="not found")
-    servers[index] = server.dict()
-    repo.save_servers(servers)
-    return servers[index]
+    return updated
 
 
-@app.delete("/servers/{index}", response_model=ServerModel)
-def delete_server(index: int) -> Dict[str, Any]:
-    servers = repo.get_servers()
-    if index < 0 or index >= len(servers):
+@router.delete("/servers/{index}", response_model=ServerModel)
+async def delete_server(index: int, state: StateService = Depends(get_state)) -> Dict[str, Any]:
+    deleted = await state.delete_server(index)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="not found")
-    deleted = servers.pop(index)
-    repo.save_servers(servers)
     return deleted
 
 
-@app.get("/settings", response_model=SettingsModel)
-def get_settings() -> Dict[str, Any]:
-    return repo.get_settings(DEFAULTS)
+@router.get("/settings", response_model=SettingsModel)
+async def get_settings(request: Request, state: StateService = Depends(get_state)) -> Response:
+    return _conditional(request, state, "settings")
 
 
-@app.put("/settings", response_model=SettingsModel)
-def set_settings(payload: SettingsModel) -> Dict[str, Any]:
-    repo.save_settings(payload.dict())
-    return repo.get_settings(DEFAULTS)
+@router.put("/settings", response_model=SettingsModel)
+async def set_settings(payload: SettingsModel, state: StateService = Depends(get_state)) -> Dict[str, Any]:
+    return await state.save_settings(payload.model_dump())
 
 
-@app.get("/stats", response_model=Dict[str, StatsEntryModel])
-def get_stats() -> Dict[str, Dict[str, int]]:
-    return repo.get_stats()
+@router.get("/stats", response_model=Dict[str, StatsEntryModel])
+async def get_stats(request: Request, state: StateService = Depends(get_state)) -> Response:
+    return _conditional(request, state, "stats")
 
 
-@app.get("/logs/summary", response_model=Dict[str, LogBucket])
-def get_log_summary() -> Dict[str, Dict[str, Optional[float]]]:
-    return app_io.read_log_summary(LOG_FILE)
+@router.get("/logs/summary", response_model=Dict[str, LogBucket])
+async def get_log_summary(request: Request, state: StateService = Depends(get_state)) -> Response:
+    await state.refresh_summary()
+    return _conditional(request, state, "summary")
 
 
-@app.get("/servers/{index}/check", response_model=ServerCheckResult)
-def check_server(index: int) -> Dict[str, Any]:
-    servers = repo.get_servers()
+@router.get("/servers/{index}/check", response_model=ServerCheckResult)
+async def check_server(
+    index: int,
+    state: StateService = Depends(get_state),
+    prober: BackgroundMonitor = Depends(get_prober),
+) -> Dict[str, Any]:
+    servers = state.servers
     if index < 0 or index >= len(servers):
         raise HTTPException(status_code=404, detail="not found")
-    s = repo.get_settings(DEFAULTS)
-    svc = MonitoringService(
-        float(s.get("ping_timeout", 1.5)),
-        float(s.get("port_timeout", 1.5)),
-        bool(s.get("prefer_system_ping", False)),
+    prober.apply_settings(state.settings)
+    result = await prober.check(servers[index])
+    prober.publish(result, state.stats)
+    return {"rtt": result[1], "port_open": result[2]}
+
+
+@router.post("/check:batch")
+async def check_batch(
+    payload: CheckBatchRequest,
+    state: StateService = Depends(get_state),
+    prober: BackgroundMonitor = Depends(get_prober),
+) -> StreamingResponse:
+    # One NDJSON line per server as its probe finishes; anything still running
+    # at the deadline is reported with status TIMEOUT.
+    if payload.servers is not None:
+        servers = [s.model_dump() for s in payload.servers]
+    elif payload.indices is not None:
+        inventory = state.servers
+        if any(i < 0 or i >= len(inventory) for i in payload.indices):
+            raise HTTPException(status_code=404, detail="not found")
+        servers = [inventory[i] for i in payload.indices]
+    else:
+        servers = list(state.servers)
+    deadline = min(max(0.0, payload.deadline), MAX_CHECK_DEADLINE)
+    prober.apply_settings(state.settings)
+
+    async def _lines():
+        async for srv, rtt, port_ok in prober.iter_checks(servers, deadline):
+            status = "TIMEOUT" if port_ok is None else ("UP" if port_ok else "DOWN")
+            line = {"key": server_key(srv), "name": srv.get("name"), "rtt": rtt, "port_open": bool(port_ok), "status": status}
+            yield codec.dumps(line) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/results", response_model=Dict[str, ProbeResultModel])
+async def list_results(state: StateService = Depends(get_state)) -> Dict[str, Dict[str, Any]]:
+    return state.results.snapshot()
+
+
+@router.get("/results/{server_id}", response_model=ProbeResultModel)
+async def get_result(server_id: str, state: StateService = Depends(get_state)) -> Dict[str, Any]:
+    key = server_id
+    if server_id.isdigit():
+        index = int(server_id)
+        if index >= len(state.servers):
+            raise HTTPException(status_code=404, detail="not found")
+        key = server_key(state.servers[index])
+    entry = state.results.get(key)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="not found")
+    return entry
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    group: Optional[str] = None,
+    service: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    # Server-Sent Events: "result" for every probe, "transition" on status change.
+    log: EventLog = request.app.state.events
+    try:
+        last_id: Optional[int] = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    return StreamingResponse(
+        log.stream(last_id, group, service),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    rtt, is_open = svc.evaluate(servers[index])
-    return {"rtt": rtt, "port_open": is_open}
 
 
-@app.get("/version", response_model=VersionInfo)
-def version() -> Dict[str, str]:
+@router.post("/ingest", response_model=IngestResult)
+async def ingest(
+    request: Request,
+    x_agent_id: str = Header(...),
+    x_batch_id: str = Header(...),
+    state: StateService = Depends(get_state),
+) -> Dict[str, Any]:
+    # Gzipped NDJSON batch from a remote agent. Batch ids are remembered, so
+    # a resend is acknowledged without reading or merging the body again.
+    if not valid_id(x_agent_id) or not valid_id(x_batch_id):
+        raise HTTPException(status_code=400, detail="invalid agent or batch id")
+    seen = state.batch_seen(x_agent_id, x_batch_id)
+    if seen is not None:
+        return {"agent": x_agent_id, "batch": x_batch_id, "accepted": seen, "duplicate": True}
+    body = await request.body()
+    try:
+        records = await asyncio.to_thread(decode_batch, body)
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid batch")
+    rows = [r for r in map(parse_record, records) if r is not None]
+    accepted, duplicate = await state.ingest(x_agent_id, x_batch_id, rows)
+    if not duplicate and rows:
+        history: HistoryStore = request.app.state.history
+        for key, ts, is_up, rtt in rows:
+            history.add(f"{x_agent_id}/{key}", ts, is_up, rtt)
+        await asyncio.to_thread(
+            app_io.append_log_rows,
+            request.app.state.agent_log,
+            [agent_log_row(x_agent_id, *r) for r in rows],
+            app_io.AGENT_LOG_HEADER,
+        )
+    return {
+        "agent": x_agent_id,
+        "batch": x_batch_id,
+        "accepted": accepted,
+        "rejected": len(records) - len(rows),
+        "duplicate": duplicate,
+    }
+
+
+def _history(
+    request: Request, keys: List[str], start: Optional[float], end: Optional[float], step: Optional[float]
+) -> Dict[str, Any]:
+    history: HistoryStore = request.app.state.history
+    end = time.time() if end is None else end
+    start = end - 3600.0 if start is None else start
+    if start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    out = history.query(keys, start, end, step)
+    out["servers"] = keys
+    return out
+
+
+@router.get("/history", response_model=HistoryResponse, response_model_by_alias=True)
+async def group_history(
+    request: Request,
+    group: Optional[str] = None,
+    service: Optional[str] = None,
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    step: Optional[float] = Query(None, gt=0),
+    agent: Optional[str] = None,
+    state: StateService = Depends(get_state),
+) -> Dict[str, Any]:
+    # Aggregated over every server matching the filters.
+    keys = [
+        server_key(s) for s in state.servers
+        if (not group or (s.get("group") or DEFAULT_GROUP) == group) and (not service or s.get("service") == service)
+    ]
+    if agent:
+        keys = [f"{agent}/{k}" for k in keys]
+    return _history(request, keys, start, end, step)
+
+
+@router.get("/history/{server_id}", response_model=HistoryResponse, response_model_by_alias=True)
+async def server_history(
+    request: Request,
+    server_id: str,
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    step: Optional[float] = Query(None, gt=0),
+    agent: Optional[str] = None,
+    state: StateService = Depends(get_state),
+) -> Dict[str, Any]:
+    key = server_id
+    if server_id.isdigit():
+        index = int(server_id)
+        if index >= len(state.servers):
+            raise HTTPException(status_code=404, detail="not found")
+        key = server_key(state.servers[index])
+    if agent:
+        key = f"{agent}/{key}"
+    return _history(request, [key], start, end, step)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(
+    request: Request,
+    state: StateService = Depends(get_state),
+    prober: BackgroundMonitor = Depends(get_prober),
+) -> PlainTextResponse:
+    body = render_prometheus(state.results, state.servers, server_key, prober.metrics, request.app.state.rtt)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+@router.get("/version", response_model=VersionInfo)
+async def version() -> Dict[str, str]:
     return {"app": "ETS Terminal Monitoring API", "version": "2.7.1"}
 
 
-@app.websocket("/ws/servers")
+@router.websocket("/ws/servers")
 async def ws_servers(ws: WebSocket) -> None:
+    # The first message is a full snapshot; later ones are deltas with
+    # consecutive "seq" numbers. A slow client is resynced with a new snapshot.
+    # ?encoding=msgpack sends binary frames when msgpack is installed.
+    hub: BroadcastHub = ws.app.state.hub
+    packed = ws.query_params.get("encoding") == "msgpack"
+    if packed and not codec.HAS_MSGPACK:
+        await ws.close(code=1003)
+        return
     await ws.accept()
+    queue = hub.subscribe()
+    receiver = asyncio.create_task(ws.receive())
     try:
         while True:
-            s = repo.get_settings(DEFAULTS)
-            servers = repo.get_servers()
-            stats = repo.get_stats()
-            payload = json.dumps({"servers": servers, "stats": stats})
-            await ws.send_text(payload)
-            await asyncio.sleep(float(s.get("refresh_interval", 2.0)))
-    except WebSocketDisconnect:
-        return
\ No newline at end of file
+            sender = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                frame = sender.result()
+                if packed:
+                    await ws.send_bytes(frame.packed())
+                else:
+                    await ws.send_text(frame.text())
+            else:
+                sender.cancel()
+            if receiver in done:
+                if receiver.result().get("type") == "websocket.disconnect":
+                    return
+                receiver = asyncio.create_task(ws.receive())
+    except (WebSocketDisconnect, RuntimeError):
+        return
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(queue)
+
+app = create_app(repo, LOG_FILE, embed_monitor=os.environ.get(MONITOR_ENV, "") in ("1", "true", "yes"))
@@ -10,7 +10,7 @@ try:
 except Exception:
     HAS_FCNTL = False
 from logging.handlers import RotatingFileHandler
-from typing import Any, Dict, List, Callable, Optional
+from typing import Any, Dict, List, Callable, Optional, Tuple
 from datetime import datetime, timezone
 import tempfile
 import shutil
@@ -56,6 +56,14 @@ def load_servers(path: str, backup_path: str, validator: Optional[Callable[[Dict
     return servers
 
 
+def file_version(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
 def _atomic_write_text(path: str, text: str) -> None:
     d = os.path.dirname(path) or "."
     fd, tmp = tempfile.mkstemp(dir=d)
@@ -125,6 +133,27 @@ def save_stats(path: str, stats: Dict[str, Dict[str, int]]) -> None:
     _atomic_write_text(path, json.dumps(stats, ensure_ascii=False, indent=2))
 
 
+def load_ingest(path: str) -> Dict[str, Any]:
+    # Stats merged from remote agents plus the batch ids already counted in
+    # them, kept in one file so both are always written together.
+    data: Dict[str, Any] = {"stats": {}, "batches": {}}
+    if not os.path.exists(path):
+        return data
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+        for name in data:
+            if isinstance(loaded.get(name), dict):
+                data[name] = loaded[name]
+    except Exception:
+        pass
+    return data
+
+
+def save_ingest(path: str, data: Dict[str, Any]) -> None:
+    _atomic_write_text(path, json.dumps(data, ensure_ascii=False))
+
+
 def load_settings(path: str, defaults: Dict[str, Any], validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None) -> Dict[str, Any]:
     if not os.path.exists(path):
         save_settings(path, defaults, validator)
@@ -149,8 +178,12 @@ def save_settings(path: str, settings: Dict[str, Any], validator: Optional[Calla
     _secure_file(path, 0o600)
 
 
-def ensure_log_header(path: str) -> None:
-    header = "date;group;name;host;service;port;status;ping;uptime\n"
+LOG_HEADER = "date;group;name;host;service;port;status;ping;uptime\n"
+# Rows ingested from remote agents (ets_tm.history.agent_log_row).
+AGENT_LOG_HEADER = "date;agent;key;status;ping\n"
+
+
+def ensure_log_header(path: str, header: str = LOG_HEADER) -> None:
     if not os.path.exists(path):
         with open(path, "w", encoding="utf-8") as f:
             f.write(header)
@@ -236,17 +269,33 @@ def append_log_line(path: str, line: str, ensure_header: bool = True) -> None:
         _release_lock(tok)
 
 
+def _csv_line(row: List[str]) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=";", quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+    writer.writerow(row)
+    return buf.getvalue().rstrip("\n")
+
+
 def append_log_row(path: str, row: List[str], ensure_header: bool = True) -> None:
     tok = _acquire_lock(path)
     try:
         if ensure_header:
             ensure_log_header(path)
-        buf = io.StringIO()
-        writer = csv.writer(buf, delimiter=";", quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
-        writer.writerow(row)
-        line = buf.getvalue().rstrip("\n")
         logger = get_logger(path)
-        logger.info(line)
+        logger.info(_csv_line(row))
+    finally:
+        _release_lock(tok)
+
+
+def append_log_rows(path: str, rows: List[List[str]], header: str = LOG_HEADER) -> None:
+    # Several rows under one lock; the header is written first so the
+    # rotating logger never adds the default one.
+    tok = _acquire_lock(path)
+    try:
+        ensure_log_header(path, header)
+        logger = get_logger(path)
+        for row in rows:
+            logger.info(_csv_line(row))
     finally:
         _release_lock(tok)
 
@@ -343,7 +392,7 @@ def export_servers_json(path: str, servers: List[Dict[str, Any]]) -> None:
 
 
 def export_servers_csv(path: str, servers: List[Dict[str, Any]]) -> None:
-    header = ["name","host","group","service","port"]
+    header = ["name","host","group","service","port","depends_on"]
     buf = io.StringIO()
     writer = csv.writer(buf, delimiter=",", quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
     writer.writerow(header)
@@ -354,6 +403,7 @@ def export_servers_csv(path: str, servers: List[Dict[str, Any]]) -> None:
             s.get("group",""),
             s.get("service",""),
             int(s.get("port",0)) or 0,
+            s.get("depends_on") or "",
         ])
     _atomic_write_text(path, buf.getvalue())
 
@@ -413,6 +463,8 @@ def import_servers_csv(path: str, validator: Optional[Callable[[Dict[str, Any]],
                 "service": _get("service") or "Custom Port",
                 "port": int(_get("port") or "0") or 0,
             }
+            if _get("depends_on"):
+                obj["depends_on"] = _get("depends_on")
             out.append(validator(obj) if validator else obj)
         return out
     except Exception:
@@ -1,13 +1,39 @@
 import asyncio
+import logging
+import signal
+import socket
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
+from .agent import AgentShipper
+from .breaker import BREAKER_MAX_INTERVAL, BREAKER_THRESHOLD, CLOSED, CircuitBreaker
+from .deps import UNREACHABLE, dependency_levels, dependency_parents
+from .metrics import ProbeMetrics
+from .schedule import DEFAULT_OVERRUN_POLICY, OVERRUN_POLICIES, FixedRateSchedule
 from .repo import FileRepository
+from .results import ResultStore
 from .services import MonitoringService
 from . import app_io
 
 
-def _server_key(srv: Dict[str, Any]) -> str:
+# On shutdown the running cycle gets this long before its probes are cancelled.
+SHUTDOWN_DEADLINE = 5.0
+# Upper bound for the probe thread pool (two threads per concurrent check).
+MAX_PROBE_THREADS = 256
+# A status change is re-probed this many times, this far apart, before it is
+# committed; one disagreeing probe keeps the previous status.
+CONFIRM_ATTEMPTS = 2
+CONFIRM_INTERVAL = 0.3
+# Host name -> address resolutions used to group entries are kept this long.
+ADDRESS_TTL = 300.0
+
+
+_log = logging.getLogger(__name__)
+
+
+def server_key(srv: Dict[str, Any]) -> str:
     return f"{srv.get('host','')}:{srv.get('port','')}:{srv.get('service','')}"
 
 
@@ -17,7 +43,11 @@ def _update_and_get_uptime(stats: Dict[str, Dict[str, int]], key: str, is_up: bo
         s["ok"] += 1
     else:
         s["fail"] += 1
-    total = s["ok"] + s["fail"]
+    return _uptime(s)
+
+
+def _uptime(s: Optional[Dict[str, int]]) -> Optional[float]:
+    total = (s["ok"] + s["fail"]) if s else 0
     if total == 0:
         return None
     return (s["ok"] / total) * 100.0
@@ -33,6 +63,16 @@ class BackgroundMonitor:
         max_concurrent: int,
         retry_attempts: int,
         retry_base_delay: float,
+        results: Optional[ResultStore] = None,
+        servers_provider: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        stats: Optional[Dict[str, Dict[str, int]]] = None,
+        log_status: Optional[Callable[[Dict[str, Any], bool, Optional[float], Optional[float]], None]] = None,
+        agent: Optional[AgentShipper] = None,
+        overrun_policy: str = DEFAULT_OVERRUN_POLICY,
+        confirm_attempts: int = CONFIRM_ATTEMPTS,
+        confirm_interval: float = CONFIRM_INTERVAL,
+        breaker_threshold: int = BREAKER_THRESHOLD,
+        breaker_max_interval: float = BREAKER_MAX_INTERVAL,
     ) -> None:
         self.repo = repo
         self.svc = svc
@@ -41,14 +81,98 @@ class BackgroundMonitor:
         self.max_concurrent = max(1, int(max_concurrent))
         self.retry_attempts = max(1, int(retry_attempts))
         self.retry_base_delay = float(retry_base_delay)
+        self.results = results
+        self.servers_provider = servers_provider
+        self.stats = stats
+        self.log_status = log_status
+        self.agent = agent
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"unknown overrun policy: {overrun_policy!r}")
+        self.overrun_policy = overrun_policy
+        self.confirm_attempts = max(0, int(confirm_attempts))
+        self.confirm_interval = max(0.0, float(confirm_interval))
+        # Last committed port status per server key.
+        self._last_up: Dict[str, bool] = {}
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_max_interval)
+        # Keys probed without retries regardless of local breaker state
+        # (set by the shard supervisor for its workers).
+        self._single_try: Set[str] = set()
+        self._cycle_at = 0.0
+        # Pings and port checks shared by entries on the same address during
+        # one probe pass, keyed by (kind, address, ...).
+        self._shared: Optional[Dict[Tuple[Any, ...], "asyncio.Future[Any]"]] = None
+        self._addresses: Dict[str, Tuple[str, float]] = {}
         self._running = False
+        self._thread: Optional[threading.Thread] = None
+        # Long-lived loop and probe pool, reused by every cycle.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_size = 0
+        # Set by close(); the pool is not recreated until the next run.
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._run_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self.shutdown_deadline = SHUTDOWN_DEADLINE
+        self._inflight: Dict[str, "asyncio.Future[Tuple[Dict[str, Any], Optional[float], bool]]"] = {}
+        self.metrics = ProbeMetrics()
+        self.metrics.threads_max = self._pool_size()
+
+    def apply_settings(self, settings: Dict[str, Any]) -> None:
+        self.svc.ping_timeout = float(settings.get("ping_timeout", self.svc.ping_timeout))
+        self.svc.port_timeout = float(settings.get("port_timeout", self.svc.port_timeout))
+        self.svc.prefer_system_ping = bool(settings.get("prefer_system_ping", self.svc.prefer_system_ping))
+        self.refresh_interval = max(0.5, float(settings.get("refresh_interval", self.refresh_interval)))
+        self.max_concurrent = max(1, int(settings.get("max_concurrent_checks", self.max_concurrent)))
+        self.retry_attempts = max(1, int(settings.get("retry_attempts", self.retry_attempts)))
+        self.retry_base_delay = float(settings.get("retry_base_delay", self.retry_base_delay))
+        if settings.get("overrun_policy") in OVERRUN_POLICIES:
+            self.overrun_policy = settings["overrun_policy"]
+        self.confirm_attempts = max(0, int(settings.get("confirm_attempts", self.confirm_attempts)))
+        self.confirm_interval = max(0.0, float(settings.get("confirm_interval", self.confirm_interval)))
+        self.breaker.threshold = max(0, int(settings.get("breaker_threshold", self.breaker.threshold)))
+        self.breaker.max_interval = max(0.0, float(settings.get("breaker_max_interval", self.breaker.max_interval)))
+
+    async def _address(self, host: str) -> str:
+        cached = self._addresses.get(host)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+            addr = str(infos[0][4][0])
+        except (OSError, IndexError, UnicodeError):
+            addr = host
+        self._addresses[host] = (addr, now + ADDRESS_TTL)
+        return addr
+
+    async def _probe(self, shared: Optional[Tuple[Any, ...]], fn: Callable[[], Any]) -> Any:
+        # Entries on the same address reuse one probe per pass.
+        pending = self._shared
+        if shared is None or pending is None:
+            return await self._in_thread(fn)
+        fut = pending.get(shared)
+        if fut is None or fut.get_loop() is not asyncio.get_running_loop():
+            fut = pending[shared] = asyncio.ensure_future(self._in_thread(fn))
+        else:
+            self.metrics.observe_shared()
+        return await asyncio.shield(fut)
 
-    async def _check_one(self, srv: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[float], bool]:
+    async def _check_one(
+        self, srv: Dict[str, Any], share: bool = True, single: bool = False
+    ) -> Tuple[Dict[str, Any], Optional[float], bool]:
         host = str(srv.get("host", ""))
         port = int(srv.get("port", 0))
+        key = server_key(srv)
+        # Hosts behind an open breaker and confirmation re-probes get a single
+        # attempt.
+        if single or key in self._single_try or self.breaker.state(key) != CLOSED:
+            attempts = 1
+        else:
+            attempts = self.retry_attempts
 
         def _retry_ping():
-            for i in range(self.retry_attempts):
+            for i in range(attempts):
                 r = self.svc.ping_host(host)
                 if r is not None:
                     return r
@@ -58,62 +182,431 @@ class BackgroundMonitor:
         def _retry_port():
             if port <= 0:
                 return False
-            for i in range(self.retry_attempts):
+            for i in range(attempts):
                 ok = self.svc.check_port(host, port)
                 if ok:
                     return True
                 time.sleep(self.retry_base_delay * (2 ** i))
             return False
 
-        ping_task = asyncio.to_thread(_retry_ping)
-        port_task = asyncio.to_thread(_retry_port)
-        rtt, port_ok = await asyncio.gather(ping_task, port_task)
+        addr = await self._address(host) if share and self._shared is not None else None
+        rtt, port_ok = await asyncio.gather(
+            self._probe(None if addr is None else ("ping", addr, attempts), _retry_ping),
+            self._probe(None if addr is None else ("port", addr, port, attempts), _retry_port),
+        )
         return (srv, rtt, bool(port_ok))
 
+    def _pool_size(self) -> int:
+        return min(MAX_PROBE_THREADS, 2 * self.max_concurrent)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._closed:
+            raise RuntimeError("monitor is closed")
+        size = self._pool_size()
+        pool = self._executor
+        if pool is None or self._executor_size != size:
+            self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="ets-tm-probe")
+            self._executor_size = self.metrics.threads_max = size
+            if pool is not None:
+                pool.shutdown(wait=False)
+        return self._executor
+
+    async def _in_thread(self, fn: Callable[[], Any]) -> Any:
+        m = self.metrics
+        m.threads_busy += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), fn)
+        finally:
+            m.threads_busy -= 1
+
+    async def check(
+        self, srv: Dict[str, Any], share: bool = True, single: bool = False
+    ) -> Tuple[Dict[str, Any], Optional[float], bool]:
+        # Concurrent checks of the same server share one in-flight probe.
+        key = server_key(srv)
+        fut = self._inflight.get(key)
+        if fut is None or fut.get_loop() is not asyncio.get_running_loop():
+            fut = asyncio.ensure_future(self._check_one(srv, share, single))
+            self._inflight[key] = fut
+            self.metrics.inflight += 1
+
+            def _done(f, key=key) -> None:
+                self.metrics.inflight -= 1
+                if self._inflight.get(key) is f:
+                    del self._inflight[key]
+
+            fut.add_done_callback(_done)
+        _, rtt, port_ok = await asyncio.shield(fut)
+        return (srv, rtt, port_ok)
+
+    def _previous(self, key: str) -> Optional[bool]:
+        prev = self._last_up.get(key)
+        if prev is None and self.results is not None:
+            entry = self.results.get(key)
+            if entry is not None:
+                prev = entry.get("status") == "UP"
+        return prev
+
+    async def confirm(
+        self, result: Tuple[Dict[str, Any], Optional[float], bool], sem: Optional[asyncio.Semaphore] = None
+    ) -> Tuple[Dict[str, Any], Optional[float], bool]:
+        # Confirm-on-change: a result that differs from the last committed
+        # status is re-probed right away; only changing hosts pay for this.
+        srv, _, port_ok = result
+        prev = self._previous(server_key(srv))
+        if prev is None or prev == port_ok or self.confirm_attempts <= 0:
+            return result
+        for _ in range(self.confirm_attempts):
+            await asyncio.sleep(self.confirm_interval)
+            # Re-probes must not reuse this pass's shared results; each one is
+            # a single attempt, the loop itself is the retry.
+            if sem is None:
+                result = await self.check(srv, share=False, single=True)
+            else:
+                async with sem:
+                    result = await self.check(srv, share=False, single=True)
+            if result[2] == prev:
+                break
+        self.metrics.observe_confirm(suppressed=result[2] == prev)
+        return result
+
     async def _gather_batched(self, items: List[Dict[str, Any]], batch_size: int):
-        out = []
-        for i in range(0, len(items), max(1, batch_size)):
-            batch = items[i:i + batch_size]
-            res = await asyncio.gather(*(self._check_one(s) for s in batch))
-            out.extend(res)
-        return out
+        sem = asyncio.Semaphore(max(1, batch_size))
+        # Re-probes get their own slots so they never wait behind the fleet.
+        confirm_sem = asyncio.Semaphore(max(1, batch_size))
 
-    def run_once(self) -> None:
-        servers = self.repo.get_servers()
-        if not servers:
+        async def _bounded(srv: Dict[str, Any]):
+            async with sem:
+                result = await self.check(srv)
+            return await self.confirm(result, confirm_sem)
+
+        self._shared = {}
+        try:
+            return await asyncio.gather(*(_bounded(s) for s in items))
+        finally:
+            self._shared = None
+
+    async def iter_checks(
+        self, servers: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[Dict[str, Any], Optional[float], Optional[bool]]]:
+        # Yields results in completion order under one deadline for the whole
+        # batch; servers still pending at the deadline come last with None.
+        sem = asyncio.Semaphore(self.max_concurrent)
+
+        async def _bounded(srv: Dict[str, Any]):
+            async with sem:
+                return await self.check(srv)
+
+        loop = asyncio.get_running_loop()
+        end = None if timeout is None else loop.time() + max(0.0, float(timeout))
+        tasks = {asyncio.ensure_future(_bounded(s)): s for s in servers}
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = None if end is None else end - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        yield (tasks[task], None, False)
+                    else:
+                        yield task.result()
+            for task in pending:
+                yield (tasks[task], None, None)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _log_row(self, srv: Dict[str, Any], port_ok: bool, rtt: Optional[float], uptime: Optional[float]) -> None:
+        status_str = "UP" if port_ok else "DOWN"
+        ping_str = "-" if rtt is None else f"{rtt:.1f}"
+        row = [
+            time.strftime("%Y-%m-%dT%H:%M:%S"),
+            str(srv.get("group", "General")),
+            str(srv.get("name", "")),
+            str(srv.get("host", "")),
+            str(srv.get("service", "")),
+            str(int(srv.get("port", 0)) or 0),
+            status_str,
+            ping_str,
+            "-" if uptime is None else f"{uptime:.2f}",
+        ]
+        app_io.append_log_row(self.log_path, row, ensure_header=True)
+
+    def _load_servers(self) -> List[Dict[str, Any]]:
+        return self.servers_provider() if self.servers_provider else self.repo.get_servers()
+
+    def _due(self, servers: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        # (due, held): servers whose breaker is open and not yet due sit this
+        # cycle out unprobed; _commit carries them forward as DOWN.
+        breaker = self.breaker
+        now = self._cycle_at = breaker.clock()
+        if len(breaker) > len(servers):
+            breaker.retain(server_key(s) for s in servers)
+        due: List[Dict[str, Any]] = []
+        held: List[Dict[str, Any]] = []
+        for srv in servers:
+            (due if breaker.allow(server_key(srv), now) else held).append(srv)
+        self.metrics.observe_breakers(breaker.open_count(), len(held))
+        return due, held
+
+    def _parent_up(self, key: str, seen: Dict[str, bool]) -> bool:
+        # A parent answered if its ping or port did; one that sat this cycle
+        # out (breaker) is judged by its last result.
+        if key in seen:
+            return seen[key]
+        entry = self.results.get(key) if self.results is not None else None
+        if entry is None:
+            return self._last_up.get(key, True)
+        return entry.get("status") == "UP" or (entry.get("status") != UNREACHABLE and entry.get("rtt") is not None)
+
+    async def _probe_planned(
+        self,
+        inventory: List[Dict[str, Any]],
+        due: List[Dict[str, Any]],
+        probe: Callable[[List[Dict[str, Any]]], Any],
+    ) -> Tuple[List[Tuple[Dict[str, Any], Optional[float], bool]], List[Dict[str, Any]]]:
+        # Probes `due` level by level down the depends_on forest; children of
+        # an unreachable parent are returned separately, unprobed.
+        parents = dependency_parents(inventory, server_key)
+        if not parents:
+            return list(await probe(due)) if due else [], []
+        seen: Dict[str, bool] = {}
+        results: List[Tuple[Dict[str, Any], Optional[float], bool]] = []
+        unreachable: List[Dict[str, Any]] = []
+        for level in dependency_levels(due, parents, server_key):
+            todo = []
+            for srv in level:
+                key = server_key(srv)
+                parent = parents.get(key)
+                if parent is not None and not self._parent_up(parent, seen):
+                    seen[key] = False
+                    unreachable.append(srv)
+                else:
+                    todo.append(srv)
+            if todo:
+                for r in await probe(todo):
+                    seen[server_key(r[0])] = r[2] or r[1] is not None
+                    results.append(r)
+        self.metrics.observe_unreachable(len(unreachable))
+        return results, unreachable
+
+    def _commit(
+        self,
+        results: List[Tuple[Dict[str, Any], Optional[float], bool]],
+        unreachable: Optional[List[Dict[str, Any]]] = None,
+        held: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        stats = self.stats if self.stats is not None else self.repo.get_stats()
+        # Servers held by an open breaker count as DOWN every cycle they sit
+        # out, so uptime, the log and history weigh an outage by its length.
+        carried = [(srv, None, False) for srv in held or ()]
+        # Counters are updated in one pass under the lock stats_snapshot()
+        # takes, so a caller saving shared stats never sees them mid-update.
+        with self._stats_lock:
+            uptimes = [_update_and_get_uptime(stats, server_key(srv), port_ok) for srv, _, port_ok in results + carried]
+            kept = [_uptime(stats.get(server_key(srv))) for srv in unreachable or ()]
+        for i, ((srv, rtt, port_ok), uptime) in enumerate(zip(results + carried, uptimes)):
+            key = server_key(srv)
+            if i < len(results):
+                self._last_up[key] = port_ok
+                state = self.breaker.record(key, port_ok, self.refresh_interval, self._cycle_at)
+            else:
+                state = self.breaker.state(key)
+            started = time.perf_counter()
+            if self.log_status:
+                self.log_status(srv, port_ok, rtt, uptime)
+            else:
+                self._log_row(srv, port_ok, rtt, uptime)
+            self.metrics.observe_log_write(time.perf_counter() - started)
+            if self.results is not None:
+                self.results.record(key, rtt, port_ok, uptime, breaker=state)
+            if self.agent is not None:
+                self.agent.record(key, srv, rtt, port_ok)
+        # Unprobed children of a down parent: no log row, stats unchanged.
+        if self.results is not None:
+            for srv, uptime in zip(unreachable or (), kept):
+                key = server_key(srv)
+                self.results.record(key, None, False, uptime, breaker=self.breaker.state(key), status=UNREACHABLE)
+        if self.stats is None:
+            self.repo.save_stats(stats)
+        if self.agent is not None:
+            self.agent.ship()
+
+    def publish(
+        self, result: Tuple[Dict[str, Any], Optional[float], bool], stats: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> None:
+        # On-demand checks reach the results store (and through it the hub,
+        # SSE and metrics) like cycle results, but are not uptime samples.
+        if self.results is None:
             return
-        stats = self.repo.get_stats()
-        results = asyncio.run(self._gather_batched(servers, self.max_concurrent))
-        for srv, rtt, port_ok in results:
-            uptime = _update_and_get_uptime(stats, _server_key(srv), port_ok)
-            status_str = "UP" if port_ok else "DOWN"
-            ping_str = "-" if rtt is None else f"{rtt:.1f}"
-            row = [
-                time.strftime("%Y-%m-%dT%H:%M:%S"),
-                str(srv.get("group", "General")),
-                str(srv.get("name", "")),
-                str(srv.get("host", "")),
-                str(srv.get("service", "")),
-                str(int(srv.get("port", 0)) or 0),
-                status_str,
-                ping_str,
-                "-" if uptime is None else f"{uptime:.2f}",
-            ]
-            app_io.append_log_row(self.log_path, row, ensure_header=True)
-        self.repo.save_stats(stats)
+        srv, rtt, port_ok = result
+        key = server_key(srv)
+        source = self.stats if stats is None else stats
+        with self._stats_lock:
+            uptime = _uptime(source.get(key)) if source is not None else None
+        self.results.record(key, rtt, port_ok, uptime, breaker=self.breaker.state(key))
 
-    def run_forever(self, stop_after_cycles: Optional[int] = None) -> None:
-        self._running = True
+    def stats_snapshot(self) -> Dict[str, Dict[str, int]]:
+        # Copy of the shared stats dict that is safe to save while a cycle
+        # may still be committing.
+        with self._stats_lock:
+            return {k: dict(v) for k, v in (self.stats or {}).items()}
+
+    async def run_cycle(self) -> List[Tuple[Dict[str, Any], Optional[float], bool]]:
+        # One probe cycle on the running loop; file I/O stays off the loop.
+        started = time.perf_counter()
+        inventory = await asyncio.to_thread(self._load_servers)
+        if not inventory:
+            return []
+        due, held = self._due(inventory)
+        results, unreachable = await self._probe_planned(
+            inventory, due, lambda todo: self._gather_batched(todo, self.max_concurrent)
+        )
+        await asyncio.to_thread(self._commit, results, unreachable, held)
+        self.metrics.observe_cycle(time.perf_counter() - started, len(results))
+        return results
+
+    def _own_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    def run_once(self) -> None:
+        # Synchronous callers share one loop across cycles; async code should
+        # await run_cycle() or run() on its own loop instead.
+        self._closed = False
+        self._own_loop().run_until_complete(self.run_cycle())
+
+    def schedule(self) -> FixedRateSchedule:
+        return FixedRateSchedule(self.refresh_interval, self.overrun_policy)
+
+    def _tick_done(self, sched: FixedRateSchedule) -> None:
+        overruns, skipped = sched.overruns, sched.skipped
+        sched.end()
+        self.metrics.observe_schedule(
+            sched.last_lateness, sched.overruns - overruns, sched.skipped - skipped
+        )
+        # Settings may have changed during the cycle.
+        sched.interval = self.refresh_interval
+        sched.policy = self.overrun_policy
+
+    async def _finish(self, cycle: "asyncio.Future[Any]", deadline: float) -> None:
+        # Stop requested mid-cycle: let it finish within the deadline, then
+        # cancel whatever is still probing.
+        done, _ = await asyncio.wait({cycle}, timeout=max(0.0, deadline))
+        if not done:
+            cycle.cancel()
+            for fut in list(self._inflight.values()):
+                fut.cancel()
+        await asyncio.gather(cycle, return_exceptions=True)
+
+    async def run(
+        self,
+        stop_after_cycles: Optional[int] = None,
+        settings: Optional[Callable[[], Dict[str, Any]]] = None,
+        handle_signals: bool = False,
+        deadline: Optional[float] = None,
+    ) -> None:
+        # Fixed-rate: cycles start every refresh_interval regardless of how
+        # long each takes; overruns follow overrun_policy. Runs on the calling
+        # loop, so it can be a task in the API or TUI. `settings` is read
+        # before every cycle.
+        loop = asyncio.get_running_loop()
+        self._closed = False
+        self._run_loop = loop
+        self._stop_event = stop = asyncio.Event()
+        if threading.current_thread() is not self._thread:
+            # start() already set the flag; keep a stop() that raced it.
+            self._running = True
+        signals = []
+        if handle_signals:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, self.request_stop)
+                    signals.append(sig)
+                except (NotImplementedError, RuntimeError, ValueError):
+                    pass
         cycles = 0
+        sched = self.schedule()
         try:
             while self._running:
-                self.run_once()
+                if settings is not None:
+                    self.apply_settings(settings())
+                sched.begin()
+                cycle = asyncio.ensure_future(self.run_cycle())
+                stopping = asyncio.ensure_future(stop.wait())
+                try:
+                    await asyncio.wait({cycle, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                    if not cycle.done():
+                        await self._finish(cycle, self.shutdown_deadline if deadline is None else deadline)
+                    elif not cycle.cancelled() and cycle.exception() is not None:
+                        # A failed cycle must not end the monitor, nor pass unnoticed.
+                        self.metrics.observe_failure()
+                        _log.error("probe cycle failed", exc_info=cycle.exception())
+                except asyncio.CancelledError:
+                    await self._finish(cycle, 0.0)
+                    raise
+                finally:
+                    stopping.cancel()
+                    self._tick_done(sched)
                 cycles += 1
                 if stop_after_cycles and cycles >= stop_after_cycles:
                     break
-                time.sleep(self.refresh_interval)
+                try:
+                    await asyncio.wait_for(stop.wait(), sched.delay())
+                except asyncio.TimeoutError:
+                    pass
         finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)
             self._running = False
+            self._stop_event = None
+            self._run_loop = None
+
+    def request_stop(self) -> None:
+        # Safe from any thread, including signal handlers on the loop.
+        self._running = False
+        loop, stop = self._run_loop, self._stop_event
+        if loop is None or stop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(stop.set)
+        except RuntimeError:
+            pass
+
+    def run_forever(self, stop_after_cycles: Optional[int] = None) -> None:
+        self._own_loop().run_until_complete(self.run(stop_after_cycles))
+
+    def start(self) -> threading.Thread:
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._running = True
+        self._thread = threading.Thread(target=self.run_forever, name="ets-tm-monitor", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.request_stop()
+        th = self._thread
+        if th is not None and th is not threading.current_thread():
+            th.join(timeout)
+            if th.is_alive():
+                return
+        self._thread = None
+        self.close()
 
-    def stop(self) -> None:
-        self._running = False
\ No newline at end of file
+    def close(self) -> None:
+        # Releases the probe pool and the private loop; both are recreated
+        # by the next run_once()/run(), never by a cycle still in flight.
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        loop = self._loop
+        if loop is not None and not loop.is_running() and not loop.is_closed():
+            loop.close()
+            self._loop = None
+        if self.agent is not None:
+            self.agent.close()
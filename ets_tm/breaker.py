@@ -0,0 +1,87 @@
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+# Consecutive failed probes before a server's breaker opens (0 disables).
+BREAKER_THRESHOLD = 5
+# While open, the gap between probes doubles from one refresh interval up to
+# this many seconds.
+BREAKER_MAX_INTERVAL = 300.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _State:
+    __slots__ = ("failures", "next_at", "probing")
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.next_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    # Per-server breakers for hosts that stay down. After `threshold`
+    # consecutive failures a server is only probed again once its back-off has
+    # elapsed (one half-open probe, no retries); the back-off doubles with
+    # every failed half-open probe and any success closes the breaker.
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        max_interval: float = BREAKER_MAX_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = max(0, int(threshold))
+        self.max_interval = max(0.0, float(max_interval))
+        self.clock = clock
+        self._states: Dict[str, _State] = {}
+
+    def state(self, key: str) -> str:
+        s = self._states.get(key)
+        if s is None or not self.threshold or s.failures < self.threshold:
+            return CLOSED
+        return HALF_OPEN if s.probing else OPEN
+
+    def allow(self, key: str, now: Optional[float] = None) -> bool:
+        # Whether the server should be probed this cycle; a due open breaker
+        # turns half-open.
+        s = self._states.get(key)
+        if s is None or not self.threshold or s.failures < self.threshold:
+            return True
+        if (self.clock() if now is None else now) < s.next_at:
+            return False
+        s.probing = True
+        return True
+
+    def record(self, key: str, ok: bool, interval: float, now: Optional[float] = None) -> str:
+        # `interval` is the normal probe period the back-off starts from;
+        # `now` should be the start of the cycle that produced the result.
+        if ok:
+            self._states.pop(key, None)
+            return CLOSED
+        s = self._states.get(key)
+        if s is None:
+            s = self._states[key] = _State()
+        s.failures += 1
+        s.probing = False
+        if not self.threshold or s.failures < self.threshold:
+            return CLOSED
+        steps = min(30, s.failures - self.threshold + 1)
+        backoff = min(max(self.max_interval, interval), interval * (2 ** steps))
+        s.next_at = (self.clock() if now is None else now) + backoff
+        return OPEN
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def open_count(self) -> int:
+        if not self.threshold:
+            return 0
+        return sum(1 for s in self._states.values() if s.failures >= self.threshold)
+
+    def retain(self, keys: Iterable[str]) -> None:
+        # Drops state for servers that left the inventory.
+        keep = set(keys)
+        for key in [k for k in self._states if k not in keep]:
+            del self._states[key]
@@ -0,0 +1,42 @@
+import json
+from typing import Any, Union
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+try:
+    import msgpack  # type: ignore
+    HAS_MSGPACK = True
+except Exception:
+    HAS_MSGPACK = False
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def packb(obj: Any) -> bytes:
+    if not HAS_MSGPACK:
+        raise RuntimeError("msgpack is not installed")
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    if not HAS_MSGPACK:
+        raise RuntimeError("msgpack is not installed")
+    return msgpack.unpackb(data, raw=False)
@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import app_io, codec
+from .agent import AgentShipper
+from .background import BackgroundMonitor
+from .domain import DEFAULT_SETTINGS
+from .deps import UNREACHABLE
+from .repo import FileRepository
+from .results import ResultStore
+from .schedule import DEFAULT_OVERRUN_POLICY, OVERRUN_POLICIES
+from .services import MonitoringService
+from .shard import ShardedMonitor
+try:
+    import fcntl  # type: ignore
+    HAS_FCNTL = True
+except Exception:
+    HAS_FCNTL = False
+
+# Headless probe -> log -> stats pipeline. Nothing here may import rich,
+# termios, the language files or the UI modules.
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PID_FILE = str(BASE_DIR / "ets-tm-agent.pid")
+STATUS_SOCKET = str(BASE_DIR / "ets-tm-agent.sock")
+SPOOL_DIR = str(BASE_DIR / "spool")
+
+
+class AlreadyRunning(Exception):
+    pass
+
+
+class PidLock:
+    # Single-instance guard: an exclusive lock held on the PID file for the
+    # life of the process. Without fcntl, a PID file whose process is gone
+    # counts as stale.
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def _holder(self) -> Optional[int]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self) -> None:
+        if HAS_FCNTL:
+            while True:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    os.close(fd)
+                    raise AlreadyRunning(self._holder())
+                # The previous holder unlinks the file on release; if that
+                # happened between our open and flock we hold a lock on an
+                # orphaned inode that guards nothing, so start over.
+                if _same_file(fd, self.path):
+                    break
+                os.close(fd)
+        else:
+            holder = self._holder()
+            if holder is not None and _alive(holder):
+                raise AlreadyRunning(holder)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+        self._fd = fd
+
+    def release(self) -> None:
+        # Unlinking while still holding the lock is safe only because
+        # acquire() re-checks the inode after locking.
+        if self._fd is None:
+            return
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        os.close(self._fd)
+        self._fd = None
+
+
+def _same_file(fd: int, path: str) -> bool:
+    try:
+        a, b = os.fstat(fd), os.stat(path)
+    except OSError:
+        return False
+    return (a.st_dev, a.st_ino) == (b.st_dev, b.st_ino)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def status(monitor: BackgroundMonitor, results: ResultStore, started: float) -> Dict[str, Any]:
+    m = monitor.metrics
+    snap = results.snapshot()
+    out: Dict[str, Any] = {
+        "pid": os.getpid(),
+        "started_at": started,
+        "uptime": time.time() - started,
+        "servers": len(snap),
+        "up": sum(1 for e in snap.values() if e.get("status") == "UP"),
+        "down": sum(1 for e in snap.values() if e.get("status") == "DOWN"),
+        "unreachable": sum(1 for e in snap.values() if e.get("status") == UNREACHABLE),
+        "last_check": results.updated_at,
+        "cycles": m.cycles_total,
+        "probes": m.probes_total,
+        "last_cycle_seconds": m.last_cycle_seconds,
+        "overruns": m.overruns_total,
+        "breakers_open": m.breakers_open,
+        "interval": monitor.refresh_interval,
+    }
+    if monitor.agent is not None:
+        out["agent"] = {
+            "id": monitor.agent.agent_id,
+            "sent_batches": monitor.agent.sent_batches,
+            "spooled_batches": len(monitor.agent.pending()),
+            "last_error": monitor.agent.last_error,
+        }
+    return out
+
+
+async def _serve_status(path: str, monitor: BackgroundMonitor, results: ResultStore, started: float) -> Any:
+    # One JSON document per connection, then close: `nc -U <socket>` works.
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            writer.write(codec.dumps_bytes(status(monitor, results, started)) + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    return await asyncio.start_unix_server(_handle, path=path)
+
+
+def read_status(path: str, timeout: float = 2.0) -> Dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        chunks: List[bytes] = []
+        while True:
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return codec.loads(b"".join(chunks))
+
+
+def build_monitor(args: argparse.Namespace, results: ResultStore) -> BackgroundMonitor:
+    repo = FileRepository(args.servers, args.servers + ".bak", args.stats, args.settings)
+    s = repo.get_settings(DEFAULT_SETTINGS)
+    svc = MonitoringService(float(s["ping_timeout"]), float(s["port_timeout"]), bool(s["prefer_system_ping"]))
+    agent = None
+    if args.agent_url:
+        agent_id = args.agent_id or "".join(c if c.isalnum() or c in "._-" else "-" for c in socket.gethostname())[:64]
+        agent = AgentShipper(args.agent_url, agent_id or "agent", args.spool_dir, timeout=args.api_timeout)
+    params = (
+        repo, svc, args.log, float(s["refresh_interval"]), int(s["max_concurrent_checks"]),
+        int(s["retry_attempts"]), float(s["retry_base_delay"]),
+    )
+    kwargs = dict(results=results, agent=agent, overrun_policy=args.overrun_policy)
+    if args.workers > 1:
+        return ShardedMonitor(*params, workers=args.workers, **kwargs)
+    return BackgroundMonitor(*params, **kwargs)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    results = ResultStore()
+    monitor = build_monitor(args, results)
+    repo = monitor.repo
+    started = time.time()
+    seen: Dict[str, Any] = {"ver": None, "value": None}
+
+    def _settings() -> Dict[str, Any]:
+        # Re-read config.json only when it changed on disk.
+        ver = app_io.file_version(repo.settings_path)
+        if seen["value"] is None or ver != seen["ver"]:
+            seen["value"] = repo.get_settings(DEFAULT_SETTINGS)
+            seen["ver"] = ver
+        return seen["value"]
+
+    server = None
+    if args.status_socket and hasattr(socket, "AF_UNIX"):
+        server = await _serve_status(args.status_socket, monitor, results, started)
+    try:
+        await monitor.run(settings=_settings, handle_signals=True)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            try:
+                os.unlink(args.status_socket)
+            except OSError:
+                pass
+        monitor.close()
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="ets-tm-agent", description="Headless ETS Terminal Monitoring probe daemon")
+    p.add_argument("--servers", default=str(BASE_DIR / "servers.txt"), help="servers file")
+    p.add_argument("--stats", default=str(BASE_DIR / "server_stats.json"), help="stats file")
+    p.add_argument("--settings", default=str(BASE_DIR / "config.json"), help="settings file")
+    p.add_argument("--log", default=str(BASE_DIR / "monitor.log"), help="CSV log file")
+    p.add_argument("--pid-file", default=PID_FILE, help="PID/lock file ('' disables)")
+    p.add_argument("--status-socket", default=STATUS_SOCKET, help="unix socket serving status JSON ('' disables)")
+    p.add_argument("--status", action="store_true", help="print the running daemon's status and exit")
+    p.add_argument("--workers", type=int, default=1, help="probe worker processes (sharded by server)")
+    p.add_argument("--overrun-policy", choices=OVERRUN_POLICIES, default=DEFAULT_OVERRUN_POLICY)
+    p.add_argument("--agent-url", help="ship results to a central API")
+    p.add_argument("--agent-id", help="agent name used by the central API (default: host name)")
+    p.add_argument("--spool-dir", default=SPOOL_DIR, help="agent spool directory")
+    p.add_argument("--api-timeout", type=float, default=3.0, help="seconds to wait for each agent request")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parser().parse_args(argv)
+    if args.status:
+        try:
+            print(codec.dumps(read_status(args.status_socket)))
+        except OSError as e:
+            print(f"not running: {e}", file=sys.stderr)
+            return 1
+        return 0
+    lock = PidLock(args.pid_file) if args.pid_file else None
+    if lock is not None:
+        try:
+            lock.acquire()
+        except AlreadyRunning as e:
+            print(f"already running (pid {e.args[0]})", file=sys.stderr)
+            return 1
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if lock is not None:
+            lock.release()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
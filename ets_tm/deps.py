@@ -0,0 +1,61 @@
+from typing import Any, Callable, Dict, List
+
+# A server's optional `depends_on` names its parent (e.g. the gateway or site
+# link in front of it) by server key or by name. Parents are probed first;
+# while a parent is unreachable its children are not probed at all.
+
+UNREACHABLE = "UNREACHABLE"
+
+
+def dependency_parents(servers: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], str]) -> Dict[str, str]:
+    # child key -> parent key. Unknown parents, self references and the edge
+    # that would close a cycle are dropped, so every chain ends at a root.
+    refs = [(s, s.get("depends_on")) for s in servers]
+    if not any(ref for _, ref in refs):
+        return {}
+    by_key = {key(s): s for s in servers}
+    by_name: Dict[str, str] = {}
+    for s in servers:
+        by_name.setdefault(str(s.get("name", "")), key(s))
+    parents: Dict[str, str] = {}
+    for srv, ref in refs:
+        if not ref:
+            continue
+        ref = str(ref)
+        child = key(srv)
+        parent = ref if ref in by_key else by_name.get(ref)
+        if parent is None or parent == child:
+            continue
+        node = parent
+        while node in parents and node != child:
+            node = parents[node]
+        if node != child:
+            parents[child] = parent
+    return parents
+
+
+def dependency_levels(servers: List[Dict[str, Any]], parents: Dict[str, str], key: Callable[[Dict[str, Any]], str]) -> List[List[Dict[str, Any]]]:
+    # Groups servers by depth in the dependency forest: roots first, then
+    # their children and so on. Inventory order is kept within a level.
+    if not parents:
+        return [list(servers)] if servers else []
+    depth: Dict[str, int] = {}
+
+    def _depth(k: str) -> int:
+        chain = []
+        while k not in depth and k in parents:
+            chain.append(k)
+            k = parents[k]
+        d = depth.get(k, 0)
+        for c in reversed(chain):
+            d += 1
+            depth[c] = d
+        return d
+
+    levels: List[List[Dict[str, Any]]] = []
+    for srv in servers:
+        d = _depth(key(srv))
+        while len(levels) <= d:
+            levels.append([])
+        levels[d].append(srv)
+    return [lvl for lvl in levels if lvl]
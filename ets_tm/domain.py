@@ -7,6 +7,8 @@ class Server(TypedDict, total=False):
     host: str
     service: str
     port: int
+    # Name or key (host:port:service) of the server this one sits behind.
+    depends_on: Optional[str]
 
 
 class Settings(TypedDict, total=False):
@@ -22,6 +24,22 @@ class Settings(TypedDict, total=False):
     page_size: int
 
 
+# Settings used when config.json is missing keys; shared by the CLI, the API
+# and the headless daemon. Callers copy it before changing anything.
+DEFAULT_SETTINGS: Settings = {
+    "refresh_interval": 2.0,
+    "ping_timeout": 1.5,
+    "port_timeout": 1.5,
+    "live_fullscreen": True,
+    "refresh_per_second": 4,
+    "prefer_system_ping": False,
+    "max_concurrent_checks": 20,
+    "page_size": 20,
+    "retry_attempts": 3,
+    "retry_base_delay": 0.2,
+}
+
+
 class StatsEntry(TypedDict, total=False):
     ok: int
     fail: int
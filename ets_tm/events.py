@@ -0,0 +1,130 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from . import codec
+from .background import server_key
+from .state import StateService
+
+EVENT_BUFFER_SIZE = 1024
+EVENT_QUEUE_SIZE = 256
+KEEPALIVE_INTERVAL = 15.0
+
+
+_Event = Tuple[int, str, Dict[str, Any]]
+
+
+def format_event(event_id: Optional[int], kind: str, data: Dict[str, Any]) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\ndata: {codec.dumps(data)}\n\n"
+
+
+class EventLog:
+    def __init__(self, state: StateService, size: int = EVENT_BUFFER_SIZE, queue_size: int = EVENT_QUEUE_SIZE) -> None:
+        self.state = state
+        self.queue_size = max(1, int(queue_size))
+        self.last_id = 0
+        self._buffer: Deque[_Event] = deque(maxlen=max(1, int(size)))
+        self._status: Dict[str, Optional[str]] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._lookup: Dict[str, Dict[str, Any]] = {}
+        self._lookup_ver: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self.state.results.subscribe(self._on_result)
+
+    def detach(self) -> None:
+        self.state.results.unsubscribe(self._on_result)
+        self._loop = None
+
+    def _on_result(self, entry: Dict[str, Any]) -> None:
+        # Probe threads hand results over to the loop that owns the buffer.
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self.append, entry)
+        except RuntimeError:
+            pass
+
+    def _server(self, key: str) -> Dict[str, Any]:
+        ver = self.state.versions.get("servers")
+        if ver != self._lookup_ver:
+            self._lookup = {server_key(s): s for s in self.state.servers}
+            self._lookup_ver = ver
+        return self._lookup.get(key, {})
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        key = str(entry.get("key", ""))
+        srv = self._server(key)
+        data = dict(entry, group=srv.get("group"), service=srv.get("service", key.rsplit(":", 1)[-1]))
+        prev = self._status.get(key)
+        status = entry.get("status")
+        self._status[key] = status
+        self._push("result", data)
+        if prev != status:
+            self._push("transition", dict(data, previous=prev))
+
+    def _push(self, kind: str, data: Dict[str, Any]) -> None:
+        self.last_id += 1
+        item = (self.last_id, kind, data)
+        self._buffer.append(item)
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(item)
+            except asyncio.QueueFull:
+                # Too far behind: end that stream; the client resumes from the
+                # ring buffer with Last-Event-ID.
+                self._subscribers.discard(q)
+                q.get_nowait()
+                q.put_nowait(None)
+
+    def since(self, last_id: int) -> Tuple[bool, List[_Event]]:
+        # Returns (complete, events); complete is False when older events
+        # than last_id + 1 have already been evicted.
+        items = [item for item in self._buffer if item[0] > last_id]
+        complete = last_id >= self.last_id or (bool(self._buffer) and self._buffer[0][0] <= last_id + 1)
+        return complete, items
+
+    async def stream(
+        self,
+        last_id: Optional[int] = None,
+        group: Optional[str] = None,
+        service: Optional[str] = None,
+        keepalive: float = KEEPALIVE_INTERVAL,
+    ) -> AsyncIterator[str]:
+        def _match(data: Dict[str, Any]) -> bool:
+            if group and data.get("group") != group:
+                return False
+            if service and data.get("service") != service:
+                return False
+            return True
+
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(q)
+        try:
+            sent = self.last_id
+            if last_id is not None:
+                complete, items = self.since(last_id)
+                if not complete:
+                    yield format_event(None, "resync", {"last_id": self.last_id})
+                for event_id, kind, data in items:
+                    if _match(data):
+                        yield format_event(event_id, kind, data)
+            while True:
+                try:
+                    item = await asyncio.wait_for(q.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    return
+                event_id, kind, data = item
+                if event_id <= sent:
+                    continue
+                if _match(data):
+                    yield format_event(event_id, kind, data)
+        finally:
+            self._subscribers.discard(q)
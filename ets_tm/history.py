@@ -0,0 +1,301 @@
+import csv
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+# (resolution seconds, retention seconds); 0 is the raw sample level.
+RAW_RETENTION = 2 * 3600
+ROLLUPS = ((60, 24 * 3600), (3600, 30 * 86400))
+MAX_POINTS = 1000
+LOG_BACKUPS = 3
+# Windows of the log summary, (label, seconds).
+SUMMARY_WINDOWS = (("1h", 3600), ("24h", 86400))
+
+# Rollup bucket layout: [up, down, rtt_count, rtt_sum, rtt_min, rtt_max]
+_UP, _DOWN, _N, _SUM, _MIN, _MAX = range(6)
+
+
+def _new_bucket() -> List[float]:
+    return [0, 0, 0, 0.0, math.inf, -math.inf]
+
+
+def _add(bucket: List[float], is_up: bool, rtt: Optional[float]) -> None:
+    bucket[_UP if is_up else _DOWN] += 1
+    if rtt is not None:
+        bucket[_N] += 1
+        bucket[_SUM] += rtt
+        if rtt < bucket[_MIN]:
+            bucket[_MIN] = rtt
+        if rtt > bucket[_MAX]:
+            bucket[_MAX] = rtt
+
+
+def _merge(into: List[float], other: List[float]) -> None:
+    into[_UP] += other[_UP]
+    into[_DOWN] += other[_DOWN]
+    into[_N] += other[_N]
+    into[_SUM] += other[_SUM]
+    into[_MIN] = min(into[_MIN], other[_MIN])
+    into[_MAX] = max(into[_MAX], other[_MAX])
+
+
+def parse_log_row(line: str) -> Optional[Tuple[str, float, bool, Optional[float]]]:
+    # date;group;name;host;service;port;status;ping;uptime -> (key, ts, up, rtt)
+    line = line.strip()
+    if not line or line.startswith("date;"):
+        return None
+    try:
+        parts = next(csv.reader([line], delimiter=";"))
+        if len(parts) < 8 or parts[6] not in ("UP", "DOWN"):
+            return None
+        # Rows are written with local wall-clock time and no offset.
+        ts = datetime.fromisoformat(parts[0]).timestamp()
+        rtt = None if parts[7] in ("", "-") else float(parts[7])
+    except Exception:
+        return None
+    return (f"{parts[3]}:{parts[5]}:{parts[4]}", ts, parts[6] == "UP", rtt)
+
+
+def agent_log_row(agent: str, key: str, ts: float, is_up: bool, rtt: Optional[float]) -> List[str]:
+    # date;agent;key;status;ping, local wall-clock time like the probe log.
+    return [
+        datetime.fromtimestamp(ts).isoformat(timespec="seconds"),
+        agent,
+        key,
+        "UP" if is_up else "DOWN",
+        "-" if rtt is None else f"{rtt:.1f}",
+    ]
+
+
+def parse_agent_row(line: str) -> Optional[Tuple[str, float, bool, Optional[float]]]:
+    # date;agent;key;status;ping -> ("<agent>/<key>", ts, up, rtt)
+    line = line.strip()
+    if not line or line.startswith("date;"):
+        return None
+    try:
+        parts = next(csv.reader([line], delimiter=";"))
+        if len(parts) < 5 or parts[3] not in ("UP", "DOWN"):
+            return None
+        ts = datetime.fromisoformat(parts[0]).timestamp()
+        rtt = None if parts[4] in ("", "-") else float(parts[4])
+    except Exception:
+        return None
+    return (f"{parts[1]}/{parts[2]}", ts, parts[3] == "UP", rtt)
+
+
+_Parser = Callable[[str], Optional[Tuple[str, float, bool, Optional[float]]]]
+
+
+class _Series:
+    __slots__ = ("raw", "levels")
+
+    def __init__(self) -> None:
+        self.raw: Deque[Tuple[float, bool, Optional[float]]] = deque()
+        # Per rollup level: bucket start -> bucket, plus starts in order for pruning.
+        self.levels: List[Tuple[Dict[int, List[float]], Deque[int]]] = [({}, deque()) for _ in ROLLUPS]
+
+
+class HistoryStore:
+    def __init__(self, raw_retention: float = RAW_RETENTION, max_points: int = MAX_POINTS) -> None:
+        self.raw_retention = float(raw_retention)
+        self.max_points = max(1, int(max_points))
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.Lock()
+        self._tail: Optional[Tuple[int, int]] = None  # (inode, offset) of the live log
+        # Keys seen in the log, as opposed to ones added directly (agents).
+        self._logged: Set[str] = set()
+
+    def add(self, key: str, ts: float, is_up: bool, rtt: Optional[float]) -> None:
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.raw.append((ts, is_up, rtt))
+            horizon = ts - self.raw_retention
+            while series.raw and series.raw[0][0] < horizon:
+                series.raw.popleft()
+            for (res, retention), (buckets, order) in zip(ROLLUPS, series.levels):
+                start = int(ts // res) * res
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = _new_bucket()
+                    order.append(start)
+                    while order and order[0] < ts - retention:
+                        buckets.pop(order.popleft(), None)
+                _add(bucket, is_up, rtt)
+
+    def _ingest(self, lines: Iterable[str], parse: Optional[_Parser] = None) -> int:
+        # Rows of the probe log by default; other parsers (agent rows) do not
+        # count as logged servers.
+        n = 0
+        for line in lines:
+            row = (parse or parse_log_row)(line)
+            if row is not None:
+                self.add(*row)
+                if parse is None:
+                    self._logged.add(row[0])
+                n += 1
+        return n
+
+    def load_log(self, path: str, backups: int = LOG_BACKUPS) -> int:
+        # One-off backfill from the rotated logs (oldest first); afterwards
+        # tail_log() only reads what was appended since.
+        n = 0
+        for fp in [f"{path}.{i}" for i in range(backups, 0, -1)]:
+            n += self._read_from(fp, 0)[0]
+        self._tail = None
+        return n + self.tail_log(path)
+
+    def load_agent_log(self, path: str, backups: int = LOG_BACKUPS) -> int:
+        # Backfill of rows ingested from agents; the API adds new ones
+        # directly, so this file is never tailed.
+        n = 0
+        for fp in [f"{path}.{i}" for i in range(backups, 0, -1)] + [path]:
+            n += self._read_from(fp, 0, parse_agent_row)[0]
+        return n
+
+    def _read_from(self, fp: str, offset: int, parse: Optional[_Parser] = None) -> Tuple[int, int]:
+        # Ingests complete lines after `offset`; returns (rows, new offset).
+        # A partial trailing row is left for the next read.
+        try:
+            with open(fp, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return 0, offset
+        end = data.rfind(b"\n") + 1
+        return self._ingest(data[:end].decode("utf-8", "replace").splitlines(), parse), offset + end
+
+    def tail_log(self, path: str) -> int:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        n = 0
+        ino, offset = self._tail if self._tail else (st.st_ino, 0)
+        if ino != st.st_ino:
+            # Rotated: finish the old file (now path.1) before the new one.
+            old = f"{path}.1"
+            try:
+                if os.stat(old).st_ino == ino:
+                    n += self._read_from(old, offset)[0]
+            except OSError:
+                pass
+            offset = 0
+        elif st.st_size < offset:
+            offset = 0
+        rows, offset = self._read_from(path, offset)
+        self._tail = (st.st_ino, offset)
+        return n + rows
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._series)
+
+    def query(
+        self,
+        keys: List[str],
+        start: float,
+        end: float,
+        step: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        end = max(end, start)
+        span = max(1.0, end - start)
+        step = float(step) if step and step > 0 else span / min(self.max_points, 100)
+        # Bound the response: never more than max_points buckets.
+        step = max(step, math.ceil(span / self.max_points))
+        step = max(1.0, step)
+        resolution = self._resolution(step, start, time.time() if now is None else now)
+        n_points = int(math.ceil(span / step))
+        out = [_new_bucket() for _ in range(n_points)]
+
+        def _slot(ts: float) -> Optional[int]:
+            if ts < start or ts >= end:
+                return None
+            return min(n_points - 1, int((ts - start) // step))
+
+        with self._lock:
+            for key in keys:
+                series = self._series.get(key)
+                if series is None:
+                    continue
+                if resolution == 0:
+                    for ts, is_up, rtt in series.raw:
+                        i = _slot(ts)
+                        if i is not None:
+                            _add(out[i], is_up, rtt)
+                    continue
+                level = [r for r, _ in ROLLUPS].index(resolution)
+                buckets = series.levels[level][0]
+                t = int(start // resolution) * resolution
+                while t < end:
+                    bucket = buckets.get(t)
+                    if bucket is not None:
+                        i = _slot(max(t, start))
+                        if i is not None:
+                            _merge(out[i], bucket)
+                    t += resolution
+
+        points = []
+        for i, b in enumerate(out):
+            total = b[_UP] + b[_DOWN]
+            points.append({
+                "t": start + i * step,
+                "up": int(b[_UP]),
+                "down": int(b[_DOWN]),
+                "uptime": (b[_UP] / total * 100.0) if total else None,
+                "rtt_avg": (b[_SUM] / b[_N]) if b[_N] else None,
+                "rtt_min": b[_MIN] if b[_N] else None,
+                "rtt_max": b[_MAX] if b[_N] else None,
+            })
+        return {"from": start, "to": end, "step": step, "resolution": resolution, "points": points}
+
+    def summary(self, keys: Optional[Iterable[str]] = None, now: Optional[float] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        # Up/down counts, average RTT and uptime over SUMMARY_WINDOWS, by
+        # default for every server in the log. Built from the rollups: whole
+        # hours from the coarse level, the leading partial hour from minutes.
+        now = time.time() if now is None else now
+        (fine, _), (coarse, _) = ROLLUPS[0], ROLLUPS[-1]
+        out: Dict[str, Dict[str, Optional[float]]] = {}
+        with self._lock:
+            series = [self._series[k] for k in (self._logged if keys is None else keys) if k in self._series]
+            for label, window in SUMMARY_WINDOWS:
+                since = now - window
+                edge = int(math.ceil(since / coarse)) * coarse
+                total = _new_bucket()
+                for s in series:
+                    minutes, hours = s.levels[0][0], s.levels[-1][0]
+                    for t in range(int(since // fine) * fine, edge, fine):
+                        b = minutes.get(t)
+                        if b is not None:
+                            _merge(total, b)
+                    for t in range(edge, int(now) + 1, coarse):
+                        b = hours.get(t)
+                        if b is not None:
+                            _merge(total, b)
+                n = total[_UP] + total[_DOWN]
+                out[label] = {
+                    "up": int(total[_UP]),
+                    "down": int(total[_DOWN]),
+                    "avg_ping": (total[_SUM] / total[_N]) if total[_N] else None,
+                    "uptime": (total[_UP] / n * 100.0) if n else None,
+                }
+        return out
+
+    def _resolution(self, step: float, start: float, now: float) -> int:
+        # Coarsest level that still fits inside one step and reaches back to
+        # `start`; falls back to coarser levels when finer data has expired.
+        levels = [(0, self.raw_retention)] + list(ROLLUPS)
+        fitting = [(res, ret) for res, ret in levels if res <= step]
+        for res, ret in reversed(fitting):
+            if now - start <= ret:
+                return res
+        for res, ret in levels:
+            if now - start <= ret:
+                return res
+        return ROLLUPS[-1][0]
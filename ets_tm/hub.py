@@ -0,0 +1,186 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import codec
+from .state import STATE_POLL_INTERVAL, StateService
+
+HUB_QUEUE_SIZE = 64
+# Result notifications arriving closer together than this are folded into
+# one delta, so a probe cycle produces a handful of messages, not one per server.
+HUB_MIN_INTERVAL = 0.1
+
+
+def _diff(
+    prev: Dict[str, Any], cur: Dict[str, Any], same: Callable[[Any, Any], bool]
+) -> Tuple[Dict[str, Any], List[str]]:
+    changed = {k: v for k, v in cur.items() if k not in prev or not same(prev[k], v)}
+    removed = [k for k in prev if k not in cur]
+    return changed, removed
+
+
+class Frame:
+    # One hub message; each wire encoding is produced at most once and then
+    # shared by every subscriber that asked for it.
+    __slots__ = ("payload", "_text", "_packed")
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        self._text: Optional[str] = None
+        self._packed: Optional[bytes] = None
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = codec.dumps(self.payload)
+        return self._text
+
+    def packed(self) -> bytes:
+        if self._packed is None:
+            self._packed = codec.packb(self.payload)
+        return self._packed
+
+
+class BroadcastHub:
+    def __init__(
+        self,
+        state: StateService,
+        interval: float = STATE_POLL_INTERVAL,
+        queue_size: int = HUB_QUEUE_SIZE,
+        min_interval: float = HUB_MIN_INTERVAL,
+    ) -> None:
+        self.state = state
+        self.interval = max(0.05, float(interval))
+        self.queue_size = max(2, int(queue_size))
+        self.min_interval = max(0.0, float(min_interval))
+        self.seq = 0
+        self.dropped = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._servers_ver: Optional[int] = None
+        self._stats_ver: Optional[int] = None
+        self._results_ver: Optional[int] = None
+        self._servers: List[Dict[str, Any]] = []
+        self._stats: Dict[str, Any] = {}
+        self._results: Dict[str, Any] = {}
+        self._snapshot: Optional[Frame] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = False
+        self._capture()
+
+    def _capture(self) -> None:
+        st = self.state
+        self._servers_ver = st.versions.get("servers")
+        self._stats_ver = st.versions.get("stats")
+        self._results_ver = st.results.version
+        self._servers = st.servers
+        self._stats = dict(st.stats)
+        self._results = st.results.snapshot()
+
+    def snapshot(self) -> Frame:
+        if self._snapshot is None:
+            self._snapshot = Frame({
+                "type": "snapshot",
+                "seq": self.seq,
+                "servers": self._servers,
+                "stats": self._stats,
+                "results": self._results,
+            })
+        return self._snapshot
+
+    def subscribe(self) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        q.put_nowait(self.snapshot())
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._subscribers.discard(q)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _on_result(self, entry: Dict[str, Any]) -> None:
+        # May run on a probe thread; only the first notification per batch
+        # crosses into the loop.
+        if self._pending or self._loop is None or self._wake is None:
+            return
+        self._pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass
+
+    def poll(self) -> Optional[Frame]:
+        st = self.state
+        results = st.results
+        if (
+            st.versions.get("servers") == self._servers_ver
+            and st.versions.get("stats") == self._stats_ver
+            and results.version == self._results_ver
+        ):
+            return None
+        delta: Dict[str, Any] = {}
+        if st.versions.get("servers") != self._servers_ver:
+            self._servers_ver = st.versions.get("servers")
+            if st.servers != self._servers:
+                delta["servers"] = st.servers
+            self._servers = st.servers
+        if st.versions.get("stats") != self._stats_ver:
+            self._stats_ver = st.versions.get("stats")
+            cur = dict(st.stats)
+            changed, removed = _diff(self._stats, cur, lambda a, b: a == b)
+            if changed:
+                delta["stats"] = changed
+            if removed:
+                delta["stats_removed"] = removed
+            self._stats = cur
+        if results.version != self._results_ver:
+            self._results_ver = results.version
+            cur = results.snapshot()
+            # Entries are replaced, never mutated, so identity marks a change.
+            changed, removed = _diff(self._results, cur, lambda a, b: a is b)
+            if changed:
+                delta["results"] = changed
+            if removed:
+                delta["results_removed"] = removed
+            self._results = cur
+        if not delta:
+            return None
+        self.seq += 1
+        self._snapshot = None
+        delta["type"] = "delta"
+        delta["seq"] = self.seq
+        frame = Frame(delta)
+        self._publish(frame)
+        return frame
+
+    def _publish(self, frame: Frame) -> None:
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(frame)
+            except asyncio.QueueFull:
+                # A slow client: drop its backlog and resync it with a snapshot.
+                self.dropped += q.qsize()
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(self.snapshot())
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.state.results.subscribe(self._on_result)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                self._pending = False
+                try:
+                    self.poll()
+                except Exception:
+                    pass
+                if self.min_interval:
+                    await asyncio.sleep(self.min_interval)
+        finally:
+            self.state.results.unsubscribe(self._on_result)
@@ -0,0 +1,75 @@
+import string
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_FORMATTER = string.Formatter()
+
+# (literal, field name, format spec, conversion) as produced by Formatter.parse
+_Part = Tuple[str, Optional[str], str, Optional[str]]
+_Entry = Union[str, Tuple[str, Optional[List[_Part]]]]
+
+
+def _compile(template: str) -> _Entry:
+    try:
+        parts = list(_FORMATTER.parse(template))
+    except ValueError:
+        return (template, None)
+    if all(field is None for _, field, _, _ in parts):
+        # No placeholders: resolve escapes once, exactly as str.format() would.
+        return template.format()
+    for _, field, spec, _ in parts:
+        if field is not None and (not field.isidentifier() or "{" in (spec or "")):
+            # Positional/attribute/index or nested fields keep the generic path.
+            return (template, None)
+    return (template, [(lit, field, spec or "", conv) for lit, field, spec, conv in parts])
+
+
+class Translator:
+    def __init__(self, lang: Dict[str, str], fallback: Optional[Dict[str, str]] = None) -> None:
+        self.version = 0
+        self._table: Dict[str, _Entry] = {}
+        self.load(lang, fallback)
+
+    def load(self, lang: Dict[str, str], fallback: Optional[Dict[str, str]] = None) -> None:
+        merged: Dict[str, Any] = dict(fallback or {})
+        merged.update(lang)
+        self._table = {k: _compile(v) for k, v in merged.items() if isinstance(v, str)}
+        self.version += 1
+
+    def __call__(self, key: str, **kwargs: Any) -> str:
+        entry = self._table.get(key)
+        if entry is None:
+            if "{" not in key and "}" not in key:
+                # Cache misses too (e.g. unknown service names looked up per row).
+                self._table[key] = key
+                return key
+            try:
+                return key.format(**kwargs)
+            except Exception:
+                return key
+        if isinstance(entry, str):
+            return entry
+        template, parts = entry
+        if not kwargs:
+            return template
+        if parts is None:
+            try:
+                return template.format(**kwargs)
+            except Exception:
+                return template
+        out: List[str] = []
+        try:
+            for lit, field, spec, conv in parts:
+                out.append(lit)
+                if field is None:
+                    continue
+                val = kwargs[field]
+                if conv == "r":
+                    val = repr(val)
+                elif conv == "s":
+                    val = str(val)
+                elif conv == "a":
+                    val = ascii(val)
+                out.append(format(val, spec))
+        except Exception:
+            return template
+        return "".join(out)
@@ -0,0 +1,228 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .results import ResultStore
+
+# Seconds, for cycle duration and log write latency.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Milliseconds, for per-server RTT.
+RTT_BUCKETS_MS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Sequence[Tuple[str, Any]]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, b in enumerate(self.bounds):
+            if value <= b:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str, out: List[str]) -> None:
+        sep = "," if labels else ""
+        acc = 0
+        for b, c in zip(self.bounds, self.counts):
+            acc += c
+            out.append(f'{name}_bucket{{{labels}{sep}le="{_num(b)}"}} {acc}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        out.append(f"{name}_sum{suffix} {_num(self.sum)}")
+        out.append(f"{name}_count{suffix} {self.count}")
+
+
+class ProbeMetrics:
+    # Counters and gauges describing the probe engine itself.
+    def __init__(self) -> None:
+        self.cycles_total = 0
+        self.probes_total = 0
+        self.last_cycle_seconds = 0.0
+        self.last_probes_per_second = 0.0
+        self.inflight = 0
+        self.threads_busy = 0
+        # Size of the probe monitor's own thread pool (BackgroundMonitor._pool).
+        self.threads_max = 0
+        self.cycles_failed_total = 0
+        self.overruns_total = 0
+        self.confirmations_total = 0
+        self.flaps_suppressed_total = 0
+        self.skipped_cycles_total = 0
+        self.breakers_open = 0
+        self.breaker_skips_total = 0
+        self.unreachable_total = 0
+        self.shared_probes_total = 0
+        self.cycle_seconds = Histogram(DURATION_BUCKETS)
+        # How far behind its fixed-rate tick each cycle started.
+        self.cycle_lateness_seconds = Histogram(DURATION_BUCKETS)
+        self.log_write_seconds = Histogram(DURATION_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe_cycle(self, seconds: float, probes: int) -> None:
+        with self._lock:
+            self.cycles_total += 1
+            self.probes_total += probes
+            self.last_cycle_seconds = seconds
+            self.last_probes_per_second = probes / seconds if seconds > 0 else 0.0
+            self.cycle_seconds.observe(seconds)
+
+    def observe_failure(self) -> None:
+        with self._lock:
+            self.cycles_failed_total += 1
+
+    def observe_schedule(self, lateness: float, overruns: int, skipped: int) -> None:
+        with self._lock:
+            self.cycle_lateness_seconds.observe(lateness)
+            self.overruns_total += overruns
+            self.skipped_cycles_total += skipped
+
+    def observe_confirm(self, suppressed: bool) -> None:
+        # One status change re-probed; suppressed if it did not hold.
+        with self._lock:
+            self.confirmations_total += 1
+            if suppressed:
+                self.flaps_suppressed_total += 1
+
+    def observe_breakers(self, open_count: int, skipped: int) -> None:
+        with self._lock:
+            self.breakers_open = open_count
+            self.breaker_skips_total += skipped
+
+    def observe_unreachable(self, count: int) -> None:
+        # Probes not sent because a parent was down.
+        with self._lock:
+            self.unreachable_total += count
+
+    def observe_shared(self) -> None:
+        # A ping or port check answered by another entry on the same address.
+        with self._lock:
+            self.shared_probes_total += 1
+
+    def observe_log_write(self, seconds: float) -> None:
+        with self._lock:
+            self.log_write_seconds.observe(seconds)
+
+    def render(self, out: List[str]) -> None:
+        with self._lock:
+            out.append("# TYPE ets_tm_probe_cycles_total counter")
+            out.append(f"ets_tm_probe_cycles_total {self.cycles_total}")
+            out.append("# TYPE ets_tm_probe_cycles_failed_total counter")
+            out.append(f"ets_tm_probe_cycles_failed_total {self.cycles_failed_total}")
+            out.append("# TYPE ets_tm_probes_total counter")
+            out.append(f"ets_tm_probes_total {self.probes_total}")
+            out.append("# TYPE ets_tm_probe_cycle_last_seconds gauge")
+            out.append(f"ets_tm_probe_cycle_last_seconds {_num(self.last_cycle_seconds)}")
+            out.append("# TYPE ets_tm_probes_per_second gauge")
+            out.append(f"ets_tm_probes_per_second {_num(self.last_probes_per_second)}")
+            out.append("# TYPE ets_tm_probes_inflight gauge")
+            out.append(f"ets_tm_probes_inflight {self.inflight}")
+            out.append("# TYPE ets_tm_executor_threads_busy gauge")
+            out.append(f"ets_tm_executor_threads_busy {self.threads_busy}")
+            out.append("# TYPE ets_tm_executor_saturation_ratio gauge")
+            out.append(f"ets_tm_executor_saturation_ratio {_num(min(1.0, self.threads_busy / self.threads_max) if self.threads_max else 0.0)}")
+            out.append("# TYPE ets_tm_probe_cycle_seconds histogram")
+            self.cycle_seconds.render("ets_tm_probe_cycle_seconds", "", out)
+            out.append("# TYPE ets_tm_probe_cycle_overruns_total counter")
+            out.append(f"ets_tm_probe_cycle_overruns_total {self.overruns_total}")
+            out.append("# TYPE ets_tm_probe_cycles_skipped_total counter")
+            out.append(f"ets_tm_probe_cycles_skipped_total {self.skipped_cycles_total}")
+            out.append("# TYPE ets_tm_status_confirmations_total counter")
+            out.append(f"ets_tm_status_confirmations_total {self.confirmations_total}")
+            out.append("# TYPE ets_tm_status_flaps_suppressed_total counter")
+            out.append(f"ets_tm_status_flaps_suppressed_total {self.flaps_suppressed_total}")
+            out.append("# TYPE ets_tm_breakers_open gauge")
+            out.append(f"ets_tm_breakers_open {self.breakers_open}")
+            out.append("# TYPE ets_tm_breaker_skipped_probes_total counter")
+            out.append(f"ets_tm_breaker_skipped_probes_total {self.breaker_skips_total}")
+            out.append("# TYPE ets_tm_unreachable_skipped_probes_total counter")
+            out.append(f"ets_tm_unreachable_skipped_probes_total {self.unreachable_total}")
+            out.append("# TYPE ets_tm_shared_probes_total counter")
+            out.append(f"ets_tm_shared_probes_total {self.shared_probes_total}")
+            out.append("# TYPE ets_tm_probe_cycle_lateness_seconds histogram")
+            self.cycle_lateness_seconds.render("ets_tm_probe_cycle_lateness_seconds", "", out)
+            out.append("# TYPE ets_tm_log_write_seconds histogram")
+            self.log_write_seconds.render("ets_tm_log_write_seconds", "", out)
+
+
+class RttHistograms:
+    # Subscribed to a ResultStore; one RTT histogram per server key.
+    def __init__(self, bounds: Sequence[float] = RTT_BUCKETS_MS) -> None:
+        self.bounds = tuple(bounds)
+        self._hists: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, entry: Dict[str, Any]) -> None:
+        rtt = entry.get("rtt")
+        if rtt is None:
+            return
+        key = str(entry.get("key", ""))
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = Histogram(self.bounds)
+            hist.observe(float(rtt))
+
+    def get(self, key: str) -> Optional[Histogram]:
+        return self._hists.get(key)
+
+
+def render_prometheus(
+    results: ResultStore,
+    servers: List[Dict[str, Any]],
+    server_key: Any,
+    probe: Optional[ProbeMetrics] = None,
+    rtt: Optional[RttHistograms] = None,
+) -> str:
+    snap = results.snapshot()
+    info = {server_key(s): s for s in servers}
+    rows = []
+    for key in sorted(snap):
+        srv = info.get(key, {})
+        labels = _labels((
+            ("server", key),
+            ("name", srv.get("name", "")),
+            ("group", srv.get("group") or ""),
+            ("service", srv.get("service", key.rsplit(":", 1)[-1])),
+        ))
+        rows.append((key, labels, snap[key]))
+
+    out: List[str] = []
+    out.append("# HELP ets_tm_server_up 1 if the last check found the server up.")
+    out.append("# TYPE ets_tm_server_up gauge")
+    out.extend(f"ets_tm_server_up{{{lb}}} {1 if e.get('status') == 'UP' else 0}" for _, lb, e in rows)
+    out.append("# HELP ets_tm_server_rtt_ms Last ping round-trip time in milliseconds.")
+    out.append("# TYPE ets_tm_server_rtt_ms gauge")
+    out.extend(f"ets_tm_server_rtt_ms{{{lb}}} {_num(e['rtt'])}" for _, lb, e in rows if e.get("rtt") is not None)
+    out.append("# TYPE ets_tm_server_uptime_percent gauge")
+    out.extend(f"ets_tm_server_uptime_percent{{{lb}}} {_num(e['uptime'])}" for _, lb, e in rows if e.get("uptime") is not None)
+    out.append("# TYPE ets_tm_server_last_check_timestamp_seconds gauge")
+    out.extend(f"ets_tm_server_last_check_timestamp_seconds{{{lb}}} {_num(e['checked_at'])}" for _, lb, e in rows if e.get("checked_at"))
+    if rtt is not None:
+        out.append("# HELP ets_tm_server_rtt_histogram_ms Ping round-trip time distribution in milliseconds.")
+        out.append("# TYPE ets_tm_server_rtt_histogram_ms histogram")
+        for key, lb, _ in rows:
+            hist = rtt.get(key)
+            if hist is not None:
+                hist.render("ets_tm_server_rtt_histogram_ms", lb, out)
+    if probe is not None:
+        probe.render(out)
+    out.append("")
+    return "\n".join(out)
@@ -0,0 +1,173 @@
+import gzip
+import http.client
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import codec
+
+DEFAULT_TIMEOUT = 3.0
+POOL_SIZE = 4
+# After a failed request the API is not contacted again for this long;
+# callers get the last good body instead of waiting on another timeout.
+FAILURE_BACKOFF = 5.0
+CACHE_SIZE = 64
+
+_RETRYABLE = (http.client.RemoteDisconnected, http.client.CannotSendRequest, BrokenPipeError, ConnectionResetError)
+
+
+class RemoteError(Exception):
+    pass
+
+
+class RemoteClient:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = POOL_SIZE,
+        backoff: float = FAILURE_BACKOFF,
+    ) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if self.https else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = float(timeout)
+        self.pool_size = max(1, int(pool_size))
+        self.backoff = float(backoff)
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self._down_until = 0.0
+        self._idle: List[http.client.HTTPConnection] = []
+        self._cache: "OrderedDict[str, Tuple[float, str, bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            if reusable and len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _request(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes] = None) -> Tuple[int, Dict[str, str], bytes]:
+        for attempt in range(2):
+            conn, reused = self._connection()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except _RETRYABLE:
+                conn.close()
+                # A pooled connection the server has since closed; retry once fresh.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            out = {k.lower(): v for k, v in resp.getheaders()}
+            self._release(conn, not resp.will_close)
+            if out.get("content-encoding") == "gzip":
+                data = gzip.decompress(data)
+            return resp.status, out, data
+        raise RemoteError("unreachable")
+
+    def _failed(self, err: BaseException) -> None:
+        self.healthy = False
+        self.last_error = str(err) or err.__class__.__name__
+        self._down_until = time.monotonic() + self.backoff
+
+    def get(self, path: str, max_age: float = 0.0) -> Tuple[Any, Dict[str, str]]:
+        # Returns (data, headers). Bodies younger than max_age are served from
+        # the cache; older ones are revalidated with If-None-Match. While the
+        # API is failing the last good body is returned instead of an error.
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is not None and now - cached[0] < max_age:
+            return codec.loads(cached[2]), cached[3]
+        if now < self._down_until:
+            if cached is not None:
+                return codec.loads(cached[2]), cached[3]
+            raise RemoteError(self.last_error or "unavailable")
+        headers = {"Accept-Encoding": "gzip", "Accept": "application/json"}
+        if cached is not None:
+            headers["If-None-Match"] = cached[1]
+        try:
+            status, out, body = self._request("GET", path, headers)
+            if status >= 500:
+                raise RemoteError(f"HTTP {status}")
+        except Exception as e:
+            self._failed(e)
+            if cached is not None:
+                return codec.loads(cached[2]), cached[3]
+            raise RemoteError(self.last_error) from e
+        self.healthy = True
+        self.last_error = None
+        if status == 304 and cached is not None:
+            body = cached[2]
+            out = dict(cached[3], **out)
+        elif status != 200:
+            raise RemoteError(f"HTTP {status}")
+        etag = out.get("etag", "")
+        with self._lock:
+            self._cache.pop(path, None)
+            self._cache[path] = (time.monotonic(), etag, body, out)
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return codec.loads(body), out
+
+    def post(self, path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, Any]:
+        # Uncached; errors propagate so the caller decides whether to retry.
+        status, out, data = self._request("POST", path, headers, body)
+        try:
+            return status, codec.loads(data) if data else None
+        except Exception:
+            return status, None
+
+    def cached(self, path: str) -> Any:
+        # Last good body for path without any network I/O; None if never fetched.
+        with self._lock:
+            entry = self._cache.get(path)
+        return None if entry is None else codec.loads(entry[2])
+
+    def get_json(self, path: str, max_age: float = 0.0) -> Any:
+        return self.get(path, max_age)[0]
+
+    def fetch_many(self, paths: Iterable[str], max_age: float = 0.0) -> Dict[str, Any]:
+        # Fetches in parallel over the pool; failed paths map to None.
+        paths = list(paths)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="ets-tm-remote")
+            executor = self._executor
+        futures = {p: executor.submit(self.get_json, p, max_age) for p in paths}
+        out: Dict[str, Any] = {}
+        for p, fut in futures.items():
+            try:
+                out[p] = fut.result()
+            except Exception:
+                out[p] = None
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -1,3 +1,4 @@
+import os
 from typing import Any, Dict, List, Optional, Callable
 from . import app_io
 
@@ -11,6 +12,7 @@ class FileRepository:
         settings_path: str,
         server_validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
         settings_validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        ingest_path: Optional[str] = None,
     ) -> None:
         self.servers_path = servers_path
         self.backup_path = backup_path
@@ -18,6 +20,9 @@ class FileRepository:
         self.settings_path = settings_path
         self.server_validator = server_validator
         self.settings_validator = settings_validator
+        # Agent stats live apart from the local prober's stats file, so the
+        # API never rewrites a file another process is updating.
+        self.ingest_path = ingest_path or os.path.splitext(stats_path)[0] + ".agents.json"
 
     def get_servers(self) -> List[Dict[str, Any]]:
         return app_io.load_servers(self.servers_path, self.backup_path, self.server_validator)
@@ -31,6 +36,12 @@ class FileRepository:
     def save_stats(self, stats: Dict[str, Dict[str, int]]) -> None:
         app_io.save_stats(self.stats_path, stats)
 
+    def get_ingest(self) -> Dict[str, Any]:
+        return app_io.load_ingest(self.ingest_path)
+
+    def save_ingest(self, data: Dict[str, Any]) -> None:
+        app_io.save_ingest(self.ingest_path, data)
+
     def get_settings(self, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         defaults = defaults or {}
         return app_io.load_settings(self.settings_path, defaults, self.settings_validator)
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+RTT_WINDOW = 64
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class ResultStore:
+    def __init__(self, window: int = RTT_WINDOW) -> None:
+        self.window = max(1, int(window))
+        self.version = 0
+        self.updated_at: Optional[float] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._rtts: Dict[str, Deque[float]] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            self._listeners.append(fn)
+
+    def unsubscribe(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def _notify(self, entry: Dict[str, Any]) -> None:
+        for fn in list(self._listeners):
+            try:
+                fn(entry)
+            except Exception:
+                pass
+
+    def record(
+        self,
+        key: str,
+        rtt: Optional[float],
+        is_up: bool,
+        uptime: Optional[float],
+        ts: Optional[float] = None,
+        breaker: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        now = time.time() if ts is None else float(ts)
+        status = status or ("UP" if is_up else "DOWN")
+        with self._lock:
+            prev = self._entries.get(key)
+            window = self._rtts.get(key)
+            if window is None:
+                window = deque(maxlen=self.window)
+                self._rtts[key] = window
+            if rtt is not None:
+                window.append(float(rtt))
+            changed_at = prev["changed_at"] if prev and prev.get("status") == status else now
+            entry = {
+                "key": key,
+                "status": status,
+                "rtt": rtt,
+                "p95": _percentile(list(window), 95.0),
+                "uptime": uptime,
+                "checked_at": now,
+                "changed_at": changed_at,
+                "breaker": breaker,
+            }
+            self._entries[key] = entry
+            self.version += 1
+            self.updated_at = now
+        self._notify(entry)
+        return entry
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        # Stores an entry computed elsewhere (e.g. received from the API).
+        key = str(entry.get("key", ""))
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = dict(entry)
+            self.version += 1
+            self.updated_at = entry.get("checked_at") or time.time()
+        self._notify(entry)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._entries)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.version += 1
+            self._rtts.pop(key, None)
@@ -0,0 +1,69 @@
+import time
+from typing import Callable
+
+# What to do when a cycle runs past its next tick:
+#   skip      drop the missed ticks and resume on the next one of the grid
+#   catch_up  run the missed ticks back to back until on schedule again
+#   stretch   start the next cycle right away and re-anchor the grid there
+OVERRUN_POLICIES = ("skip", "catch_up", "stretch")
+DEFAULT_OVERRUN_POLICY = "skip"
+# catch_up never queues more than this many missed ticks.
+MAX_CATCH_UP = 10
+
+
+class FixedRateSchedule:
+    # Ticks at start + n * interval on a monotonic clock, so the period does
+    # not grow with the time a cycle takes.
+    def __init__(
+        self,
+        interval: float,
+        policy: str = DEFAULT_OVERRUN_POLICY,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(f"unknown overrun policy: {policy!r}")
+        self.interval = float(interval)
+        self.policy = policy
+        self.clock = clock
+        self.next_at = clock()
+        self.last_lateness = 0.0
+        self.last_duration = 0.0
+        self.overruns = 0
+        self.skipped = 0
+        self._scheduled = self.next_at
+        self._started = self.next_at
+
+    def delay(self) -> float:
+        return max(0.0, self.next_at - self.clock())
+
+    def trigger(self) -> None:
+        # Make the next tick due now; the grid re-anchors on it.
+        self.next_at = min(self.next_at, self.clock())
+
+    def begin(self) -> float:
+        # Call when a cycle starts; returns how late it started.
+        now = self.clock()
+        self._scheduled = self.next_at
+        self._started = now
+        self.last_lateness = max(0.0, now - self._scheduled)
+        return self.last_lateness
+
+    def end(self) -> float:
+        # Call when the cycle is done; plans the next tick and returns the
+        # cycle duration.
+        now = self.clock()
+        self.last_duration = now - self._started
+        interval = max(1e-6, self.interval)
+        target = self._scheduled + interval
+        if now > target:
+            self.overruns += 1
+            if self.policy == "skip":
+                missed = int((now - target) // interval) + 1
+                self.skipped += missed
+                target += missed * interval
+            elif self.policy == "stretch":
+                target = now
+            else:
+                target = max(target, now - interval * MAX_CATCH_UP)
+        self.next_at = target
+        return self.last_duration
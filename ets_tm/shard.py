@@ -0,0 +1,250 @@
+import asyncio
+import bisect
+import hashlib
+import multiprocessing
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .background import CONFIRM_ATTEMPTS, CONFIRM_INTERVAL, BackgroundMonitor, server_key
+from .breaker import BREAKER_MAX_INTERVAL, BREAKER_THRESHOLD, CLOSED
+from .repo import FileRepository
+from .results import ResultStore
+from .schedule import DEFAULT_OVERRUN_POLICY
+from .services import MonitoringService
+
+# Virtual nodes per worker on the hash ring.
+SHARD_REPLICAS = 64
+# How often the supervisor checks that busy workers are still alive.
+WORKER_POLL_INTERVAL = 1.0
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    # Consistent hashing of server keys onto worker indexes: a server's shard
+    # depends only on its own key, so inventory edits touch one shard.
+    def __init__(self, nodes: int, replicas: int = SHARD_REPLICAS) -> None:
+        points = sorted((_hash(f"{n}#{r}"), n) for n in range(max(1, nodes)) for r in range(max(1, replicas)))
+        self._points = [p for p, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def node_for(self, key: str) -> int:
+        i = bisect.bisect(self._points, _hash(key))
+        return self._nodes[i % len(self._nodes)]
+
+
+def _worker_main(conn: Connection, config: Dict[str, Any]) -> None:
+    # Probe-only worker: holds its shard, probes it on request and sends
+    # (rtt, port_ok) pairs back in shard order, None for servers the
+    # supervisor's breakers skipped. No logs, no stats.
+    svc = MonitoringService(
+        float(config["ping_timeout"]), float(config["port_timeout"]), bool(config["prefer_system_ping"])
+    )
+    mon = BackgroundMonitor(
+        None, svc, "", config["refresh_interval"], config["max_concurrent_checks"],
+        config["retry_attempts"], config["retry_base_delay"],
+    )
+    servers: List[Dict[str, Any]] = []
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            msg = conn.recv()
+            if msg[0] == "servers":
+                servers = msg[1]
+            elif msg[0] == "cycle":
+                mon.apply_settings(msg[2])
+                skip, mon._single_try = msg[3], msg[4]
+                todo = [s for s in servers if server_key(s) not in skip]
+                done = iter(loop.run_until_complete(mon._gather_batched(todo, mon.max_concurrent)))
+                conn.send(("results", msg[1], [
+                    None if server_key(s) in skip else next(done)[1:] for s in servers
+                ]))
+            elif msg[0] == "stop":
+                break
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass
+    finally:
+        loop.close()
+        conn.close()
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "shard")
+
+    def __init__(self, process: Any, conn: Connection) -> None:
+        self.process = process
+        self.conn = conn
+        # Last shard sent to this worker; only changed shards are resent.
+        self.shard: List[Dict[str, Any]] = []
+
+
+class ShardedMonitor(BackgroundMonitor):
+    # Supervisor mode: probing is spread over worker processes by consistent
+    # hash of server host, while this process stays the single aggregator that
+    # writes the log, stats and results (the inherited _commit).
+    def __init__(
+        self,
+        repo: FileRepository,
+        svc: MonitoringService,
+        log_path: str,
+        refresh_interval: float,
+        max_concurrent: int,
+        retry_attempts: int,
+        retry_base_delay: float,
+        workers: int = 2,
+        results: Optional[ResultStore] = None,
+        servers_provider: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        stats: Optional[Dict[str, Dict[str, int]]] = None,
+        log_status: Optional[Callable[[Dict[str, Any], bool, Optional[float], Optional[float]], None]] = None,
+        agent: Optional[Any] = None,
+        overrun_policy: str = DEFAULT_OVERRUN_POLICY,
+        confirm_attempts: int = CONFIRM_ATTEMPTS,
+        confirm_interval: float = CONFIRM_INTERVAL,
+        breaker_threshold: int = BREAKER_THRESHOLD,
+        breaker_max_interval: float = BREAKER_MAX_INTERVAL,
+    ) -> None:
+        super().__init__(
+            repo, svc, log_path, refresh_interval, max_concurrent, retry_attempts, retry_base_delay,
+            results=results, servers_provider=servers_provider, stats=stats, log_status=log_status, agent=agent,
+            overrun_policy=overrun_policy, confirm_attempts=confirm_attempts, confirm_interval=confirm_interval,
+            breaker_threshold=breaker_threshold, breaker_max_interval=breaker_max_interval,
+        )
+        self.workers = max(1, int(workers))
+        self.ring = HashRing(self.workers)
+        self._owner: Dict[str, int] = {}
+        self._pool: List[Optional[_Worker]] = [None] * self.workers
+        self._seq = 0
+        # spawn: workers must not inherit the supervisor's threads or loop.
+        self._ctx = multiprocessing.get_context("spawn")
+
+    def _config(self) -> Dict[str, Any]:
+        # The concurrency limit is global, so it is split across workers.
+        per_worker = -(-self.max_concurrent // self.workers)
+        return {
+            "ping_timeout": self.svc.ping_timeout,
+            "port_timeout": self.svc.port_timeout,
+            "prefer_system_ping": self.svc.prefer_system_ping,
+            "refresh_interval": self.refresh_interval,
+            "max_concurrent_checks": per_worker,
+            "retry_attempts": self.retry_attempts,
+            "retry_base_delay": self.retry_base_delay,
+            # Breakers live here; workers only get the skip/single-try sets.
+            "breaker_threshold": 0,
+        }
+
+    def partition(self, servers: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        shards: List[List[Dict[str, Any]]] = [[] for _ in range(self.workers)]
+        owner = self._owner
+        for srv in servers:
+            # Placed by host so entries sharing an address share one worker
+            # and, there, one ping per cycle.
+            key = str(srv.get("host", "")).lower()
+            node = owner.get(key)
+            if node is None:
+                node = owner[key] = self.ring.node_for(key)
+            shards[node].append(srv)
+        if len(owner) > 4 * max(1, len(servers)):
+            self._owner = {}
+        return shards
+
+    def _spawn(self, i: int) -> _Worker:
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_main, args=(child, self._config()), name=f"ets-tm-shard-{i}", daemon=True
+        )
+        proc.start()
+        child.close()
+        worker = self._pool[i] = _Worker(proc, parent)
+        return worker
+
+    def _retire(self, i: int) -> None:
+        worker = self._pool[i]
+        self._pool[i] = None
+        if worker is None:
+            return
+        try:
+            worker.conn.send(("stop",))
+        except Exception:
+            pass
+        worker.process.join(1.0)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(1.0)
+        worker.conn.close()
+
+    def _dispatch(
+        self, servers: List[Dict[str, Any]], due: Set[str]
+    ) -> List[Tuple[Dict[str, Any], Optional[float], bool]]:
+        # Probes the `due` keys of the inventory. Shards stay whole so they
+        # are not resent when a breaker opens or for each dependency level;
+        # servers sitting out travel as a key set instead.
+        self._seq += 1
+        seq = self._seq
+        config = self._config()
+        waiting: Dict[Connection, int] = {}
+        for i, shard in enumerate(self.partition(servers)):
+            worker = self._pool[i]
+            if worker is None or not worker.process.is_alive():
+                self._retire(i)
+                worker = self._spawn(i)
+            try:
+                if shard != worker.shard:
+                    worker.conn.send(("servers", shard))
+                    worker.shard = shard
+                if shard:
+                    keys = [server_key(s) for s in shard]
+                    skip = {k for k in keys if k not in due}
+                    single = {k for k in keys if k in due and self.breaker.state(k) != CLOSED}
+                    worker.conn.send(("cycle", seq, config, skip, single))
+                    waiting[worker.conn] = i
+            except OSError:
+                self._retire(i)
+        out: List[Tuple[Dict[str, Any], Optional[float], bool]] = []
+        while waiting:
+            for conn in wait(list(waiting), WORKER_POLL_INTERVAL):
+                i = waiting[conn]
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    del waiting[conn]
+                    self._retire(i)
+                    continue
+                if msg[1] != seq:
+                    continue  # late reply to an abandoned cycle
+                del waiting[conn]
+                worker = self._pool[i]
+                if worker is not None:
+                    out.extend((srv, r[0], bool(r[1])) for srv, r in zip(worker.shard, msg[2]) if r is not None)
+            # A crashed worker's shard is skipped this cycle; it respawns next.
+            for conn, i in list(waiting.items()):
+                worker = self._pool[i]
+                if worker is None or not worker.process.is_alive():
+                    del waiting[conn]
+                    self._retire(i)
+        return out
+
+    async def run_cycle(self) -> List[Tuple[Dict[str, Any], Optional[float], bool]]:
+        started = time.perf_counter()
+        inventory = await asyncio.to_thread(self._load_servers)
+        if not inventory:
+            return []
+        # Workers hold no status history; changes are confirmed here.
+        sem = asyncio.Semaphore(self.max_concurrent)
+
+        async def _probe(todo: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional[float], bool]]:
+            probed = await asyncio.to_thread(self._dispatch, inventory, {server_key(s) for s in todo})
+            return list(await asyncio.gather(*(self.confirm(r, sem) for r in probed)))
+
+        due, held = self._due(inventory)
+        results, unreachable = await self._probe_planned(inventory, due, _probe)
+        await asyncio.to_thread(self._commit, results, unreachable, held)
+        self.metrics.observe_cycle(time.perf_counter() - started, len(results))
+        return results
+
+    def close(self) -> None:
+        for i in range(self.workers):
+            self._retire(i)
+        super().close()
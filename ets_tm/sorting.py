@@ -0,0 +1,155 @@
+import heapq
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .results import ResultStore
+
+STATIC_SORT_KEYS = ["group", "name", "host", "service", "port"]
+LIVE_SORT_KEYS = ["ping", "p95", "uptime", "status", "last_change"]
+SORT_KEYS = STATIC_SORT_KEYS + LIVE_SORT_KEYS
+
+_STATUS_RANK = {"UP": 0, "DOWN": 1}
+# Heap selection is used while the requested prefix is small relative to the
+# candidate list; past that a full sort is cheaper and fully cacheable.
+_HEAP_RATIO = 4
+
+
+def inventory_fingerprint(servers: List[Dict[str, Any]]) -> int:
+    return hash(tuple(
+        (s.get("group"), s.get("name"), s.get("host"), s.get("service"), s.get("port")) for s in servers
+    ))
+
+
+def filter_indices(
+    servers: List[Dict[str, Any]],
+    default_group: str,
+    group: Optional[str] = None,
+    query: Optional[str] = None,
+    service: Optional[str] = None,
+) -> List[int]:
+    ql = query.lower() if query else None
+    out: List[int] = []
+    for i, s in enumerate(servers):
+        g = s.get("group", default_group)
+        if group and g != group:
+            continue
+        if service and s.get("service", "") != service:
+            continue
+        if ql and not (
+            ql in str(g).lower()
+            or ql in str(s.get("name", "")).lower()
+            or ql in str(s.get("host", "")).lower()
+            or ql in str(s.get("service", "")).lower()
+        ):
+            continue
+        out.append(i)
+    return out
+
+
+def static_sort_value(s: Dict[str, Any], sort_key: str, default_group: str) -> Any:
+    if sort_key == "group":
+        return s.get("group", default_group)
+    if sort_key == "host":
+        return s.get("host", "")
+    if sort_key == "service":
+        return s.get("service", "")
+    if sort_key == "port":
+        return int(s.get("port", 0))
+    return s.get("name", "")
+
+
+def live_sort_value(entry: Optional[Dict[str, Any]], sort_key: str, desc: bool) -> Tuple[int, float]:
+    # Servers without a value always sort last, whatever the direction.
+    if entry is None:
+        return (1, 0.0)
+    if sort_key == "ping":
+        v = entry.get("rtt")
+    elif sort_key == "p95":
+        v = entry.get("p95")
+    elif sort_key == "uptime":
+        v = entry.get("uptime")
+    elif sort_key == "status":
+        v = _STATUS_RANK.get(str(entry.get("status")), len(_STATUS_RANK))
+    else:
+        v = entry.get("changed_at")
+    if v is None:
+        return (1, 0.0)
+    return (0, -float(v) if desc else float(v))
+
+
+class SortIndex:
+    def __init__(self) -> None:
+        self._filtered: Optional[Tuple[Hashable, List[int]]] = None
+        self._orders: Dict[Tuple[str, bool], Tuple[Hashable, List[int], bool]] = {}
+
+    def invalidate(self) -> None:
+        self._filtered = None
+        self._orders.clear()
+
+    def _candidates(self, servers: List[Dict[str, Any]], token: Hashable, default_group: str, filters: Tuple[Optional[str], Optional[str], Optional[str]]) -> List[int]:
+        if self._filtered is not None and self._filtered[0] == token:
+            return self._filtered[1]
+        group, query, service = filters
+        idx = filter_indices(servers, default_group, group, query, service)
+        self._filtered = (token, idx)
+        return idx
+
+    def _order(
+        self,
+        servers: List[Dict[str, Any]],
+        candidates: List[int],
+        sort_key: str,
+        desc: bool,
+        token: Hashable,
+        stop: int,
+        default_group: str,
+        server_key: Callable[[Dict[str, Any]], str],
+        results: Optional[ResultStore],
+    ) -> List[int]:
+        cached = self._orders.get((sort_key, desc))
+        if cached is not None and cached[0] == token and (cached[2] or stop <= len(cached[1])):
+            return cached[1]
+        reverse = False
+        if sort_key in LIVE_SORT_KEYS:
+            snap = results.snapshot() if results is not None else {}
+            def _key(i: int) -> Any:
+                return live_sort_value(snap.get(server_key(servers[i])), sort_key, desc)
+        else:
+            reverse = desc
+            def _key(i: int) -> Any:
+                return static_sort_value(servers[i], sort_key, default_group)
+        n = len(candidates)
+        if stop * _HEAP_RATIO < n:
+            pick = heapq.nlargest if reverse else heapq.nsmallest
+            order = pick(stop, candidates, key=_key)
+            complete = False
+        else:
+            order = sorted(candidates, key=_key, reverse=reverse)
+            complete = True
+        self._orders[(sort_key, desc)] = (token, order, complete)
+        return order
+
+    def view(
+        self,
+        servers: List[Dict[str, Any]],
+        sort_key: str,
+        desc: bool,
+        start: int,
+        stop: int,
+        default_group: str,
+        server_key: Callable[[Dict[str, Any]], str],
+        results: Optional[ResultStore] = None,
+        filters: Tuple[Optional[str], Optional[str], Optional[str]] = (None, None, None),
+        inventory_version: Optional[Hashable] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        if sort_key not in SORT_KEYS:
+            sort_key = "name"
+        inv = inventory_version if inventory_version is not None else inventory_fingerprint(servers)
+        base = (inv, len(servers), default_group, filters)
+        candidates = self._candidates(servers, base, default_group, filters)
+        token: Hashable = base
+        if sort_key in LIVE_SORT_KEYS:
+            token = (base, results.version if results is not None else None)
+        start = max(0, start)
+        stop = max(start, min(stop, len(candidates)))
+        order = self._order(servers, candidates, sort_key, desc, token, stop, default_group, server_key, results)
+        return [servers[i] for i in order[start:stop]], len(candidates)
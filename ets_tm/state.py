@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import codec
+from .background import server_key
+from .history import HistoryStore
+from .repo import FileRepository
+from .results import ResultStore
+from .sorting import SortIndex
+from . import app_io
+
+STATE_POLL_INTERVAL = 1.0
+# Minimum age of the log summary before a request recomputes it.
+SUMMARY_MAX_AGE = 5.0
+# Distinct filter combinations that keep their own cached sort orders.
+SORT_INDEX_SLOTS = 32
+# Agent batch ids remembered for idempotent ingestion.
+INGEST_SEEN_SIZE = 10000
+
+
+class StateService:
+    def __init__(
+        self,
+        repo: FileRepository,
+        defaults: Dict[str, Any],
+        history: Optional[HistoryStore] = None,
+        results: Optional[ResultStore] = None,
+    ) -> None:
+        self.repo = repo
+        self.defaults = defaults
+        self.history = history
+        self.results = results or ResultStore()
+        self.servers: List[Dict[str, Any]] = []
+        self.settings: Dict[str, Any] = dict(defaults)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.summary: Dict[str, Dict[str, Optional[float]]] = {}
+        self.versions: Dict[str, int] = {"servers": 0, "settings": 0, "stats": 0, "summary": 0}
+        self._files: Dict[str, Any] = {}
+        self._encoded: Dict[str, Tuple[int, str, bytes]] = {}
+        self._indexes: "OrderedDict[Tuple[Optional[str], ...], SortIndex]" = OrderedDict()
+        self._batches: "OrderedDict[str, int]" = OrderedDict()
+        # Stats shipped by remote agents (keys "<agent>/<server key>"); served
+        # together with the local stats.
+        self._agent_stats: Dict[str, Dict[str, int]] = {}
+        self._summary_at: Optional[float] = None
+        self._write_lock = asyncio.Lock()
+
+    def _paths(self) -> Dict[str, Optional[str]]:
+        return {
+            "servers": self.repo.servers_path,
+            "settings": self.repo.settings_path,
+            "stats": self.repo.stats_path,
+        }
+
+    def _read(self, name: str) -> Any:
+        if name == "servers":
+            return self.repo.get_servers()
+        if name == "settings":
+            return self.repo.get_settings(self.defaults)
+        stats = self.repo.get_stats()
+        stats.update(self._agent_stats)
+        return stats
+
+    def _set(self, name: str, value: Any) -> None:
+        setattr(self, name, value)
+        self.versions[name] += 1
+
+    def encoded(self, name: str) -> Tuple[str, bytes]:
+        # JSON body and strong ETag for one collection, computed once per
+        # version. The tag is a content hash, so it survives restarts and is
+        # identical across API instances serving the same files.
+        ver = self.versions[name]
+        cached = self._encoded.get(name)
+        if cached is not None and cached[0] == ver:
+            return cached[1], cached[2]
+        body = codec.dumps_bytes(getattr(self, name))
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self._encoded[name] = (ver, etag, body)
+        return etag, body
+
+    def query_servers(
+        self,
+        sort_key: str,
+        desc: bool,
+        start: int,
+        stop: int,
+        default_group: str,
+        group: Optional[str] = None,
+        query: Optional[str] = None,
+        service: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        filters = (group, query, service)
+        index = self._indexes.pop(filters, None) or SortIndex()
+        self._indexes[filters] = index
+        while len(self._indexes) > SORT_INDEX_SLOTS:
+            self._indexes.popitem(last=False)
+        return index.view(
+            self.servers, sort_key, desc, start, stop, default_group, server_key,
+            results=self.results, filters=filters, inventory_version=self.versions["servers"],
+        )
+
+    def _reload_changed(self, force: bool = False) -> Dict[str, Any]:
+        # Runs in a worker thread: stat every backing file and re-read only
+        # the ones that changed since the last load.
+        changed: Dict[str, Any] = {}
+        for name, path in self._paths().items():
+            if path is None:
+                continue
+            ver = app_io.file_version(path)
+            if not force and ver is not None and ver == self._files.get(name):
+                continue
+            if not force and ver is None and name in self._files:
+                continue
+            changed[name] = (self._read(name), ver)
+        return changed
+
+    def _apply(self, changed: Dict[str, Any]) -> None:
+        for name, (value, ver) in changed.items():
+            self._set(name, value)
+            self._files[name] = ver
+
+    async def load(self) -> None:
+        ingest = await asyncio.to_thread(self.repo.get_ingest)
+        self._agent_stats = ingest["stats"]
+        self._batches = OrderedDict(ingest["batches"])
+        self._apply(await asyncio.to_thread(self._reload_changed, True))
+
+    async def refresh(self) -> None:
+        async with self._write_lock:
+            self._apply(await asyncio.to_thread(self._reload_changed))
+
+    async def refresh_summary(self) -> None:
+        # The log summary is built from the history rollups on request, at
+        # most once per SUMMARY_MAX_AGE; the background poll never scans logs.
+        now = time.monotonic()
+        if self.history is None or (self._summary_at is not None and now - self._summary_at < SUMMARY_MAX_AGE):
+            return
+        self._summary_at = now
+        summary = await asyncio.to_thread(self.history.summary)
+        if summary != self.summary:
+            self._set("summary", summary)
+
+    async def run_refresh(self, interval: float = STATE_POLL_INTERVAL) -> None:
+        # Picks up writes from other processes (CLI, background monitor).
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                pass
+
+    async def _mutate_servers(self, fn: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+        async with self._write_lock:
+            servers = list(self.servers)
+            out = fn(servers)
+            if out is None:
+                return None
+            await asyncio.to_thread(self.repo.save_servers, servers)
+            self._set("servers", servers)
+            self._files["servers"] = app_io.file_version(self.repo.servers_path)
+            return out
+
+    async def replace_servers(self, servers: List[Dict[str, Any]]) -> None:
+        def _replace(current: List[Dict[str, Any]]) -> bool:
+            current[:] = servers
+            return True
+        await self._mutate_servers(_replace)
+
+    async def add_server(self, server: Dict[str, Any]) -> Dict[str, Any]:
+        def _add(current: List[Dict[str, Any]]) -> Dict[str, Any]:
+            current.append(server)
+            return server
+        return await self._mutate_servers(_add)
+
+    async def update_server(self, index: int, server: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        def _update(current: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if index < 0 or index >= len(current):
+                return None
+            current[index] = server
+            return server
+        return await self._mutate_servers(_update)
+
+    async def delete_server(self, index: int) -> Optional[Dict[str, Any]]:
+        def _delete(current: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if index < 0 or index >= len(current):
+                return None
+            return current.pop(index)
+        return await self._mutate_servers(_delete)
+
+    async def apply_batch(self, operations: List[Dict[str, Any]]) -> Dict[str, int]:
+        # All-or-nothing: indexes refer to the list before the batch, adds are
+        # appended, and a single save covers every operation. Raises ValueError
+        # (nothing written) if any operation is invalid.
+        def _apply(current: List[Dict[str, Any]]) -> Dict[str, int]:
+            n = len(current)
+            updates: Dict[int, Dict[str, Any]] = {}
+            deletes = set()
+            adds: List[Dict[str, Any]] = []
+            for i, op in enumerate(operations):
+                kind = op.get("op")
+                index = op.get("index")
+                if kind == "add":
+                    adds.append(op["server"])
+                    continue
+                if kind not in ("update", "delete"):
+                    raise ValueError(f"operation {i}: unknown op {kind!r}")
+                if not isinstance(index, int) or index < 0 or index >= n:
+                    raise ValueError(f"operation {i}: index out of range")
+                if index in updates or index in deletes:
+                    raise ValueError(f"operation {i}: index {index} used twice")
+                if kind == "update":
+                    updates[index] = op["server"]
+                else:
+                    deletes.add(index)
+            for index, server in updates.items():
+                current[index] = server
+            current[:] = [s for i, s in enumerate(current) if i not in deletes] + adds
+            return {"added": len(adds), "updated": len(updates), "deleted": len(deletes), "total": len(current)}
+        return await self._mutate_servers(_apply)
+
+    async def save_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._write_lock:
+            await asyncio.to_thread(self.repo.save_settings, settings)
+            value = await asyncio.to_thread(self.repo.get_settings, self.defaults)
+            self._set("settings", value)
+            self._files["settings"] = app_io.file_version(self.repo.settings_path)
+            return value
+
+    def batch_seen(self, agent: str, batch_id: str) -> Optional[int]:
+        return self._batches.get(f"{agent}/{batch_id}")
+
+    async def ingest(
+        self, agent: str, batch_id: str, rows: List[Tuple[str, float, bool, Optional[float]]]
+    ) -> Tuple[int, bool]:
+        # Merges an agent batch into the agent stats under "<agent>/<server key>".
+        # Returns (accepted, duplicate); a repeated batch id changes nothing.
+        # The batch id is saved in the same write as the counters, so a resend
+        # after a restart is still recognised.
+        bid = f"{agent}/{batch_id}"
+        async with self._write_lock:
+            if bid in self._batches:
+                return self._batches[bid], True
+            agent_stats = {k: dict(v) for k, v in self._agent_stats.items()}
+            touched = set()
+            for key, _, is_up, _ in rows:
+                name = f"{agent}/{key}"
+                s = agent_stats.setdefault(name, {"ok": 0, "fail": 0})
+                s["ok" if is_up else "fail"] += 1
+                touched.add(name)
+            batches = OrderedDict(self._batches)
+            batches[bid] = len(rows)
+            while len(batches) > INGEST_SEEN_SIZE:
+                batches.popitem(last=False)
+            await asyncio.to_thread(self.repo.save_ingest, {"stats": agent_stats, "batches": batches})
+            self._agent_stats = agent_stats
+            self._batches = batches
+            if touched:
+                stats = dict(self.stats)
+                stats.update((name, agent_stats[name]) for name in touched)
+                self._set("stats", stats)
+            return len(rows), False
@@ -1,35 +1,16 @@
-from typing import Any, Dict, List, Optional, Callable
-import asyncio
+from typing import Any, Dict, Hashable, List, Optional, Callable, Tuple
 from datetime import datetime
 import time
 from rich.table import Table
+from rich.text import Text
 from rich import box
+from .results import ResultStore
+from .sorting import SortIndex
 
+MAX_CACHED_ROWS = 4096
 
-def build_table(
-    servers: List[Dict[str, Any]],
-    stats: Dict[str, Dict[str, int]],
-    t: Callable[..., str],
-    app_state: Any,
-    ping_host: Callable[[str], Optional[float]],
-    check_port: Callable[[str, int, float], bool],
-    port_timeout: float,
-    max_concurrent: int,
-    page_size: int,
-    retry_attempts: int,
-    retry_base_delay: float,
-    server_key: Callable[[Dict[str, Any]], str],
-    update_and_get_uptime: Callable[[Dict[str, Dict[str, int]], str, bool], Optional[float]],
-    log_status: Callable[[Dict[str, Any], bool, Optional[float], Optional[float]], None],
-    get_summary_metrics: Callable[[], Dict[str, Any]],
-    app_name: str,
-    app_url: str,
-) -> Table:
-    title = (
-        f"{app_name}  |  {app_url}  |  "
-        f"{t('table.last_update')}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    )
 
+def _new_table(title: str, t: Callable[..., str]) -> Table:
     table = Table(
         title=title,
         box=box.MINIMAL_DOUBLE_HEAD,
@@ -51,50 +32,84 @@ def build_table(
     table.add_column(t("table.ping_ms"), justify="right", style="yellow")
     table.add_column(t("table.uptime"), justify="right", style="green")
     table.add_column(t("table.status"), justify="center", style="bold")
+    return table
 
-    if getattr(app_state, "current_group_filter", None):
-        servers = [
-            s for s in servers if s.get("group", t("general.default_group")) == app_state.current_group_filter
-        ]
-    q = getattr(app_state, "current_search_query", None)
-    if q:
-        ql = q.lower()
-        def _hit(s: Dict[str, Any]) -> bool:
-            return (
-                ql in str(s.get("group", t("general.default_group"))).lower()
-                or ql in str(s.get("name", "")).lower()
-                or ql in str(s.get("host", "")).lower()
-                or ql in str(s.get("service", "")).lower()
-            )
-        servers = [s for s in servers if _hit(s)]
-    svc_filter = getattr(app_state, "current_service_filter", None)
-    if svc_filter:
-        servers = [s for s in servers if s.get("service", "") == svc_filter]
-    sort_key = getattr(app_state, "current_sort_key", "name")
-    sort_desc = bool(getattr(app_state, "sort_desc", False))
-    def _srv_sort_value(s: Dict[str, Any]):
-        if sort_key == "group":
-            return s.get("group", t("general.default_group"))
-        if sort_key == "name":
-            return s.get("name", "")
-        if sort_key == "host":
-            return s.get("host", "")
-        if sort_key == "service":
-            return s.get("service", "")
-        if sort_key == "port":
-            return int(s.get("port", 0))
-        return s.get("name", "")
-    servers.sort(key=_srv_sort_value, reverse=sort_desc)
-    total = len(servers)
-    total_pages = max(1, (total + max(1, page_size) - 1) // max(1, page_size))
-    try:
-        app_state.current_page = min(max(1, app_state.current_page), total_pages)
-    except Exception:
-        app_state.current_page = 1
-    start = (app_state.current_page - 1) * max(1, page_size)
-    end = start + max(1, page_size)
-    page_servers = servers[start:end]
-    page_note = f" | {t('table.page', page=app_state.current_page, total=total_pages)}" if total_pages > 1 else ""
+
+def _ping_markup(rtt: Optional[float]) -> str:
+    if rtt is None:
+        return "[dim]-[/dim]"
+    if rtt < 50.0:
+        return f"[green]{rtt:6.1f}[/green]"
+    if rtt < 150.0:
+        return f"[yellow]{rtt:6.1f}[/yellow]"
+    return f"[red]{rtt:6.1f}[/red]"
+
+
+def _uptime_markup(uptime: Optional[float]) -> str:
+    if uptime is None:
+        return "[dim]-[/dim]"
+    if uptime >= 99.0:
+        return f"[green]{uptime:5.1f}%[/green]"
+    if uptime >= 95.0:
+        return f"[yellow]{uptime:5.1f}%[/yellow]"
+    return f"[red]{uptime:5.1f}%[/red]"
+
+
+def row_values(srv: Dict[str, Any], entry: Optional[Dict[str, Any]], t: Callable[..., str]) -> Tuple[str, ...]:
+    service_name = srv.get("service", t("service.unknown"))
+    service_key = f"service.{service_name}"
+    _svc = t(service_key)
+    service = service_name if _svc == service_key else _svc
+    status = entry.get("status") if entry else None
+    if status == "UP":
+        status_text = t("status.online")
+    elif status is None:
+        status_text = t("status.pending")
+    elif status == "UNREACHABLE":
+        status_text = t("status.unreachable")
+    elif entry.get("breaker") in ("open", "half_open"):
+        status_text = t("status.backoff")
+    else:
+        status_text = t("status.offline")
+    return (
+        str(srv.get("group", t("general.default_group"))),
+        str(srv.get("name", "")),
+        str(srv.get("host", "")),
+        str(service),
+        str(int(srv.get("port", 0))),
+        _ping_markup(entry.get("rtt") if entry else None),
+        _uptime_markup(entry.get("uptime") if entry else None),
+        status_text,
+    )
+
+
+def _row_cells(srv: Dict[str, Any], entry: Optional[Dict[str, Any]], t: Callable[..., str]) -> Tuple[Text, ...]:
+    return tuple(Text.from_markup(c) for c in row_values(srv, entry, t))
+
+
+def _bucket(v: Optional[float]) -> Optional[int]:
+    # Cells show one decimal place, so values within the same 0.1 bucket
+    # render identically and can share a cached row.
+    return None if v is None else int(round(float(v) * 10))
+
+
+def _shortcuts_line(t: Callable[..., str]) -> str:
+    return (
+        f"{t('shortcuts')}: q {t('shortcut.quit')}, n {t('shortcut.add')}, s {t('shortcut.settings')}, l {t('shortcut.list')}, e {t('shortcut.edit')}, g {t('shortcut.filter')}, a {t('shortcut.clear_filter')}, / {t('shortcut.search')}, x {t('shortcut.clear_search')}, h {t('shortcut.service_filter')}, z {t('shortcut.clear_service_filter')}, ] {t('shortcut.next_page')}, [ {t('shortcut.prev_page')}, > {t('shortcut.next_sort')}, < {t('shortcut.prev_sort')}, r {t('shortcut.toggle_sort_order')}, d {t('shortcut.render_stats')}"
+    )
+
+
+def _caption(
+    t: Callable[..., str],
+    shortcuts: str,
+    app_state: Any,
+    sort_key: str,
+    sort_desc: bool,
+    page: int,
+    total_pages: int,
+    metrics: Dict[str, Any],
+) -> str:
+    page_note = f" | {t('table.page', page=page, total=total_pages)}" if total_pages > 1 else ""
     filter_note = (
         f" | {t('filter.caption')}: {app_state.current_group_filter}" if getattr(app_state, "current_group_filter", None) else ""
     )
@@ -105,7 +120,6 @@ def build_table(
         f" | {t('service_filter.caption')}: {app_state.current_service_filter}" if getattr(app_state, "current_service_filter", None) else ""
     )
     sort_note = f" | {t('table.sort')}: {sort_key} {t('sort.desc') if sort_desc else t('sort.asc')}"
-    metrics = get_summary_metrics()
     m1 = metrics.get("1h", {})
     m2 = metrics.get("24h", {})
     pref = f"{t('summary.title')}: "
@@ -124,88 +138,168 @@ def build_table(
     line2 = (
         f"{' ' * len(pref)}{t('summary.24h'):<{label_w}} | {t('summary.up')} {_fmt_int(m2.get('up'))} | {t('summary.down')} {_fmt_int(m2.get('down'))} | {t('summary.avg_ping')} {_fmt_avg(m2.get('avg_ping'))} | {t('summary.uptime')} {_fmt_pct(m2.get('uptime'))}"
     )
-    table.caption = (
-        f"{line1}\n{line2}\n{t('shortcuts')}: q {t('shortcut.quit')}, n {t('shortcut.add')}, s {t('shortcut.settings')}, l {t('shortcut.list')}, e {t('shortcut.edit')}, g {t('shortcut.filter')}, a {t('shortcut.clear_filter')}, / {t('shortcut.search')}, x {t('shortcut.clear_search')}, h {t('shortcut.service_filter')}, z {t('shortcut.clear_service_filter')}, ] {t('shortcut.next_page')}, [ {t('shortcut.prev_page')}, > {t('shortcut.next_sort')}, < {t('shortcut.prev_sort')}, r {t('shortcut.toggle_sort_order')}{filter_note}{search_note}{svc_note}{page_note}{sort_note}"
+    return (
+        f"{line1}\n{line2}\n{shortcuts}{filter_note}{search_note}{svc_note}{page_note}{sort_note}"
     )
 
-    async def _check_one(s):
-        host = s.get("host", "")
-        port = int(s.get("port", 0))
-        def _retry_ping():
-            for i in range(max(1, retry_attempts)):
-                r = ping_host(host)
-                if r is not None:
-                    return r
-                time.sleep(retry_base_delay * (2 ** i))
-            return None
-
-        def _retry_port():
-            if port <= 0:
-                return False
-            for i in range(max(1, retry_attempts)):
-                ok = check_port(host, port, port_timeout)
-                if ok:
-                    return True
-                time.sleep(retry_base_delay * (2 ** i))
-            return False
-
-        ping_task = asyncio.to_thread(_retry_ping)
-        port_task = asyncio.to_thread(_retry_port)
-        rtt, port_ok = await asyncio.gather(ping_task, port_task)
-        return (s, rtt, bool(port_ok))
-
-    async def _gather_batched(items, batch_size: int):
-        out = []
-        for i in range(0, len(items), max(1, batch_size)):
-            batch = items[i:i+batch_size]
-            res = await asyncio.gather(*(_check_one(s) for s in batch))
-            out.extend(res)
-        return out
-
-    results = asyncio.run(_gather_batched(page_servers, max_concurrent))
-
-    for srv, rtt, port_ok in results:
-        name = srv.get("name", "")
-        host = srv.get("host", "")
-        group = srv.get("group", t("general.default_group"))
-        service_name = srv.get("service", t("service.unknown"))
-        service_key = f"service.{service_name}"
-        _svc = t(service_key)
-        service = service_name if _svc == service_key else _svc
-        port = int(srv.get("port", 0))
-
-        is_up = port_ok
-        key = server_key(srv)
-        uptime = update_and_get_uptime(stats, key, is_up)
-        log_status(srv, is_up, rtt, uptime)
-
-        status_text = t("status.online") if is_up else t("status.offline")
-        if rtt is None:
-            ping_text = "[dim]-[/dim]"
-        else:
-            ping_text = (
-                f"[green]{rtt:6.1f}[/green]" if rtt < 50.0 else (
-                    f"[yellow]{rtt:6.1f}[/yellow]" if rtt < 150.0 else f"[red]{rtt:6.1f}[/red]"
-                )
-            )
-        if uptime is None:
-            uptime_text = "[dim]-[/dim]"
+
+class TableRenderer:
+    def __init__(
+        self,
+        t: Callable[..., str],
+        server_key: Callable[[Dict[str, Any]], str],
+        get_summary_metrics: Callable[[], Dict[str, Any]],
+        app_name: str,
+        app_url: str,
+        sort_index: Optional[SortIndex] = None,
+        max_cached_rows: int = MAX_CACHED_ROWS,
+    ) -> None:
+        self.t = t
+        self.server_key = server_key
+        self.get_summary_metrics = get_summary_metrics
+        self.app_name = app_name
+        self.app_url = app_url
+        self.sort_index = sort_index or SortIndex()
+        self.max_cached_rows = max(1, int(max_cached_rows))
+        self.frames = 0
+        self.rebuilds = 0
+        self.row_hits = 0
+        self.row_misses = 0
+        self.last_render_ms = 0.0
+        self.total_render_ms = 0.0
+        self._rows: Dict[Hashable, Tuple[Text, ...]] = {}
+        self._shortcuts: Dict[str, str] = {}
+        self._signature: Optional[Hashable] = None
+        self._table: Optional[Table] = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "frames": self.frames,
+            "rebuilds": self.rebuilds,
+            "row_hits": self.row_hits,
+            "row_misses": self.row_misses,
+            "last_render_ms": self.last_render_ms,
+            "avg_render_ms": (self.total_render_ms / self.frames) if self.frames else 0.0,
+        }
+
+    def invalidate(self) -> None:
+        self._rows.clear()
+        self._shortcuts.clear()
+        self._signature = None
+        self._table = None
+
+    def _row(self, srv: Dict[str, Any], entry: Optional[Dict[str, Any]], key: str, locale: str) -> Tuple[Text, ...]:
+        if entry is None:
+            cache_key: Hashable = (key, srv.get("name"), srv.get("group"), None, None, None, None, locale)
         else:
-            uptime_text = (
-                f"[green]{uptime:5.1f}%[/green]" if uptime >= 99.0 else (
-                    f"[yellow]{uptime:5.1f}%[/yellow]" if uptime >= 95.0 else f"[red]{uptime:5.1f}%[/red]"
-                )
+            cache_key = (
+                key,
+                srv.get("name"),
+                srv.get("group"),
+                entry.get("status"),
+                entry.get("breaker"),
+                _bucket(entry.get("rtt")),
+                _bucket(entry.get("uptime")),
+                locale,
             )
+        cells = self._rows.get(cache_key)
+        if cells is not None:
+            self.row_hits += 1
+            return cells
+        self.row_misses += 1
+        if len(self._rows) >= self.max_cached_rows:
+            self._rows.clear()
+        cells = _row_cells(srv, entry, self.t)
+        self._rows[cache_key] = cells
+        return cells
 
-        table.add_row(
-            group,
-            name,
-            host,
-            service,
-            str(port),
-            ping_text,
-            uptime_text,
-            status_text,
+    def render(
+        self,
+        servers: List[Dict[str, Any]],
+        app_state: Any,
+        results: ResultStore,
+        page_size: int,
+        inventory_version: Optional[Hashable] = None,
+        locale: str = "",
+    ) -> Tuple[Table, bool]:
+        started = time.perf_counter()
+        t = self.t
+        default_group = t("general.default_group")
+        filters = (
+            getattr(app_state, "current_group_filter", None),
+            getattr(app_state, "current_search_query", None),
+            getattr(app_state, "current_service_filter", None),
         )
+        sort_key = getattr(app_state, "current_sort_key", "name")
+        sort_desc = bool(getattr(app_state, "sort_desc", False))
+        size = max(1, page_size)
+
+        def _page(page: int):
+            start = (page - 1) * size
+            return self.sort_index.view(
+                servers, sort_key, sort_desc, start, start + size, default_group, self.server_key,
+                results=results, filters=filters, inventory_version=inventory_version,
+            )
+
+        try:
+            current_page = max(1, int(app_state.current_page))
+        except Exception:
+            current_page = 1
+        page_servers, total = _page(current_page)
+        total_pages = max(1, (total + size - 1) // size)
+        if current_page > total_pages:
+            current_page = total_pages
+            page_servers, total = _page(current_page)
+        app_state.current_page = current_page
+
+        rows = []
+        for srv in page_servers:
+            key = self.server_key(srv)
+            rows.append(self._row(srv, results.get(key), key, locale))
+        shortcuts = self._shortcuts.get(locale)
+        if shortcuts is None:
+            # Static per language; only rebuilt after a language switch.
+            shortcuts = _shortcuts_line(t)
+            self._shortcuts = {locale: shortcuts}
+        caption = _caption(t, shortcuts, app_state, sort_key, sort_desc, current_page, total_pages, self.get_summary_metrics())
+        if getattr(app_state, "show_render_stats", False):
+            st = self.stats()
+            caption += (
+                f" | {t('render.caption', last=st['last_render_ms'], avg=st['avg_render_ms'], rebuilds=int(st['rebuilds']), frames=int(st['frames']))}"
+            )
+        updated = results.updated_at
+        stamp = datetime.fromtimestamp(updated).strftime('%Y-%m-%d %H:%M:%S') if updated else "-"
+        title = f"{self.app_name}  |  {self.app_url}  |  {t('table.last_update')}: {stamp}"
+
+        signature = (locale, title, caption, tuple(rows))
+        changed = self._table is None or signature != self._signature
+        if changed:
+            table = _new_table(title, t)
+            for cells in rows:
+                table.add_row(*cells)
+            table.caption = caption
+            self._table = table
+            self._signature = signature
+            self.rebuilds += 1
+        self.frames += 1
+        self.last_render_ms = (time.perf_counter() - started) * 1000.0
+        self.total_render_ms += self.last_render_ms
+        return self._table, changed
 
-    return table
\ No newline at end of file
+
+def build_table(
+    servers: List[Dict[str, Any]],
+    t: Callable[..., str],
+    app_state: Any,
+    results: ResultStore,
+    page_size: int,
+    server_key: Callable[[Dict[str, Any]], str],
+    get_summary_metrics: Callable[[], Dict[str, Any]],
+    app_name: str,
+    app_url: str,
+    sort_index: Optional[SortIndex] = None,
+    inventory_version: Optional[Hashable] = None,
+) -> Table:
+    renderer = TableRenderer(t, server_key, get_summary_metrics, app_name, app_url, sort_index)
+    table, _ = renderer.render(servers, app_state, results, page_size, inventory_version)
+    return table
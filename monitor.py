@@ -1,25 +1,48 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
 import os
 import json
 import time
 import sys
+
+if __name__ == "__main__" and "--daemon" in sys.argv[1:]:
+    # Headless mode: hand over before rich, termios or languages are loaded.
+    from ets_tm.daemon import main as daemon_main
+    sys.exit(daemon_main([a for a in sys.argv[1:] if a != "--daemon"]))
+
 import argparse
+import re
+import socket
 import select
 import termios
 import tty
-import urllib.request
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 
 from rich.console import Console
 from rich.table import Table
 from rich.live import Live
-from ets_tm.core import ping_host as core_ping_host, check_port as core_check_port
-from ets_tm.ui import build_table as ui_build_table
+from ets_tm.ui import TableRenderer, row_values as ui_row_values
+from ets_tm.background import BackgroundMonitor
+from ets_tm.repo import FileRepository
+from ets_tm.domain import DEFAULT_SETTINGS
+from ets_tm.services import MonitoringService
+from ets_tm.i18n import Translator
+from ets_tm.results import ResultStore
+from ets_tm.sorting import SORT_KEYS, SortIndex
 import ets_tm.app_io as app_io
+import ets_tm.codec as codec
+from ets_tm.remote import RemoteClient
+from ets_tm.agent import AgentShipper
+from ets_tm.shard import ShardedMonitor
+from ets_tm.schedule import OVERRUN_POLICIES, FixedRateSchedule
 
 console = Console()
 
@@ -38,6 +61,7 @@ class AppState:
         self.current_page: int = 1
         self.current_sort_key: str = "name"
         self.sort_desc: bool = False
+        self.show_render_stats: bool = False
 
 app_state = AppState()
 
@@ -49,6 +73,11 @@ SETTINGS_FILE = str(BASE_DIR / "config.json")
 BACKUP_FILE = str(BASE_DIR / "servers.bak")
 BACKUPS_DIR = str(BASE_DIR / "backups")
 API_URL: Optional[str] = None
+SPOOL_DIR = str(BASE_DIR / "spool")
+AGENT_URL: Optional[str] = None
+AGENT_ID: str = ""
+WORKERS = 1
+OVERRUN_POLICY = "skip"
 
 try:
     __import__("pydantic")
@@ -69,9 +98,13 @@ def validate_server_dict(d: Dict[str, Any]) -> Dict[str, Any]:
                 host: str
                 service: str
                 port: int
+                depends_on: Optional[str] = None
 
             m = _ServerModel(**d)  # type: ignore[arg-type]
-            return dict(m.__dict__)
+            out = dict(m.__dict__)
+            if out.get("depends_on") is None:
+                out.pop("depends_on", None)
+            return out
         except Exception:
             return d
     return d
@@ -148,12 +181,111 @@ def print_header():
 
 
 
+REMOTE: Optional[RemoteClient] = None
+API_TIMEOUT = 3.0
+# Remote pages kept by RemotePager (distinct sort/filter/page combinations).
+PAGER_CACHE_SIZE = 16
+
+
+def remote_client() -> RemoteClient:
+    # One pooled keep-alive client per process; it revalidates with ETags and
+    # falls back to the last good body while the API is slow or down.
+    global REMOTE
+    if REMOTE is None:
+        REMOTE = RemoteClient(str(API_URL), timeout=API_TIMEOUT)
+    return REMOTE
+
+
+def api_get(path: str, max_age: float = 0.0) -> Tuple[Any, Dict[str, str]]:
+    return remote_client().get(path, max_age)
+
+
+def api_get_json(path: str, max_age: float = 0.0) -> Any:
+    return api_get(path, max_age)[0]
+
+
+class RemotePager:
+    # Drop-in for SortIndex in --api-url mode: the API filters, sorts and
+    # pages, and only the displayed page crosses the wire. Pages are fetched
+    # by a background worker, together with the companion paths (the summary
+    # panel); view() only ever returns what is cached, so a slow or dead API
+    # never stalls a frame.
+    def __init__(self, ttl: float, companions: Tuple[str, ...] = ()) -> None:
+        self.ttl = ttl
+        self.companions = companions
+        self.last_total = 0
+        self._pages: "OrderedDict[str, Tuple[float, List[Dict[str, Any]], int]]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ets-tm-pager")
+
+    def _refresh(self, path: str) -> None:
+        try:
+            client = remote_client()
+            if self.companions:
+                client.fetch_many((path,) + self.companions, self.ttl)
+            data, headers = client.get(path, self.ttl)
+            page = [validate_server_dict(x) for x in data]
+            total = int(headers.get("x-total-count", len(page)))
+            with self._lock:
+                self._pages.pop(path, None)
+                self._pages[path] = (time.monotonic(), page, total)
+                while len(self._pages) > PAGER_CACHE_SIZE:
+                    self._pages.popitem(last=False)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def view(
+        self,
+        servers: List[Dict[str, Any]],
+        sort_key: str,
+        desc: bool,
+        start: int,
+        stop: int,
+        default_group: str,
+        server_key: Any,
+        results: Optional[ResultStore] = None,
+        filters: Tuple[Optional[str], Optional[str], Optional[str]] = (None, None, None),
+        inventory_version: Optional[Any] = None,
+        block: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        # block=True fetches in the caller's thread when nothing fresh is
+        # cached; used once before the monitor starts, never per frame.
+        size = max(1, stop - start)
+        params: Dict[str, Any] = {"sort": sort_key, "page": start // size + 1, "limit": size}
+        if desc:
+            params["desc"] = "true"
+        for name, value in zip(("group", "q", "service"), filters):
+            if value:
+                params[name] = value
+        path = "/servers?" + urllib.parse.urlencode(params)
+        with self._lock:
+            cached = self._pages.get(path)
+            stale = cached is None or time.monotonic() - cached[0] >= self.ttl
+            submit = stale and not block and path not in self._pending
+            if submit:
+                self._pending.add(path)
+        if submit:
+            self._worker.submit(self._refresh, path)
+        elif stale and block:
+            self._refresh(path)
+            with self._lock:
+                cached = self._pages.get(path)
+        if cached is None:
+            # Not fetched yet: an empty page, keeping the last known total.
+            return [], self.last_total
+        _, page, total = cached
+        self.last_total = total
+        return page, total
+
+
 def load_servers() -> List[Dict[str, Any]]:
     if API_URL:
         try:
-            with urllib.request.urlopen(f"{API_URL}/servers") as resp:
-                data = json.loads(resp.read().decode("utf-8"))
-                return [validate_server_dict(s) for s in data]
+            return [validate_server_dict(s) for s in api_get_json("/servers")]
         except Exception:
             return []
     servers = app_io.load_servers(CONFIG_FILE, BACKUP_FILE, validate_server_dict)
@@ -162,6 +294,15 @@ def load_servers() -> List[Dict[str, Any]]:
     return servers
 
 
+def load_remote_inventory() -> List[Dict[str, Any]]:
+    # The probe set in --api-url mode: the whole remote inventory, revalidated
+    # at most once per refresh interval. It never depends on the page shown.
+    try:
+        return [validate_server_dict(s) for s in api_get_json("/servers", REFRESH_INTERVAL)]
+    except Exception:
+        return []
+
+
 def save_servers(servers: List[Dict[str, Any]]) -> None:
     if API_URL:
         console.print(t('remote.read_only'))
@@ -176,8 +317,7 @@ def save_servers(servers: List[Dict[str, Any]]) -> None:
 def load_stats() -> Dict[str, Dict[str, int]]:
     if API_URL:
         try:
-            with urllib.request.urlopen(f"{API_URL}/stats") as resp:
-                return json.loads(resp.read().decode("utf-8"))
+            return api_get_json("/stats")
         except Exception:
             return {}
     return app_io.load_stats(STATS_FILE)
@@ -190,23 +330,10 @@ def save_stats(stats: Dict[str, Dict[str, int]]) -> None:
     app_io.save_stats(STATS_FILE, stats)
 
 def load_settings() -> Dict[str, Any]:
-    defaults = {
-        "refresh_interval": 2.0,
-        "ping_timeout": 1.5,
-        "port_timeout": 1.5,
-        "live_fullscreen": True,
-        "refresh_per_second": 4,
-        "prefer_system_ping": False,
-        "max_concurrent_checks": 20,
-        "page_size": 20,
-        "retry_attempts": 3,
-        "retry_base_delay": 0.2,
-    }
+    defaults = dict(DEFAULT_SETTINGS)
     if API_URL:
         try:
-            with urllib.request.urlopen(f"{API_URL}/settings") as resp:
-                data = json.loads(resp.read().decode("utf-8"))
-                return validate_settings_dict(data)
+            return validate_settings_dict(api_get_json("/settings"))
         except Exception:
             return defaults.copy()
     return app_io.load_settings(SETTINGS_FILE, defaults, validate_settings_dict)
@@ -233,6 +360,7 @@ LANG_DIR = str(BASE_DIR / "lang")
 DEFAULT_LANG = "en"
 EN_LANG: Dict[str, str] = {}
 LANG: Dict[str, str] = {}
+TRANSLATOR = Translator({})
 
 def load_language(code: str) -> Dict[str, str]:
     p = Path(LANG_DIR) / f"{code}.json"
@@ -246,13 +374,11 @@ def set_language(code: str) -> None:
     global EN_LANG, LANG
     EN_LANG = load_language("en")
     LANG = load_language(code) if code and code != "en" else EN_LANG
+    # Recompiling replaces every pre-resolved string for the new language.
+    TRANSLATOR.load(LANG, EN_LANG)
 
 def t(key: str, **kwargs) -> str:
-    s = LANG.get(key, EN_LANG.get(key, key))
-    try:
-        return s.format(**kwargs)
-    except Exception:
-        return s
+    return TRANSLATOR(key, **kwargs)
 
 
 def server_key(srv: Dict[str, Any]) -> str:
@@ -260,27 +386,6 @@ def server_key(srv: Dict[str, Any]) -> str:
     return f"{srv.get('host','')}:{srv.get('port','')}:{srv.get('service','')}"
 
 
-def ping_host(host: str) -> Optional[float]:
-    return core_ping_host(host, timeout=PING_TIMEOUT, prefer_system_ping=PREFER_SYSTEM_PING)
-
-
-def check_port(host: str, port: int, timeout: float = 1.5) -> bool:
-    return core_check_port(host, port, timeout=timeout)
-
-
-def update_and_get_uptime(stats: Dict[str, Dict[str, int]], key: str, is_up: bool) -> Optional[float]:
-    s = stats.setdefault(key, {"ok": 0, "fail": 0})
-    if is_up:
-        s["ok"] += 1
-    else:
-        s["fail"] += 1
-
-    total = s["ok"] + s["fail"]
-    if total == 0:
-        return None
-    return (s["ok"] / total) * 100.0
-
-
 def log_status(srv: Dict[str, Any], is_up: bool, rtt: Optional[float], uptime: Optional[float]) -> None:
     ts = datetime.now().isoformat(timespec="seconds")
     status_str = "UP" if is_up else "DOWN"
@@ -310,64 +415,102 @@ def log_status(srv: Dict[str, Any], is_up: bool, rtt: Optional[float], uptime: O
 def ensure_log_header() -> None:
     app_io.ensure_log_header(LOG_FILE)
 
+def inventory_version() -> Optional[Any]:
+    if API_URL:
+        return None
+    return app_io.file_version(CONFIG_FILE)
+
+
+_EMPTY_SUMMARY: Dict[str, Any] = {
+    "1h": {"up": 0, "down": 0, "avg_ping": None, "uptime": None},
+    "24h": {"up": 0, "down": 0, "avg_ping": None, "uptime": None},
+}
+_SUMMARY_CACHE: Dict[str, Any] = {"key": None, "at": 0.0, "value": None, "pending": False}
+_SUMMARY_LOCK = threading.Lock()
+# The local log scan runs here, never on the render loop.
+_SUMMARY_WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ets-tm-summary")
+
+
 def get_summary_metrics() -> Dict[str, Any]:
+    # Never blocks a frame: remote summaries come from the pager's cache and
+    # are reused for the refresh interval; local ones are rescanned by a
+    # background worker when the log changes while the last value is shown.
+    now = time.time()
     if API_URL:
-        try:
-            with urllib.request.urlopen(f"{API_URL}/logs/summary") as resp:
-                return json.loads(resp.read().decode("utf-8"))
-        except Exception:
-            return {"1h": {"up": 0, "down": 0, "avg_ping": None, "uptime": None}, "24h": {"up": 0, "down": 0, "avg_ping": None, "uptime": None}}
+        cached = _SUMMARY_CACHE["value"]
+        if cached is None or now - _SUMMARY_CACHE["at"] >= REFRESH_INTERVAL:
+            cached = remote_client().cached("/logs/summary") or _EMPTY_SUMMARY
+            _SUMMARY_CACHE.update({"at": now, "value": cached})
+        return cached
+    key = app_io.file_version(LOG_FILE)
+    with _SUMMARY_LOCK:
+        submit = (_SUMMARY_CACHE["value"] is None or _SUMMARY_CACHE["key"] != key) and not _SUMMARY_CACHE["pending"]
+        if submit:
+            _SUMMARY_CACHE["pending"] = True
+        value = _SUMMARY_CACHE["value"]
+    if submit:
+        _SUMMARY_WORKER.submit(_refresh_summary_metrics, key)
+    return value or _EMPTY_SUMMARY
+
+
+def _refresh_summary_metrics(key: Any) -> None:
     try:
-        return app_io.read_log_summary(LOG_FILE)
+        value = app_io.read_log_summary(LOG_FILE)
     except Exception:
-        return {"1h": {"up": 0, "down": 0, "avg_ping": None, "uptime": None}, "24h": {"up": 0, "down": 0, "avg_ping": None, "uptime": None}}
+        value = _EMPTY_SUMMARY
+    with _SUMMARY_LOCK:
+        _SUMMARY_CACHE.update({"key": key, "at": time.time(), "value": value, "pending": False})
 
 
 # ------- Tablo Oluşturma ------- #
 
+def current_locale() -> str:
+    return str(LANG.get("_lang_code", DEFAULT_LANG))
+
+
 def bootstrap() -> Dict[str, Any]:
+    sort_index = SortIndex()
+    pager = RemotePager(REFRESH_INTERVAL, ("/logs/summary",)) if API_URL else None
     return {
-        "t": lambda k, **kwargs: t(k, **kwargs),
         "state": app_state,
-        "ping_host": ping_host,
-        "check_port": lambda h, p, to: check_port(h, p, timeout=to),
-        "port_timeout": PORT_TIMEOUT,
-        "max_concurrent": MAX_CONCURRENT_CHECKS,
         "page_size": PAGE_SIZE,
-        "retry_attempts": RETRY_ATTEMPTS,
-        "retry_base_delay": RETRY_BASE_DELAY,
         "server_key": server_key,
-        "update_and_get_uptime": update_and_get_uptime,
-        "log_status": log_status,
-        "get_summary_metrics": get_summary_metrics,
-        "app_name": APP_NAME,
-        "app_url": APP_URL,
-        "ui_build_table": ui_build_table,
+        "results": ResultStore(),
+        "sort_index": sort_index,
+        "pager": pager,
+        "inventory_version": inventory_version,
+        "locale": current_locale,
+        "renderer": TableRenderer(t, server_key, get_summary_metrics, APP_NAME, APP_URL, pager or sort_index),
     }
 
 DEPS: Dict[str, Any] = {}
 
-def build_table(servers: List[Dict[str, Any]], stats: Dict[str, Dict[str, int]]) -> Table:
+def build_table(servers: List[Dict[str, Any]]) -> Tuple[Table, bool]:
     deps = DEPS or bootstrap()
-    return deps["ui_build_table"](
+    return deps["renderer"].render(
         servers,
-        stats,
-        deps["t"],
         deps["state"],
-        deps["ping_host"],
-        deps["check_port"],
-        deps["port_timeout"],
-        deps["max_concurrent"],
+        deps["results"],
         deps["page_size"],
-        deps["retry_attempts"],
-        deps["retry_base_delay"],
-        deps["server_key"],
-        deps["update_and_get_uptime"],
-        deps["log_status"],
-        deps["get_summary_metrics"],
-        deps["app_name"],
-        deps["app_url"],
+        inventory_version=deps["inventory_version"](),
+        locale=deps["locale"](),
+    )
+
+def make_probe_engine(results: ResultStore, stats: Dict[str, Dict[str, int]]) -> BackgroundMonitor:
+    repo = FileRepository(CONFIG_FILE, BACKUP_FILE, STATS_FILE, SETTINGS_FILE, validate_server_dict, validate_settings_dict)
+    svc = MonitoringService(PING_TIMEOUT, PORT_TIMEOUT, PREFER_SYSTEM_PING)
+    servers_provider = load_remote_inventory if API_URL else load_servers
+    # Agent mode: results also go to the central API's /ingest in batches.
+    agent = AgentShipper(AGENT_URL, AGENT_ID, SPOOL_DIR, timeout=API_TIMEOUT) if AGENT_URL else None
+    args = (repo, svc, LOG_FILE, REFRESH_INTERVAL, MAX_CONCURRENT_CHECKS, RETRY_ATTEMPTS, RETRY_BASE_DELAY)
+    kwargs = dict(
+        results=results, servers_provider=servers_provider, stats=stats, log_status=log_status,
+        agent=agent, overrun_policy=OVERRUN_POLICY,
     )
+    if WORKERS > 1:
+        # Probes run in worker processes; logs and stats stay in this one.
+        return ShardedMonitor(*args, workers=WORKERS, **kwargs)
+    return BackgroundMonitor(*args, **kwargs)
 
 def run_textual_tui():
     try:
@@ -376,6 +519,7 @@ def run_textual_tui():
     except Exception:
         console.print(t('tui.missing'))
         return
+    columns = ("group", "name", "host", "service", "port", "ping_ms", "uptime", "status")
     class TuiApp(App):
         CSS = """Screen {layout: vertical} #cmd {dock: top} DataTable {height: 1fr}"""
         def __init__(self):
@@ -383,6 +527,16 @@ def run_textual_tui():
             self.table = DataTable()
             self.cmd = Input(placeholder="/")
             self._mode = None
+            self._deps = DEPS or bootstrap()
+            self._results: ResultStore = self._deps["results"]
+            self._servers: List[Dict[str, Any]] = []
+            self._servers_ver: Any = None
+            self._stats: Dict[str, Dict[str, int]] = {}
+            self._row_keys: List[str] = []
+            self._cells: Dict[str, Tuple[str, ...]] = {}
+            self._dirty = True
+            self._engine: Optional[BackgroundMonitor] = None
+            self._seq: Optional[int] = None
         def compose(self):
             yield Header()
             yield self.cmd
@@ -391,78 +545,154 @@ def run_textual_tui():
         def on_mount(self):
             self.cmd.display = False
             self.table.clear(columns=True)
-            self.table.add_columns(
-                t("table.group"), t("table.name"), t("table.host"), t("table.service"), t("table.port")
-            )
+            for c in columns:
+                self.table.add_column(t(f"table.{c}"), key=c)
+            self._results.subscribe(self._on_result)
             if API_URL:
                 try:
                     import websockets
-                    import json as _json
                     async def _ws():
                         ws_url = API_URL.replace("http", "ws") + "/ws/servers"
-                        async with websockets.connect(ws_url) as conn:
-                            async for msg in conn:
-                                payload = _json.loads(msg)
-                                self._update(payload.get("servers", []))
+                        if codec.HAS_MSGPACK:
+                            ws_url += "?encoding=msgpack"
+                        while True:
+                            # A gap in the delta sequence means we missed an
+                            # update: reconnect to get a fresh snapshot.
+                            async with websockets.connect(ws_url) as conn:
+                                async for msg in conn:
+                                    payload = codec.unpackb(msg) if isinstance(msg, bytes) else codec.loads(msg)
+                                    if not self._apply_payload(payload):
+                                        break
                     self.run_worker(_ws())
                 except Exception:
-                    self.set_interval(max(0.5, float(REFRESH_INTERVAL)), self._refresh)
+                    self.set_interval(max(0.5, float(REFRESH_INTERVAL)), self._poll)
+                    self._poll()
             else:
-                self.set_interval(max(0.5, float(REFRESH_INTERVAL)), self._refresh)
-        def _filtered_sorted(self, servers):
-            s = servers
-            if app_state.current_group_filter:
-                s = [x for x in s if x.get("group", t("general.default_group")) == app_state.current_group_filter]
-            q = app_state.current_search_query
-            if q:
-                ql = q.lower()
-                def _hit(x):
-                    return (
-                        ql in str(x.get("group", t("general.default_group"))).lower()
-                        or ql in str(x.get("name", "")).lower()
-                        or ql in str(x.get("host", "")).lower()
-                        or ql in str(x.get("service", "")).lower()
+                # Local feed: the probe engine runs on the app's own loop and
+                # streams results into the shared ResultStore.
+                self._stats = load_stats()
+                self._servers = load_servers()
+                self._servers_ver = inventory_version()
+                self._engine = make_probe_engine(self._results, self._stats)
+                self._engine_worker = self.run_worker(self._engine.run(), exclusive=True)
+            self.set_interval(1.0 / max(1, REFRESH_PER_SECOND), self._flush)
+            self._render_page()
+        async def on_unmount(self):
+            self._results.unsubscribe(self._on_result)
+            if self._engine is not None:
+                # run() is a worker on this loop: let it wind down within its
+                # shutdown deadline before the pool is released.
+                self._engine.request_stop()
+                try:
+                    await asyncio.wait_for(
+                        self._engine_worker.wait(), self._engine.shutdown_deadline + max(PING_TIMEOUT, PORT_TIMEOUT) + 1.0
                     )
-                s = [x for x in s if _hit(x)]
-            svc = app_state.current_service_filter
-            if svc:
-                s = [x for x in s if x.get("service", "") == svc]
-            key = app_state.current_sort_key
-            desc = bool(app_state.sort_desc)
-            def _val(x):
-                if key == "group":
-                    return x.get("group", t("general.default_group"))
-                if key == "name":
-                    return x.get("name", "")
-                if key == "host":
-                    return x.get("host", "")
-                if key == "service":
-                    return x.get("service", "")
-                if key == "port":
-                    return int(x.get("port", 0))
-                return x.get("name", "")
-            s.sort(key=_val, reverse=desc)
-            total = len(s)
-            total_pages = max(1, (total + max(1, PAGE_SIZE) - 1) // max(1, PAGE_SIZE))
+                except Exception:
+                    pass
+                self._engine.close()
+                save_stats(self._engine.stats_snapshot())
+        def _on_result(self, entry):
+            # Called from the engine thread; the UI picks it up on the next flush.
+            self._dirty = True
+        def _poll(self):
+            def _fetch():
+                got = remote_client().fetch_many(["/servers", "/stats"])
+                payload = {"servers": got["/servers"] or [], "stats": got["/stats"] or {}}
+                self.call_from_thread(self._apply_payload, payload)
+            self.run_worker(_fetch, thread=True, exclusive=True, group="poll")
+        def _apply_payload(self, payload):
+            seq = payload.get("seq")
+            if payload.get("type") == "delta":
+                if self._seq is None or seq != self._seq + 1:
+                    return False
+                if "servers" in payload:
+                    self._servers = [validate_server_dict(x) for x in payload["servers"]]
+                self._stats.update(payload.get("stats") or {})
+                for key in payload.get("stats_removed") or []:
+                    self._stats.pop(key, None)
+                for key in payload.get("results_removed") or []:
+                    self._results.discard(key)
+            else:
+                self._servers = [validate_server_dict(x) for x in payload.get("servers", [])]
+                self._stats = payload.get("stats", {}) or {}
+            for entry in (payload.get("results") or {}).values():
+                self._results.put(entry)
+            self._seq = seq
+            self._dirty = True
+            return True
+        def _flush(self):
+            if self._engine is not None:
+                ver = inventory_version()
+                if ver != self._servers_ver:
+                    self._servers = load_servers()
+                    self._servers_ver = ver
+                    self._dirty = True
+            if self._dirty:
+                self._render_page()
+        def _entry(self, key):
+            entry = self._results.get(key)
+            if entry is None and key in self._stats:
+                st = self._stats[key]
+                total = int(st.get("ok", 0)) + int(st.get("fail", 0))
+                if total:
+                    entry = {"status": None, "rtt": None, "uptime": int(st.get("ok", 0)) / total * 100.0}
+            return entry
+        def _filtered_sorted(self, servers):
+            size = max(1, PAGE_SIZE)
+            filters = (
+                app_state.current_group_filter,
+                app_state.current_search_query,
+                app_state.current_service_filter,
+            )
+            def _page(page):
+                start = (page - 1) * size
+                return self._deps["sort_index"].view(
+                    servers, app_state.current_sort_key, bool(app_state.sort_desc), start, start + size,
+                    t("general.default_group"), server_key, results=self._results, filters=filters,
+                    inventory_version=self._servers_ver,
+                )
             try:
-                app_state.current_page = min(max(1, app_state.current_page), total_pages)
+                app_state.current_page = max(1, int(app_state.current_page))
             except Exception:
                 app_state.current_page = 1
-            start = (app_state.current_page - 1) * max(1, PAGE_SIZE)
-            end = start + max(1, PAGE_SIZE)
-            return s[start:end]
-        def _update(self, servers):
-            self.table.clear(rows=True)
-            for s in self._filtered_sorted(servers):
-                self.table.add_row(
-                    str(s.get("group", t("general.default_group"))),
-                    str(s.get("name", "")),
-                    str(s.get("host", "")),
-                    str(s.get("service", "")),
-                    str(int(s.get("port", 0)) or 0),
-                )
+            rows, total = _page(app_state.current_page)
+            total_pages = max(1, (total + size - 1) // size)
+            if app_state.current_page > total_pages:
+                app_state.current_page = total_pages
+                rows, total = _page(app_state.current_page)
+            return rows
+        def _render_page(self):
+            self._dirty = False
+            rows = self._filtered_sorted(self._servers)
+            keys: List[str] = []
+            seen: Dict[str, int] = {}
+            for srv in rows:
+                k = server_key(srv)
+                n = seen.get(k, 0)
+                seen[k] = n + 1
+                keys.append(k if n == 0 else f"{k}#{n}")
+            values = [
+                ui_row_values(srv, self._entry(server_key(srv)), t) for srv in rows
+            ]
+            if keys != self._row_keys:
+                # Page composition or order changed: rebuild the rows once.
+                self.table.clear()
+                self._cells = {}
+                for k, v in zip(keys, values):
+                    self.table.add_row(*v, key=k)
+                    self._cells[k] = v
+                self._row_keys = keys
+                return
+            for k, v in zip(keys, values):
+                old = self._cells.get(k)
+                if old == v:
+                    continue
+                for col, new_val, old_val in zip(columns, v, old or ()):
+                    if new_val != old_val:
+                        self.table.update_cell(k, col, new_val)
+                self._cells[k] = v
         def _refresh(self):
-            self._update(load_servers())
+            self._render_page()
         def on_input_submitted(self, event: Input.Submitted):
             val = event.value.strip()
             if self._mode == "search":
@@ -513,12 +743,12 @@ def run_textual_tui():
             app_state.current_page = max(1, app_state.current_page - 1)
             self._refresh()
         def key_greater_than(self):
-            keys = ['group','name','host','service','port']
+            keys = SORT_KEYS
             i = keys.index(app_state.current_sort_key) if app_state.current_sort_key in keys else 0
             app_state.current_sort_key = keys[(i + 1) % len(keys)]
             self._refresh()
         def key_less_than(self):
-            keys = ['group','name','host','service','port']
+            keys = SORT_KEYS
             i = keys.index(app_state.current_sort_key) if app_state.current_sort_key in keys else 0
             app_state.current_sort_key = keys[(i - 1) % len(keys)]
             self._refresh()
@@ -1002,8 +1232,14 @@ def settings_menu():
 # ------- İzleme ------- #
 
 def monitor_servers():
-    servers = load_servers()
-    if not servers:
+    pager = (DEPS or {}).get("pager")
+    if pager is not None:
+        servers: List[Dict[str, Any]] = []
+        _, total = pager.view(servers, app_state.current_sort_key, False, 0, 1, t("general.default_group"), server_key, block=True)
+    else:
+        servers = load_servers()
+        total = len(servers)
+    if not total:
         print_header()
         console.print(f"[red]{t('monitor.no_servers')}[/red]\n")
         return
@@ -1013,15 +1249,35 @@ def monitor_servers():
     time.sleep(1)
 
     stats = load_stats()
+    engine = make_probe_engine((DEPS or bootstrap())["results"], stats)
+    engine.start()
+    stopped = False
+
+    def _stop_engine() -> None:
+        nonlocal stopped
+        if stopped:
+            return
+        stopped = True
+        # The engine gives its running cycle shutdown_deadline seconds.
+        engine.stop(timeout=engine.shutdown_deadline + max(PING_TIMEOUT, PORT_TIMEOUT) + 1.0)
+        save_stats(engine.stats_snapshot())
+
     fd = sys.stdin.fileno()
     old = termios.tcgetattr(fd)
     try:
         tty.setcbreak(fd)
-        with Live(console=console, refresh_per_second=REFRESH_PER_SECOND, screen=LIVE_FULLSCREEN) as live:
+        # Repaints are driven by content changes rather than a fixed refresh rate.
+        with Live(console=console, auto_refresh=False, screen=LIVE_FULLSCREEN) as live:
             next_action = None
-            next_refresh = time.time()
+            # Frames tick on a fixed-rate monotonic grid; a slow frame skips
+            # ticks instead of pushing every later frame back.
+            render_interval = 1.0 / max(1, REFRESH_PER_SECOND)
+            frames = FixedRateSchedule(render_interval, "skip")
+            servers_ver = inventory_version()
+            next_reload = time.monotonic() + REFRESH_INTERVAL
+            last_size = console.size
             while True:
-                timeout = max(0.0, next_refresh - time.time())
+                timeout = frames.delay()
                 rlist, _, _ = select.select([sys.stdin], [], [], timeout)
                 if rlist:
                     ch = sys.stdin.read(1)
@@ -1062,34 +1318,53 @@ def monitor_servers():
                         break
                     if key == "]":
                         app_state.current_page += 1
+                        frames.trigger()
                         continue
                     if key == "[":
                         app_state.current_page = max(1, app_state.current_page - 1)
+                        frames.trigger()
                         continue
                     if key == ">":
-                        keys = ["group","name","host","service","port"]
+                        keys = SORT_KEYS
                         try:
                             i = keys.index(app_state.current_sort_key)
                         except Exception:
                             i = 1
                         app_state.current_sort_key = keys[(i + 1) % len(keys)]
+                        frames.trigger()
                         continue
                     if key == "<":
-                        keys = ["group","name","host","service","port"]
+                        keys = SORT_KEYS
                         try:
                             i = keys.index(app_state.current_sort_key)
                         except Exception:
                             i = 1
                         app_state.current_sort_key = keys[(i - 1) % len(keys)]
+                        frames.trigger()
                         continue
                     if key == "r":
                         app_state.sort_desc = not bool(getattr(app_state, "sort_desc", False))
+                        frames.trigger()
+                        continue
+                    if key == "d":
+                        app_state.show_render_stats = not app_state.show_render_stats
+                        frames.trigger()
                         continue
                 else:
-                    servers = load_servers()
-                    table = build_table(servers, stats)
-                    live.update(table)
-                    next_refresh = time.time() + REFRESH_INTERVAL
+                    # Rendering only reads probe results; the engine owns probing.
+                    frames.begin()
+                    ver = inventory_version()
+                    if pager is None and (ver != servers_ver or (ver is None and time.monotonic() >= next_reload)):
+                        servers = load_servers()
+                        servers_ver = ver
+                        next_reload = time.monotonic() + REFRESH_INTERVAL
+                    table, changed = build_table(servers)
+                    size = console.size
+                    if changed or size != last_size:
+                        live.update(table, refresh=True)
+                        last_size = size
+                    frames.end()
+        _stop_engine()
         # Restore cooked terminal before interactive prompts
         termios.tcsetattr(fd, termios.TCSADRAIN, old)
         termios.tcflush(fd, termios.TCIFLUSH)
@@ -1139,7 +1414,7 @@ def monitor_servers():
         pass
     finally:
         termios.tcsetattr(fd, termios.TCSADRAIN, old)
-        save_stats(stats)
+        _stop_engine()
 
 
 # ------- İlk Çalıştırma Kontrolü & Menü ------- #
@@ -1194,6 +1469,12 @@ if __name__ == "__main__":
     parser.add_argument("pos_lang", nargs="?", help="language code like 'en' or 'tr'")
     parser.add_argument("--lang", dest="lang", help="language code like 'en' or 'tr'")
     parser.add_argument("--api-url", dest="api_url", help="remote API base URL like 'http://127.0.0.1:8000'")
+    parser.add_argument("--api-timeout", dest="api_timeout", type=float, default=API_TIMEOUT, help="seconds to wait for each remote API or agent request")
+    parser.add_argument("--agent-url", dest="agent_url", help="ship probe results to a central API like 'http://central:8000'")
+    parser.add_argument("--agent-id", dest="agent_id", help="agent name used by the central API (default: host name)")
+    parser.add_argument("--workers", dest="workers", type=int, default=1, help="probe worker processes (sharded by server)")
+    parser.add_argument("--overrun-policy", dest="overrun_policy", choices=OVERRUN_POLICIES, default=OVERRUN_POLICY, help="when a probe cycle overruns its interval: skip, catch_up or stretch")
+    parser.add_argument("--daemon", action="store_true", help="run only the headless probe/log/stats daemon (see python -m ets_tm.daemon --help)")
     parser.add_argument("--tui", dest="use_tui", action="store_true", help="run Textual TUI mode")
     parser.add_argument("--version", "-V", action="store_true", help="print version and exit")
     parser.add_argument("--add", action="store_true", help="open add server flow")
@@ -1218,8 +1499,14 @@ if __name__ == "__main__":
         sys.exit(0)
     code = args.lang or args.pos_lang or DEFAULT_LANG
     set_language(code)
+    API_TIMEOUT = max(0.1, args.api_timeout)
+    WORKERS = max(1, args.workers)
+    OVERRUN_POLICY = args.overrun_policy
     if args.api_url:
         API_URL = args.api_url.rstrip("/")
+    if args.agent_url:
+        AGENT_URL = args.agent_url.rstrip("/")
+        AGENT_ID = args.agent_id or re.sub(r"[^A-Za-z0-9._-]", "-", socket.gethostname())[:64] or "agent"
     DEPS = bootstrap()
     if args.add_language:
         code = args.add_language.strip()
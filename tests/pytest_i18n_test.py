@@ -22,4 +22,30 @@ def test_t_tr_menu_title():
 def test_t_fallback_key():
     m = _reload_monitor()
     m.set_language("en")
-    assert m.t("nonexistent.key") == "nonexistent.key"
\ No newline at end of file
+    assert m.t("nonexistent.key") == "nonexistent.key"
+
+def test_t_formats_precompiled_template():
+    m = _reload_monitor()
+    m.set_language("en")
+    assert m.t("table.page", page=2, total=5) == "Page 2/5"
+    assert m.t("table.page") == "Page {page}/{total}"
+
+
+def test_translator_invalidated_on_language_switch():
+    m = _reload_monitor()
+    m.set_language("en")
+    assert m.t("table.status") == "Status"
+    m.set_language("tr")
+    assert m.t("table.status") == "Durum"
+    assert m.t("service.Unlisted") == "service.Unlisted"
+
+
+def test_translator_matches_str_format():
+    from ets_tm.i18n import Translator
+
+    tr = Translator({"a": "{x:>5}|{y!r}", "b": "{{literal}}", "c": "{0}"}, {"d": "fallback"})
+    assert tr("a", x="ab", y="q") == "{x:>5}|{y!r}".format(x="ab", y="q")
+    assert tr("b") == "{literal}"
+    assert tr("c", x=1) == "{0}"
+    assert tr("d") == "fallback"
+    assert tr("a") == "{x:>5}|{y!r}"
@@ -0,0 +1,111 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ets_tm.agent import AgentShipper, decode_batch, parse_record
+
+
+class _Ingest(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.batches.append((self.headers["X-Batch-Id"], decode_batch(body)))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+
+SERVER = {"group": "Web", "name": "srv1", "host": "127.0.0.1", "service": "HTTP", "port": 80}
+
+
+class TestAgentShipper(unittest.TestCase):
+    def test_spools_while_central_is_down_then_ships_oldest_first(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Ingest)
+        server.batches = []
+        port = server.server_port
+        server.server_close()  # nothing listening yet
+        with tempfile.TemporaryDirectory() as d:
+            agent = AgentShipper(f"http://127.0.0.1:{port}", "zone-a", d, timeout=0.5, batch_size=2)
+            for i in range(3):
+                agent.record("127.0.0.1:80:HTTP", SERVER, float(i), True, ts=100.0 + i)
+            self.assertEqual(agent.flush(), 0)
+            self.assertEqual(len(agent.pending()), 2)
+            self.assertIsNotNone(agent.last_error)
+
+            server = ThreadingHTTPServer(("127.0.0.1", port), _Ingest)
+            server.batches = []
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                agent.record("127.0.0.1:80:HTTP", SERVER, None, False, ts=200.0)
+                self.assertEqual(agent.flush(), 3)
+            finally:
+                agent.close()
+                server.shutdown()
+                server.server_close()
+            self.assertEqual(agent.pending(), [])
+            ids = [b for b, _ in server.batches]
+            self.assertEqual(ids, sorted(ids))
+            rows = [parse_record(r) for _, recs in server.batches for r in recs]
+            self.assertEqual([r[1] for r in rows], [100.0, 101.0, 102.0, 200.0])
+            self.assertFalse(rows[-1][2])
+
+    def test_spool_is_capped(self):
+        with tempfile.TemporaryDirectory() as d:
+            agent = AgentShipper("http://127.0.0.1:9", "a", d, timeout=0.2, batch_size=1, max_batches=2)
+            for i in range(4):
+                agent.record("k", SERVER, None, True, ts=float(i))
+            agent.flush()
+            self.assertEqual(len(agent.pending()), 2)
+            with open(os.path.join(d, agent.pending()[0]), "rb") as f:
+                self.assertEqual(decode_batch(f.read())[0]["ts"], 2.0)
+
+    def test_ship_never_blocks_on_a_hung_central_node(self):
+        # Accepts connections but never answers.
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(8)
+        with tempfile.TemporaryDirectory() as d:
+            agent = AgentShipper(f"http://127.0.0.1:{sock.getsockname()[1]}", "a", d, timeout=1.0)
+            try:
+                agent.record("k", SERVER, None, True, ts=1.0)
+                started = time.perf_counter()
+                agent.ship()
+                agent.ship()
+                self.assertLess(time.perf_counter() - started, 0.5)
+            finally:
+                agent.close()
+                sock.close()
+            self.assertEqual(len(agent.pending()), 1)
+
+    def test_failed_spool_write_keeps_results(self):
+        with tempfile.TemporaryDirectory() as d:
+            spool = os.path.join(d, "spool")
+            agent = AgentShipper("http://127.0.0.1:9", "a", spool, timeout=0.2)
+            shutil.rmtree(spool)
+            agent.record("k", SERVER, None, True, ts=1.0)
+            self.assertEqual(agent.flush(), 0)
+            self.assertTrue(agent.last_error.startswith("spool"))
+            os.makedirs(spool)
+            agent.flush()
+            with open(os.path.join(spool, agent.pending()[0]), "rb") as f:
+                self.assertEqual(decode_batch(f.read())[0]["ts"], 1.0)
+            agent.close()
+
+    def test_rejects_invalid_agent_id(self):
+        with tempfile.TemporaryDirectory() as d:
+            with self.assertRaises(ValueError):
+                AgentShipper("http://127.0.0.1:9", "zone/a", d)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+import os
+import tempfile
+import unittest
+
+try:
+    from fastapi.testclient import TestClient
+    from ets_tm import api
+    HAS_API = True
+except Exception:
+    HAS_API = False
+
+from ets_tm.repo import FileRepository
+
+
+def _repo(d):
+    return FileRepository(
+        os.path.join(d, "servers.txt"),
+        os.path.join(d, "servers.bak"),
+        os.path.join(d, "server_stats.json"),
+        os.path.join(d, "config.json"),
+    )
+
+
+SERVER = {"group": "Web", "name": "srv1", "host": "127.0.0.1", "service": "HTTP", "port": 80}
+
+
+@unittest.skipUnless(HAS_API, "fastapi not installed")
+class TestAPI(unittest.TestCase):
+    def test_reads_served_from_memory_and_writes_persisted(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                self.assertEqual(client.get("/servers").json(), [SERVER])
+                os.unlink(repo.servers_path)
+                self.assertEqual(client.get("/servers").json(), [SERVER])
+                new = dict(SERVER, name="srv2")
+                self.assertEqual(client.post("/servers", json=new).status_code, 200)
+                self.assertEqual([s["name"] for s in repo.get_servers()], ["srv1", "srv2"])
+                self.assertEqual(client.delete("/servers/5").status_code, 404)
+                self.assertEqual(client.get("/settings").json()["page_size"], 20)
+
+    def test_refresh_picks_up_external_writes(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_stats({})
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                self.assertEqual(client.get("/stats").json(), {})
+                repo.save_stats({"127.0.0.1:80:HTTP": {"ok": 3, "fail": 1}})
+                client.portal.call(app.state.svc.refresh)
+                self.assertEqual(client.get("/stats").json()["127.0.0.1:80:HTTP"]["ok"], 3)
+
+    def test_check_requests_share_one_probe(self):
+        import threading
+        import time as _time
+
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            calls = []
+            with TestClient(app) as client:
+                prober = app.state.prober
+
+                def _slow_ping(host):
+                    calls.append(host)
+                    _time.sleep(0.3)
+                    return 5.0
+
+                prober.svc.ping_host = _slow_ping
+                prober.svc.check_port = lambda host, port: True
+                out = []
+                threads = [
+                    threading.Thread(target=lambda: out.append(client.get("/servers/0/check").json()))
+                    for _ in range(4)
+                ]
+                for th in threads:
+                    th.start()
+                for th in threads:
+                    th.join()
+                self.assertEqual(len(calls), 1)
+                self.assertEqual(out, [{"rtt": 5.0, "port_open": True}] * 4)
+                res = client.get("/results/0").json()
+                self.assertEqual((res["status"], res["rtt"]), ("UP", 5.0))
+
+    def test_embedded_monitor_publishes_results(self):
+        import time as _time
+
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            settings = dict(api.DEFAULTS, ping_timeout=0.05, port_timeout=0.05, retry_attempts=1, retry_base_delay=0.0)
+            repo.save_settings(settings)
+            app = api.create_app(repo, os.path.join(d, "monitor.log"), embed_monitor=True)
+            with TestClient(app) as client:
+                deadline = _time.time() + 5.0
+                res = {}
+                while not res and _time.time() < deadline:
+                    res = client.get("/results").json()
+                    _time.sleep(0.05)
+                self.assertIn("127.0.0.1:80:HTTP", res)
+                self.assertEqual(client.get("/results/0").json()["key"], "127.0.0.1:80:HTTP")
+
+    def test_ws_sends_snapshot_then_deltas(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                with client.websocket_connect("/ws/servers") as ws:
+                    first = ws.receive_json()
+                    self.assertEqual((first["type"], first["servers"]), ("snapshot", [SERVER]))
+                    app.state.svc.results.record("127.0.0.1:80:HTTP", 3.0, True, 100.0)
+                    delta = ws.receive_json()
+                    self.assertEqual((delta["type"], delta["seq"]), ("delta", first["seq"] + 1))
+                    self.assertEqual(list(delta["results"]), ["127.0.0.1:80:HTTP"])
+                    self.assertNotIn("servers", delta)
+
+
+    def test_conditional_get_returns_304_until_changed(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                first = client.get("/servers")
+                etag = first.headers["etag"]
+                self.assertEqual(first.headers["cache-control"], "no-cache")
+                again = client.get("/servers", headers={"If-None-Match": etag})
+                self.assertEqual((again.status_code, again.content), (304, b""))
+                self.assertEqual(client.get("/stats", headers={"If-None-Match": etag}).status_code, 200)
+                client.post("/servers", json=dict(SERVER, name="srv2"))
+                changed = client.get("/servers", headers={"If-None-Match": etag})
+                self.assertEqual(changed.status_code, 200)
+                self.assertNotEqual(changed.headers["etag"], etag)
+                self.assertEqual(len(changed.json()), 2)
+
+
+    def test_servers_filtered_sorted_and_paged_server_side(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([dict(SERVER, name=f"srv{i:02d}", group="Web" if i % 2 else "Db") for i in range(30)])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                first = client.get("/servers", params={"group": "Web", "sort": "name", "desc": "true", "limit": 10})
+                self.assertEqual(first.headers["x-total-count"], "15")
+                self.assertEqual(first.json()[0]["name"], "srv29")
+                nxt = client.get("/servers", params={"group": "Web", "sort": "name", "desc": "true", "limit": 10, "cursor": first.headers["x-next-cursor"]})
+                self.assertEqual([s["name"] for s in nxt.json()], ["srv09", "srv07", "srv05", "srv03", "srv01"])
+                self.assertNotIn("x-next-cursor", nxt.headers)
+                self.assertEqual(client.get("/servers", params={"q": "srv1", "page": 2, "limit": 5}).json()[0]["name"], "srv15")
+                self.assertEqual(client.get("/servers", params={"sort": "bogus"}).status_code, 400)
+                self.assertEqual(len(client.get("/servers").json()), 30)
+
+
+    def test_batch_mutation_is_all_or_nothing(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([dict(SERVER, name=f"srv{i}") for i in range(3)])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                bad = {"operations": [{"op": "delete", "index": 0}, {"op": "update", "index": 9, "server": SERVER}]}
+                self.assertEqual(client.post("/servers:batch", json=bad).status_code, 400)
+                self.assertEqual(len(repo.get_servers()), 3)
+                ops = {"operations": [
+                    {"op": "delete", "index": 0},
+                    {"op": "update", "index": 2, "server": dict(SERVER, name="renamed")},
+                    {"op": "add", "server": dict(SERVER, name="new")},
+                ]}
+                res = client.post("/servers:batch", json=ops).json()
+                self.assertEqual(res, {"added": 1, "updated": 1, "deleted": 1, "total": 3})
+                self.assertEqual([s["name"] for s in repo.get_servers()], ["srv1", "renamed", "new"])
+
+    def test_check_batch_streams_ndjson_until_deadline(self):
+        import json
+        import time as _time
+
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([dict(SERVER, host="fast"), dict(SERVER, host="slow")])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                prober = app.state.prober
+
+                def _ping(host):
+                    if host == "slow":
+                        _time.sleep(1.0)
+                    return 1.0
+
+                prober.svc.ping_host = _ping
+                prober.svc.check_port = lambda host, port: True
+                resp = client.post("/check:batch", json={"deadline": 0.3})
+                self.assertEqual(resp.headers["content-type"], "application/x-ndjson")
+                lines = [json.loads(x) for x in resp.text.splitlines()]
+                self.assertEqual([(x["key"], x["status"]) for x in lines], [("fast:80:HTTP", "UP"), ("slow:80:HTTP", "TIMEOUT")])
+
+
+    def test_large_responses_are_gzipped(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([dict(SERVER, name=f"srv{i}") for i in range(100)])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            with TestClient(app) as client:
+                big = client.get("/servers", headers={"Accept-Encoding": "gzip"})
+                self.assertEqual(big.headers.get("content-encoding"), "gzip")
+                self.assertEqual(len(big.json()), 100)
+                small = client.get("/version", headers={"Accept-Encoding": "gzip"})
+                self.assertNotIn("content-encoding", small.headers)
+
+
+    def test_history_served_from_log_rollups(self):
+        import time as _time
+        from ets_tm import app_io
+
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            log = os.path.join(d, "monitor.log")
+            now = _time.time()
+            for i, status in enumerate(["UP", "UP", "DOWN"]):
+                stamp = _time.strftime("%Y-%m-%dT%H:%M:%S", _time.localtime(now - 30 + i * 10))
+                app_io.append_log_row(log, [stamp, "Web", "srv1", "127.0.0.1", "HTTP", "80", status, "5.0", "-"])
+            app = api.create_app(repo, log)
+            with TestClient(app) as client:
+                res = client.get("/history/0", params={"from": now - 60, "to": now + 1, "step": 61}).json()
+                self.assertEqual(res["servers"], ["127.0.0.1:80:HTTP"])
+                self.assertEqual(res["resolution"], 60)
+                self.assertEqual([(p["up"], p["down"]) for p in res["points"]], [(2, 1)])
+                grouped = client.get("/history", params={"group": "Web", "from": now - 60, "to": now + 1}).json()
+                self.assertEqual(sum(p["up"] for p in grouped["points"]), 2)
+                self.assertIn("from", grouped)
+                self.assertEqual(client.get("/history/7").status_code, 404)
+
+    def test_log_summary_is_built_from_history_on_request(self):
+        import time as _time
+        from ets_tm import app_io
+
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            log = os.path.join(d, "monitor.log")
+            stamp = _time.strftime("%Y-%m-%dT%H:%M:%S", _time.localtime(_time.time() - 30))
+            app_io.append_log_row(log, [stamp, "Web", "srv1", "127.0.0.1", "HTTP", "80", "UP", "5.0", "-"])
+            app = api.create_app(repo, log)
+            with TestClient(app) as client:
+                self.assertNotIn("summary", app.state.svc._paths())
+                res = client.get("/logs/summary")
+                self.assertEqual(res.status_code, 200)
+                self.assertEqual(res.json()["1h"], {"up": 1, "down": 0, "avg_ping": 5.0, "uptime": 100.0})
+                again = client.get("/logs/summary", headers={"If-None-Match": res.headers["etag"]})
+                self.assertEqual(again.status_code, 304)
+
+    def test_ingest_is_idempotent_by_batch_id(self):
+        import time as _time
+        from ets_tm.agent import encode_batch
+
+        with tempfile.TemporaryDirectory() as d:
+            repo = _repo(d)
+            repo.save_servers([SERVER])
+            app = api.create_app(repo, os.path.join(d, "monitor.log"))
+            now = _time.time()
+            records = [
+                {"key": "127.0.0.1:80:HTTP", "ts": now - 20, "up": True, "rtt": 4.0},
+                {"key": "127.0.0.1:80:HTTP", "ts": now - 10, "up": False, "rtt": None},
+                {"ts": now},
+            ]
+            headers = {"X-Agent-Id": "zone-a", "X-Batch-Id": "b1", "Content-Encoding": "gzip"}
+            with TestClient(app) as client:
+                res = client.post("/ingest", content=encode_batch(records), headers=headers).json()
+                self.assertEqual((res["accepted"], res["rejected"], res["duplicate"]), (2, 1, False))
+                again = client.post("/ingest", content=encode_batch(records), headers=headers).json()
+                self.assertTrue(again["duplicate"])
+                self.assertEqual(client.get("/stats").json()["zone-a/127.0.0.1:80:HTTP"], {"ok": 1, "fail": 1})
+                self.assertNotIn("zone-a/127.0.0.1:80:HTTP", repo.get_stats())
+                self.assertEqual(repo.get_ingest()["stats"]["zone-a/127.0.0.1:80:HTTP"], {"ok": 1, "fail": 1})
+                hist = client.get("/history/0", params={"agent": "zone-a", "from": now - 60, "to": now + 1}).json()
+                self.assertEqual(sum(p["up"] + p["down"] for p in hist["points"]), 2)
+                bad = client.post("/ingest", content=b"x", headers={"X-Agent-Id": "a/b", "X-Batch-Id": "b2"})
+                self.assertEqual(bad.status_code, 400)
+            # Seen batch ids and agent history survive a restart.
+            with TestClient(api.create_app(repo, os.path.join(d, "monitor.log"))) as client:
+                self.assertTrue(client.post("/ingest", content=encode_batch(records), headers=headers).json()["duplicate"])
+                self.assertEqual(client.get("/stats").json()["zone-a/127.0.0.1:80:HTTP"], {"ok": 1, "fail": 1})
+                hist = client.get("/history/0", params={"agent": "zone-a", "from": now - 60, "to": now + 1}).json()
+                self.assertEqual(sum(p["up"] + p["down"] for p in hist["points"]), 2)
+                self.assertEqual(client.get("/logs/summary").json()["1h"]["up"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,13 @@ import os
 from ets_tm.repo import FileRepository
 from ets_tm.services import MonitoringService
 from ets_tm.background import BackgroundMonitor
+from ets_tm.results import ResultStore
+
+
+def _render(metrics):
+    out = []
+    metrics.render(out)
+    return out
 
 
 class TestBackground(unittest.TestCase):
@@ -33,6 +40,7 @@ class TestBackground(unittest.TestCase):
 
             svc = MonitoringService(0.05, 0.05, False)
             mon = BackgroundMonitor(repo, svc, log_path, 0.2, 2, 1, 0.01)
+            self.addCleanup(mon.close)
             mon.run_once()
 
             stats = repo.get_stats()
@@ -43,6 +51,340 @@ class TestBackground(unittest.TestCase):
             self.assertTrue(lines[0].startswith("date;"))
             self.assertTrue(len(lines) >= 2)
 
+    def test_run_once_records_full_inventory_in_memory(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = FileRepository(
+                os.path.join(d, "servers.txt"),
+                os.path.join(d, "servers.bak"),
+                os.path.join(d, "server_stats.json"),
+                os.path.join(d, "config.json"),
+            )
+            servers = [
+                {"name": f"srv{i}", "host": "127.0.0.1", "group": "General", "service": "Custom Port", "port": 1}
+                for i in range(1, 6)
+            ]
+            svc = MonitoringService(0.05, 0.05, False)
+            svc.ping_host = lambda host: 1.0
+            svc.check_port = lambda host, port: port == 3
+            results = ResultStore()
+            stats = {}
+            logged = []
+            mon = BackgroundMonitor(
+                repo, svc, os.path.join(d, "monitor.log"), 0.5, 2, 1, 0.0,
+                results=results,
+                servers_provider=lambda: [dict(s, port=i) for i, s in enumerate(servers, start=1)],
+                stats=stats,
+                log_status=lambda srv, up, rtt, uptime: logged.append((srv["name"], up)),
+            )
+            self.addCleanup(mon.close)
+            mon.run_once()
+            self.assertEqual(len(results.snapshot()), 5)
+            self.assertEqual(results.get("127.0.0.1:3:Custom Port")["status"], "UP")
+            self.assertEqual(len(stats), 5)
+            self.assertEqual(len(logged), 5)
+            self.assertFalse(os.path.exists(os.path.join(d, "server_stats.json")))
+
+    def test_run_forever_is_fixed_rate(self):
+        import time
+
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: (time.sleep(0.2), 1.0)[1]
+        svc.check_port = lambda host, port: True
+        starts = []
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 1, 0.0,
+            servers_provider=lambda: starts.append(time.monotonic()) or [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats={},
+            log_status=lambda *a: None,
+        )
+        mon.run_forever(stop_after_cycles=3)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        # Sleep-after-cycle would give ~0.7s; fixed-rate keeps the 0.5s period.
+        self.assertTrue(all(0.45 < g < 0.6 for g in gaps), gaps)
+        self.assertEqual(mon.metrics.cycle_lateness_seconds.count, 3)
+        # run_once and run_forever share one loop and probe pool.
+        loop, pool = mon._loop, mon._executor
+        mon.run_once()
+        self.assertIs(mon._loop, loop)
+        self.assertIs(mon._executor, pool)
+        mon.close()
+
+    def test_stop_cancels_inflight_probes_after_deadline(self):
+        import asyncio
+        import time
+
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: (time.sleep(1.5), 1.0)[1]
+        svc.check_port = lambda host, port: True
+        committed = []
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 1, 0.0,
+            servers_provider=lambda: [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats={},
+            log_status=lambda *a: committed.append(a),
+        )
+        mon.shutdown_deadline = 0.1
+
+        async def main():
+            task = asyncio.ensure_future(mon.run())
+            await asyncio.sleep(0.2)
+            self.assertEqual(mon.metrics.inflight, 1)
+            started = time.monotonic()
+            mon.request_stop()
+            await task
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(main())
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(committed, [])
+        self.assertEqual(mon.metrics.inflight, 0)
+        mon.close()
+
+    def test_failed_cycle_is_logged_and_counted(self):
+        def _broken():
+            raise ValueError("bad inventory")
+
+        mon = BackgroundMonitor(None, MonitoringService(0.05, 0.05, False), "", 0.5, 2, 1, 0.0, servers_provider=_broken)
+        with self.assertLogs("ets_tm.background", "ERROR") as logs:
+            mon.run_forever(stop_after_cycles=1)
+        self.assertIn("bad inventory", "\n".join(logs.output))
+        self.assertEqual(mon.metrics.cycles_failed_total, 1)
+        self.assertIn("ets_tm_probe_cycles_failed_total 1", "\n".join(_render(mon.metrics)))
+        mon.close()
+
+    def test_close_keeps_pool_down_until_next_run_and_snapshots_stats(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: 1.0
+        svc.check_port = lambda host, port: True
+        stats = {}
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 1, 0.0,
+            servers_provider=lambda: [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats=stats,
+            log_status=lambda *a: None,
+        )
+        mon.close()
+        with self.assertRaises(RuntimeError):
+            mon._pool()
+        mon.run_once()
+        snap = mon.stats_snapshot()
+        self.assertEqual(snap, {"h:80:HTTP": {"ok": 1, "fail": 0}})
+        snap["h:80:HTTP"]["ok"] = 5
+        self.assertEqual(stats["h:80:HTTP"]["ok"], 1)
+        mon.close()
+
+    def test_status_change_is_confirmed_before_commit(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: 1.0
+        answers = []
+        svc.check_port = lambda host, port: answers.pop(0)
+        results = ResultStore()
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 1, 0.0,
+            results=results,
+            servers_provider=lambda: [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats={},
+            log_status=lambda *a: None,
+            confirm_attempts=2,
+            confirm_interval=0.0,
+        )
+        key = "h:80:HTTP"
+        answers[:] = [True]
+        mon.run_once()
+        self.assertEqual(results.get(key)["status"], "UP")
+        # One failed probe, then the re-probe answers: no transition.
+        answers[:] = [False, True]
+        mon.run_once()
+        self.assertEqual(results.get(key)["status"], "UP")
+        self.assertEqual(answers, [])
+        # Failure holds through both re-probes: committed as DOWN.
+        answers[:] = [False, False, False]
+        mon.run_once()
+        self.assertEqual(results.get(key)["status"], "DOWN")
+        self.assertEqual(answers, [])
+        self.assertEqual((mon.metrics.confirmations_total, mon.metrics.flaps_suppressed_total), (2, 1))
+        mon.close()
+
+    def test_confirmation_reprobes_are_single_attempts(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: 1.0
+        calls = []
+        up = {"v": True}
+
+        def _port(host, port):
+            calls.append(host)
+            return up["v"]
+
+        svc.check_port = _port
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 3, 0.0,
+            results=ResultStore(),
+            servers_provider=lambda: [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats={},
+            log_status=lambda *a: None,
+            confirm_attempts=2,
+            confirm_interval=0.0,
+        )
+        mon.run_once()
+        self.assertEqual(len(calls), 1)
+        del calls[:]
+        # The cycle's probe retries 3 times; each confirmation re-probe once.
+        up["v"] = False
+        mon.run_once()
+        self.assertEqual(len(calls), 3 + 2)
+        mon.close()
+
+    def test_breaker_skips_down_host_until_half_open_probe(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: None
+        calls = []
+        answers = {"up": False}
+
+        def _port(host, port):
+            calls.append(host)
+            return answers["up"]
+
+        svc.check_port = _port
+        results = ResultStore()
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 3, 0.0,
+            results=results,
+            servers_provider=lambda: [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats={},
+            log_status=lambda *a: None,
+            confirm_attempts=0,
+            breaker_threshold=2,
+        )
+        now = [0.0]
+        mon.breaker.clock = lambda: now[0]
+        key = "h:80:HTTP"
+        mon.run_once()
+        mon.run_once()
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(results.get(key)["breaker"], "open")
+        # Open: not probed until the back-off (2 intervals) elapses.
+        now[0] = 0.5
+        mon.run_once()
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(mon.metrics.breaker_skips_total, 1)
+        # Half-open probe without retries; the host answers and closes it.
+        now[0] = 1.0
+        answers["up"] = True
+        mon.run_once()
+        self.assertEqual(len(calls), 7)
+        self.assertEqual(results.get(key)["status"], "UP")
+        self.assertEqual(results.get(key)["breaker"], "closed")
+        mon.close()
+
+    def test_cycles_held_by_open_breaker_count_as_down(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        svc.ping_host = lambda host: None
+        calls = []
+        up = {"v": True}
+
+        def _port(host, port):
+            calls.append(host)
+            return up["v"]
+
+        svc.check_port = _port
+        stats = {}
+        rows = []
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 2, 1, 0.0,
+            results=ResultStore(),
+            servers_provider=lambda: [{"name": "a", "host": "h", "service": "HTTP", "port": 80}],
+            stats=stats,
+            log_status=lambda srv, ok, rtt, uptime: rows.append(ok),
+            confirm_attempts=0,
+            breaker_threshold=2,
+            breaker_max_interval=1000.0,
+        )
+        mon.breaker.clock = lambda: 0.0
+        try:
+            for _ in range(10):
+                mon.run_once()
+            up["v"] = False
+            for _ in range(10):
+                mon.run_once()
+            # Two probes opened the breaker; the other eight cycles are held.
+            self.assertEqual(len(calls), 12)
+            self.assertEqual(stats["h:80:HTTP"], {"ok": 10, "fail": 10})
+            self.assertEqual(rows, [True] * 10 + [False] * 10)
+            self.assertEqual(mon.results.get("h:80:HTTP")["uptime"], 50.0)
+        finally:
+            mon.close()
+
+    def test_children_of_down_parent_are_unreachable_without_probing(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        up = {"gw": False, "app": True}
+        probed = []
+
+        def _port(host, port):
+            probed.append(host)
+            return up[host]
+
+        svc.ping_host = lambda host: None
+        svc.check_port = _port
+        results = ResultStore()
+        stats = {}
+        logged = []
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 4, 1, 0.0,
+            results=results,
+            servers_provider=lambda: [
+                {"name": "app", "host": "app", "service": "HTTP", "port": 80, "depends_on": "gw"},
+                {"name": "gw", "host": "gw", "service": "HTTP", "port": 80},
+            ],
+            stats=stats,
+            log_status=lambda srv, *a: logged.append(srv["name"]),
+            confirm_attempts=0,
+        )
+        mon.run_once()
+        self.assertEqual(probed, ["gw"])
+        self.assertEqual(logged, ["gw"])
+        self.assertEqual(results.get("app:80:HTTP")["status"], "UNREACHABLE")
+        self.assertNotIn("app:80:HTTP", stats)
+        self.assertEqual(mon.metrics.unreachable_total, 1)
+        up["gw"] = True
+        mon.run_once()
+        self.assertEqual(probed, ["gw", "gw", "app"])
+        self.assertEqual(results.get("app:80:HTTP")["status"], "UP")
+        mon.close()
+
+    def test_entries_on_one_address_share_ping_and_port_checks(self):
+        svc = MonitoringService(0.05, 0.05, False)
+        pings, ports = [], []
+
+        def _ping(host):
+            pings.append(host)
+            return 1.0
+
+        def _port(host, port):
+            ports.append(port)
+            return True
+
+        svc.ping_host = _ping
+        svc.check_port = _port
+        results = ResultStore()
+        mon = BackgroundMonitor(
+            None, svc, "", 0.5, 4, 1, 0.0,
+            results=results,
+            servers_provider=lambda: [
+                {"name": "web", "host": "127.0.0.1", "service": "HTTPS", "port": 443},
+                {"name": "ssh", "host": "127.0.0.1", "service": "SSH", "port": 22},
+                {"name": "alt", "host": "127.0.0.1", "service": "Custom Port", "port": 443},
+            ],
+            stats={},
+            log_status=lambda *a: None,
+        )
+        mon.run_once()
+        self.assertEqual(len(pings), 1)
+        self.assertEqual(sorted(ports), [22, 443])
+        self.assertEqual(len(results.snapshot()), 3)
+        self.assertTrue(all(e["rtt"] == 1.0 for e in results.snapshot().values()))
+        self.assertEqual(mon.metrics.shared_probes_total, 3)
+        mon.close()
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import unittest
+
+from ets_tm.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_backs_off_exponentially(self):
+        b = CircuitBreaker(threshold=3, max_interval=10.0, clock=lambda: 0.0)
+        for _ in range(2):
+            self.assertEqual(b.record("k", False, 1.0, now=0.0), CLOSED)
+        self.assertEqual(b.record("k", False, 1.0, now=0.0), OPEN)
+        self.assertFalse(b.allow("k", now=1.9))
+        self.assertTrue(b.allow("k", now=2.0))
+        self.assertEqual(b.state("k"), HALF_OPEN)
+        # Failed half-open probe: the gap doubles, up to the cap.
+        b.record("k", False, 1.0, now=2.0)
+        self.assertFalse(b.allow("k", now=5.9))
+        self.assertTrue(b.allow("k", now=6.0))
+        for _ in range(5):
+            b.record("k", False, 1.0, now=0.0)
+        self.assertFalse(b.allow("k", now=9.9))
+        self.assertTrue(b.allow("k", now=10.0))
+        self.assertEqual(b.open_count(), 1)
+
+    def test_success_closes_and_zero_threshold_disables(self):
+        b = CircuitBreaker(threshold=1, clock=lambda: 0.0)
+        b.record("k", False, 1.0, now=0.0)
+        self.assertEqual(b.state("k"), OPEN)
+        self.assertEqual(b.record("k", True, 1.0), CLOSED)
+        self.assertTrue(b.allow("k", now=0.0))
+        b.threshold = 0
+        b.record("k", False, 1.0, now=0.0)
+        self.assertTrue(b.allow("k", now=0.0))
+        b.retain([])
+        self.assertEqual(len(b), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
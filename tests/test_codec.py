@@ -0,0 +1,23 @@
+import unittest
+from unittest import mock
+
+from ets_tm import codec
+
+
+class TestCodec(unittest.TestCase):
+    def test_fast_and_stdlib_paths_round_trip_the_same_data(self):
+        data = {"servers": [{"name": "ağ-1", "port": 80, "rtt": 1.5, "up": True, "group": None}]}
+        with mock.patch.object(codec, "HAS_ORJSON", False):
+            plain = codec.dumps_bytes(data)
+            self.assertEqual(codec.loads(plain), data)
+        self.assertEqual(codec.loads(codec.dumps(data)), data)
+        self.assertEqual(codec.loads(plain.decode("utf-8")), data)
+
+    @unittest.skipIf(codec.HAS_MSGPACK, "msgpack installed")
+    def test_packb_requires_msgpack(self):
+        with self.assertRaises(RuntimeError):
+            codec.packb({})
+
+
+if __name__ == "__main__":
+    unittest.main()
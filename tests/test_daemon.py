@@ -0,0 +1,85 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from ets_tm import daemon
+from ets_tm.background import BackgroundMonitor
+from ets_tm.daemon import AlreadyRunning, PidLock, _serve_status, read_status
+from ets_tm.results import ResultStore
+from ets_tm.services import MonitoringService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestDaemon(unittest.TestCase):
+    def test_import_skips_ui_dependencies(self):
+        code = "import sys, ets_tm.daemon; print(sorted(m for m in ('rich', 'termios', 'ets_tm.ui', 'ets_tm.i18n') if m in sys.modules))"
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "[]")
+
+    def test_pid_lock_is_single_instance(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "agent.pid")
+            first = PidLock(path)
+            first.acquire()
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(int(f.read()), os.getpid())
+            with self.assertRaises(AlreadyRunning):
+                PidLock(path).acquire()
+            first.release()
+            self.assertFalse(os.path.exists(path))
+            again = PidLock(path)
+            again.acquire()
+            again.release()
+
+    @unittest.skipUnless(daemon.HAS_FCNTL, "needs fcntl")
+    def test_pid_lock_retries_when_file_was_unlinked_before_lock(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "agent.pid")
+            real = daemon.fcntl.flock
+            calls = []
+
+            def _flock(fd, op):
+                # The previous holder releases (unlinks) between our open and flock.
+                if not calls:
+                    os.unlink(path)
+                calls.append(fd)
+                return real(fd, op)
+
+            daemon.fcntl.flock = _flock
+            try:
+                lock = PidLock(path)
+                lock.acquire()
+            finally:
+                daemon.fcntl.flock = real
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(os.fstat(lock._fd).st_ino, os.stat(path).st_ino)
+            lock.release()
+
+    @unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "no unix sockets")
+    def test_status_socket_reports_engine_state(self):
+        results = ResultStore()
+        results.record("127.0.0.1:80:HTTP", 1.0, True, 100.0)
+        results.record("127.0.0.1:81:HTTP", None, False, 0.0)
+        mon = BackgroundMonitor(None, MonitoringService(0.1, 0.1, False), "", 2.0, 2, 1, 0.0, results=results)
+
+        async def main(path):
+            server = await _serve_status(path, mon, results, 0.0)
+            try:
+                return await asyncio.to_thread(read_status, path)
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        with tempfile.TemporaryDirectory() as d:
+            status = asyncio.run(main(os.path.join(d, "s.sock")))
+        self.assertEqual((status["servers"], status["up"], status["down"]), (2, 1, 1))
+        self.assertEqual(status["pid"], os.getpid())
+        self.assertEqual(status["interval"], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from ets_tm.background import server_key
+from ets_tm.deps import dependency_levels, dependency_parents
+
+
+def _srv(name, host, depends_on=None):
+    s = {"name": name, "host": host, "service": "HTTP", "port": 80}
+    if depends_on:
+        s["depends_on"] = depends_on
+    return s
+
+
+class TestDeps(unittest.TestCase):
+    def test_parents_by_name_or_key_and_levels(self):
+        servers = [
+            _srv("app", "10.0.1.5", "switch"),
+            _srv("gw", "10.0.0.1"),
+            _srv("switch", "10.0.1.1", "10.0.0.1:80:HTTP"),
+            _srv("db", "10.0.1.6", "switch"),
+            _srv("orphan", "10.0.2.1", "missing"),
+        ]
+        parents = dependency_parents(servers, server_key)
+        self.assertEqual(parents, {
+            "10.0.1.5:80:HTTP": "10.0.1.1:80:HTTP",
+            "10.0.1.1:80:HTTP": "10.0.0.1:80:HTTP",
+            "10.0.1.6:80:HTTP": "10.0.1.1:80:HTTP",
+        })
+        levels = dependency_levels(servers, parents, server_key)
+        self.assertEqual([[s["name"] for s in lvl] for lvl in levels], [["gw", "orphan"], ["switch"], ["app", "db"]])
+
+    def test_cycles_and_plain_inventories(self):
+        servers = [_srv("a", "h1", "b"), _srv("b", "h2", "a"), _srv("c", "h3", "c")]
+        parents = dependency_parents(servers, server_key)
+        self.assertEqual(parents, {"h1:80:HTTP": "h2:80:HTTP"})
+        self.assertEqual(len(dependency_levels(servers, parents, server_key)), 2)
+        plain = [_srv("x", "h4")]
+        self.assertEqual(dependency_parents(plain, server_key), {})
+        self.assertEqual(dependency_levels(plain, {}, server_key), [plain])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from ets_tm.events import EventLog
+from ets_tm.repo import FileRepository
+from ets_tm.state import StateService
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+
+class TestEventLog(unittest.TestCase):
+    def _state(self, d):
+        repo = FileRepository(
+            os.path.join(d, "servers.txt"),
+            os.path.join(d, "servers.bak"),
+            os.path.join(d, "server_stats.json"),
+            os.path.join(d, "config.json"),
+        )
+        repo.save_servers([
+            {"group": "Web", "name": "a", "host": "a", "service": "HTTP", "port": 80},
+            {"group": "Db", "name": "b", "host": "b", "service": "MySQL", "port": 3306},
+        ])
+        return StateService(repo, {})
+
+    def test_resume_replays_filtered_events_and_transitions(self):
+        async def scenario():
+            with tempfile.TemporaryDirectory() as d:
+                state = self._state(d)
+                await state.load()
+                log = EventLog(state)
+                log.append(state.results.record("a:80:HTTP", 1.0, True, 100.0))
+                log.append(state.results.record("b:3306:MySQL", 2.0, True, 100.0))
+                log.append(state.results.record("a:80:HTTP", None, False, 50.0))
+                stream = log.stream(last_id=2, group="Web", keepalive=0.05)
+                events = [_parse(await stream.__anext__()) for _ in range(2)]
+                self.assertEqual([(i, k) for i, k, _ in events], [("5", "result"), ("6", "transition")])
+                self.assertEqual(events[1][2]["previous"], "UP")
+                log.append(state.results.record("b:3306:MySQL", 3.0, True, 100.0))
+                log.append(state.results.record("a:80:HTTP", 1.0, True, 100.0))
+                _, kind, data = _parse(await stream.__anext__())
+                self.assertEqual((kind, data["key"], data["group"]), ("result", "a:80:HTTP", "Web"))
+                await stream.aclose()
+        asyncio.run(scenario())
+
+    def test_evicted_history_requests_resync(self):
+        async def scenario():
+            with tempfile.TemporaryDirectory() as d:
+                state = self._state(d)
+                await state.load()
+                log = EventLog(state, size=2)
+                for i in range(4):
+                    log.append(state.results.record("a:80:HTTP", float(i), True, 100.0))
+                stream = log.stream(last_id=0, keepalive=0.05)
+                event_id, kind, _ = _parse(await stream.__anext__())
+                self.assertEqual((event_id, kind), (None, "resync"))
+                self.assertEqual(_parse(await stream.__anext__())[0], "4")
+                await stream.aclose()
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from ets_tm.history import HistoryStore, agent_log_row, parse_agent_row, parse_log_row
+
+
+def _row(ts, status, ping):
+    stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%S")
+    return f"{stamp};Web;srv;h;HTTP;80;{status};{ping};100.00\n"
+
+
+class TestHistoryStore(unittest.TestCase):
+    def test_parse_log_row(self):
+        key, ts, up, rtt = parse_log_row(_row(1_700_000_000, "UP", "12.5"))
+        self.assertEqual((key, ts, up, rtt), ("h:80:HTTP", 1_700_000_000, True, 12.5))
+        self.assertIsNone(parse_log_row("date;group;name;host;service;port;status;ping_ms;uptime"))
+        self.assertIsNone(parse_log_row("garbage"))
+
+    def test_agent_row_round_trip(self):
+        line = ";".join(agent_log_row("zone-a", "h:80:HTTP", 1_700_000_000, False, None))
+        self.assertEqual(parse_agent_row(line), ("zone-a/h:80:HTTP", 1_700_000_000, False, None))
+        self.assertIsNone(parse_agent_row("date;agent;key;status;ping"))
+
+    def test_resolution_follows_step_and_response_is_bounded(self):
+        h = HistoryStore(raw_retention=600)
+        base = 1_700_000_000 - 1_700_000_000 % 3600
+        for i in range(0, 7200, 10):
+            h.add("a", base + i, i % 60 != 0, 10.0 + (i % 30))
+        now = base + 7200
+        raw = h.query(["a"], now - 300, now, step=10, now=now)
+        self.assertEqual(raw["resolution"], 0)
+        self.assertEqual(len(raw["points"]), 30)
+        minute = h.query(["a"], base, base + 3600, step=300, now=now)
+        self.assertEqual(minute["resolution"], 60)
+        self.assertEqual(len(minute["points"]), 12)
+        first = minute["points"][0]
+        self.assertEqual((first["up"], first["down"]), (25, 5))
+        self.assertEqual((first["rtt_min"], first["rtt_max"]), (10.0, 30.0))
+        hourly = h.query(["a"], base, base + 7200, step=3600, now=now)
+        self.assertEqual(hourly["resolution"], 3600)
+        self.assertEqual([p["up"] + p["down"] for p in hourly["points"]], [360, 360])
+        capped = h.query(["a"], base, base + 7200, step=1, now=now)
+        self.assertLessEqual(len(capped["points"]), h.max_points)
+
+    def test_summary_from_rollups_covers_logged_servers_only(self):
+        base = 1_700_000_000 - 1_700_000_000 % 3600
+        now = base + 1800
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "monitor.log")
+            with open(path, "w") as f:
+                for k in range(180, -1, -1):
+                    f.write(_row(now - k * 600, "UP" if k % 2 == 0 else "DOWN", "10.0"))
+            h = HistoryStore()
+            h.load_log(path)
+        h.add("agent-1/h:80:HTTP", now, False, None)
+        summary = h.summary(now=now)
+        self.assertEqual(summary["1h"], {"up": 4, "down": 3, "avg_ping": 10.0, "uptime": 4 / 7 * 100.0})
+        self.assertEqual((summary["24h"]["up"], summary["24h"]["down"]), (73, 72))
+        self.assertEqual(h.summary(["agent-1/h:80:HTTP"], now=now)["1h"]["down"], 1)
+
+    def test_tail_reads_only_appended_rows_across_rotation(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "monitor.log")
+            with open(path, "w") as f:
+                f.write("date;group;name;host;service;port;status;ping_ms;uptime\n")
+                f.write(_row(1_700_000_000, "UP", "1.0"))
+            h = HistoryStore()
+            self.assertEqual(h.load_log(path), 1)
+            with open(path, "a") as f:
+                f.write(_row(1_700_000_010, "DOWN", "-"))
+                f.write("2023-11-14T22:13:40;Web;srv")  # partial row
+            self.assertEqual(h.tail_log(path), 1)
+            with open(path, "a") as f:
+                f.write(";h;HTTP;80;UP;2.0;100.00\n")
+            os.replace(path, path + ".1")
+            with open(path, "w") as f:
+                f.write(_row(1_700_000_030, "UP", "3.0"))
+            self.assertEqual(h.tail_log(path), 2)
+            self.assertEqual(h.tail_log(path), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
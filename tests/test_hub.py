@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from ets_tm.hub import BroadcastHub
+from ets_tm.repo import FileRepository
+from ets_tm.state import StateService
+
+
+def _state(d):
+    repo = FileRepository(
+        os.path.join(d, "servers.txt"),
+        os.path.join(d, "servers.bak"),
+        os.path.join(d, "server_stats.json"),
+        os.path.join(d, "config.json"),
+    )
+    return StateService(repo, {"refresh_interval": 2.0})
+
+
+class TestBroadcastHub(unittest.TestCase):
+    def test_snapshot_then_deltas_with_sequence(self):
+        async def scenario():
+            with tempfile.TemporaryDirectory() as d:
+                state = _state(d)
+                await state.load()
+                hub = BroadcastHub(state)
+                q = hub.subscribe()
+                first = json.loads(q.get_nowait().text())
+                self.assertEqual((first["type"], first["seq"]), ("snapshot", 0))
+                self.assertIsNone(hub.poll())
+                state.results.record("a:1:X", 1.0, True, 100.0)
+                state.results.record("b:2:Y", None, False, 0.0)
+                hub.poll()
+                delta = json.loads(q.get_nowait().text())
+                self.assertEqual((delta["type"], delta["seq"]), ("delta", 1))
+                self.assertEqual(sorted(delta["results"]), ["a:1:X", "b:2:Y"])
+                self.assertNotIn("servers", delta)
+                state.results.record("a:1:X", 2.0, True, 100.0)
+                hub.poll()
+                delta = json.loads(q.get_nowait().text())
+                self.assertEqual((delta["seq"], list(delta["results"])), (2, ["a:1:X"]))
+        asyncio.run(scenario())
+
+    def test_slow_client_is_resynced_with_snapshot(self):
+        async def scenario():
+            with tempfile.TemporaryDirectory() as d:
+                state = _state(d)
+                await state.load()
+                hub = BroadcastHub(state, queue_size=2)
+                q = hub.subscribe()
+                for i in range(5):
+                    state.results.record("a:1:X", float(i), True, 100.0)
+                    hub.poll()
+                msgs = [json.loads(q.get_nowait().text()) for _ in range(q.qsize())]
+                self.assertEqual([(m["type"], m["seq"]) for m in msgs], [("snapshot", 4), ("delta", 5)])
+                self.assertEqual(msgs[0]["results"]["a:1:X"]["rtt"], 3.0)
+                self.assertGreater(hub.dropped, 0)
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from ets_tm.background import server_key
+from ets_tm.metrics import ProbeMetrics, RttHistograms, render_prometheus
+from ets_tm.results import ResultStore
+
+
+class TestPrometheusExport(unittest.TestCase):
+    def test_renders_server_series_histograms_and_self_metrics(self):
+        store = ResultStore()
+        rtt = RttHistograms(bounds=(10.0, 100.0))
+        store.subscribe(rtt.observe)
+        store.record("h:80:HTTP", 5.0, True, 100.0, ts=1000.0)
+        store.record("h:80:HTTP", 50.0, True, 100.0, ts=1001.0)
+        store.record("d:22:SSH", None, False, 0.0, ts=1001.0)
+        probe = ProbeMetrics()
+        probe.observe_cycle(0.5, 3)
+        servers = [
+            {"group": "Web", "name": 'say "hi"', "host": "h", "service": "HTTP", "port": 80},
+            {"name": "db", "host": "d", "service": "SSH", "port": 22},
+        ]
+        text = render_prometheus(store, servers, server_key, probe, rtt)
+        lines = text.splitlines()
+        web = 'server="h:80:HTTP",name="say \\"hi\\"",group="Web",service="HTTP"'
+        self.assertIn(f"ets_tm_server_up{{{web}}} 1", lines)
+        self.assertIn(f"ets_tm_server_rtt_ms{{{web}}} 50", lines)
+        self.assertIn(f'ets_tm_server_rtt_histogram_ms_bucket{{{web},le="10"}} 1', lines)
+        self.assertIn(f'ets_tm_server_rtt_histogram_ms_bucket{{{web},le="+Inf"}} 2', lines)
+        self.assertIn('ets_tm_server_up{server="d:22:SSH",name="db",group="",service="SSH"} 0', lines)
+        self.assertFalse(any(x.startswith('ets_tm_server_rtt_ms{server="d:22') for x in lines))
+        self.assertIn("ets_tm_probes_per_second 6", lines)
+        self.assertIn("ets_tm_probe_cycles_total 1", lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import gzip
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ets_tm.remote import RemoteClient, RemoteError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        srv.hits.append(self.path)
+        srv.peers.add(self.client_address)
+        if srv.delay:
+            time.sleep(srv.delay)
+        if self.path == "/missing":
+            self._reply(404, b"{}")
+            return
+        body = json.dumps({"path": self.path, "n": srv.version}).encode()
+        etag = f'"v{srv.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._reply(200, gzip.compress(body), {"ETag": etag, "Content-Encoding": "gzip", "X-Total-Count": "7"})
+
+    def _reply(self, code, body, headers=None):
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestRemoteClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.hits = []
+        self.server.peers = set()
+        self.server.version = 1
+        self.server.delay = 0.0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = RemoteClient(f"http://127.0.0.1:{self.server.server_port}", timeout=0.3, backoff=60.0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive_and_etag_revalidation(self):
+        data, headers = self.client.get("/stats")
+        self.assertEqual(data, {"path": "/stats", "n": 1})
+        self.assertEqual(headers["x-total-count"], "7")
+        # 304: same body, headers of the original response kept.
+        data, headers = self.client.get("/stats")
+        self.assertEqual(data["n"], 1)
+        self.assertEqual(headers["x-total-count"], "7")
+        self.server.version = 2
+        self.assertEqual(self.client.get_json("/stats")["n"], 2)
+        self.assertEqual(len(self.server.peers), 1)
+        # Within max_age nothing goes over the wire.
+        self.client.get("/stats", max_age=10.0)
+        self.assertEqual(len(self.server.hits), 3)
+
+    def test_fetch_many_runs_concurrently(self):
+        self.server.delay = 0.2
+        began = time.monotonic()
+        got = self.client.fetch_many(["/a", "/b", "/c", "/missing"])
+        self.assertLess(time.monotonic() - began, 0.5)
+        self.assertEqual(got["/b"]["path"], "/b")
+        self.assertIsNone(got["/missing"])
+        self.assertTrue(self.client.healthy)
+
+    def test_cached_never_touches_network_and_one_pool_is_shared(self):
+        self.assertIsNone(self.client.cached("/a"))
+        barrier = threading.Barrier(4)
+        pools = []
+
+        def _fetch():
+            barrier.wait()
+            self.client.fetch_many(["/a"])
+            pools.append(self.client._executor)
+
+        threads = [threading.Thread(target=_fetch) for _ in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        self.assertEqual(len(set(map(id, pools))), 1)
+        hits = len(self.server.hits)
+        self.assertEqual(self.client.cached("/a")["path"], "/a")
+        self.assertEqual(len(self.server.hits), hits)
+
+    def test_slow_api_serves_stale_body(self):
+        self.assertEqual(self.client.get_json("/servers")["n"], 1)
+        self.server.delay = 1.0
+        began = time.monotonic()
+        self.assertEqual(self.client.get_json("/servers")["n"], 1)
+        self.assertFalse(self.client.healthy)
+        # Backing off: no new request, cached value served immediately.
+        self.assertEqual(self.client.get_json("/servers")["n"], 1)
+        self.assertLess(time.monotonic() - began, 0.8)
+        with self.assertRaises(RemoteError):
+            self.client.get("/never-fetched")
+
+
+if __name__ == "__main__":
+    unittest.main()
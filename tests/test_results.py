@@ -0,0 +1,30 @@
+import unittest
+from ets_tm.results import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+    def test_record_tracks_transitions_and_p95(self):
+        store = ResultStore(window=20)
+        for i in range(20):
+            store.record("h:80:HTTP", float(i + 1), True, 100.0, ts=100.0 + i)
+        entry = store.get("h:80:HTTP")
+        self.assertEqual(entry["changed_at"], 100.0)
+        self.assertEqual(entry["p95"], 19.0)
+        entry = store.record("h:80:HTTP", None, False, 95.0, ts=200.0)
+        self.assertEqual(entry["status"], "DOWN")
+        self.assertEqual(entry["changed_at"], 200.0)
+
+    def test_listeners_receive_recorded_and_put_entries(self):
+        store = ResultStore()
+        seen = []
+        store.subscribe(seen.append)
+        store.record("a:1:X", 1.0, True, 100.0)
+        store.put({"key": "b:2:Y", "status": "DOWN", "rtt": None, "uptime": 0.0, "checked_at": 5.0})
+        store.unsubscribe(seen.append)
+        store.record("c:3:Z", 1.0, True, 100.0)
+        self.assertEqual([e["key"] for e in seen], ["a:1:X", "b:2:Y"])
+        self.assertEqual(store.get("b:2:Y")["status"], "DOWN")
+
+
+if __name__ == "__main__":
+    unittest.main()
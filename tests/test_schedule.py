@@ -0,0 +1,64 @@
+import unittest
+
+from ets_tm.schedule import FixedRateSchedule
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cycle(sched, clock, duration):
+    clock.now += sched.delay()
+    lateness = sched.begin()
+    clock.now += duration
+    sched.end()
+    return lateness
+
+
+class TestFixedRateSchedule(unittest.TestCase):
+    def test_period_does_not_drift_with_cycle_time(self):
+        clock = _Clock()
+        sched = FixedRateSchedule(10.0, clock=clock)
+        starts = []
+        for _ in range(5):
+            clock.now += sched.delay()
+            starts.append(clock.now)
+            sched.begin()
+            clock.now += 3.0
+            sched.end()
+        self.assertEqual(starts, [100.0, 110.0, 120.0, 130.0, 140.0])
+        self.assertEqual(sched.last_duration, 3.0)
+        self.assertEqual(sched.overruns, 0)
+
+    def test_overrun_policies(self):
+        for policy, expected_next, skipped in (("skip", 130.0, 2), ("catch_up", 110.0, 0), ("stretch", 125.0, 0)):
+            clock = _Clock()
+            sched = FixedRateSchedule(10.0, policy, clock=clock)
+            _cycle(sched, clock, 25.0)
+            self.assertEqual(sched.next_at, expected_next, policy)
+            self.assertEqual((sched.overruns, sched.skipped), (1, skipped), policy)
+            self.assertEqual(sched.begin(), max(0.0, 125.0 - expected_next), policy)
+
+    def test_catch_up_backlog_is_bounded(self):
+        clock = _Clock()
+        sched = FixedRateSchedule(1.0, "catch_up", clock=clock)
+        _cycle(sched, clock, 1000.0)
+        self.assertEqual(sched.next_at, 1100.0 - 10.0)
+
+    def test_trigger_and_unknown_policy(self):
+        clock = _Clock()
+        sched = FixedRateSchedule(10.0, clock=clock)
+        _cycle(sched, clock, 1.0)
+        self.assertEqual(sched.delay(), 9.0)
+        sched.trigger()
+        self.assertEqual(sched.delay(), 0.0)
+        with self.assertRaises(ValueError):
+            FixedRateSchedule(1.0, "later")
+
+
+if __name__ == "__main__":
+    unittest.main()
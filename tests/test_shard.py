@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from ets_tm.background import server_key
+from ets_tm.repo import FileRepository
+from ets_tm.results import ResultStore
+from ets_tm.services import MonitoringService
+from ets_tm.shard import HashRing, ShardedMonitor
+
+
+def _servers(n):
+    return [{"name": f"srv{i}", "host": "127.0.0.1", "group": "General", "service": "Custom Port", "port": 1000 + i} for i in range(n)]
+
+
+class TestHashRing(unittest.TestCase):
+    def test_spreads_keys_and_moves_few_when_workers_change(self):
+        keys = [server_key(s) for s in _servers(2000)]
+        four, five = HashRing(4), HashRing(5)
+        counts = [0] * 4
+        for k in keys:
+            counts[four.node_for(k)] += 1
+        self.assertTrue(all(c > 300 for c in counts))
+        moved = sum(1 for k in keys if four.node_for(k) != five.node_for(k))
+        self.assertLess(moved, len(keys) * 0.35)
+
+
+class TestShardedMonitor(unittest.TestCase):
+    def test_workers_probe_and_supervisor_aggregates(self):
+        with tempfile.TemporaryDirectory() as d:
+            repo = FileRepository(
+                os.path.join(d, "servers.txt"),
+                os.path.join(d, "servers.bak"),
+                os.path.join(d, "server_stats.json"),
+                os.path.join(d, "config.json"),
+            )
+            servers = _servers(12)
+            results = ResultStore()
+            stats = {}
+            mon = ShardedMonitor(
+                repo, MonitoringService(0.05, 0.05, False), os.path.join(d, "monitor.log"),
+                0.5, 4, 1, 0.01, workers=3, results=results, servers_provider=lambda: servers, stats=stats,
+            )
+            try:
+                mon.run_once()
+                self.assertEqual(len(results.snapshot()), 12)
+                self.assertEqual(sum(s["ok"] + s["fail"] for s in stats.values()), 12)
+                before = [list(w.shard) for w in mon._pool]
+                servers.append({"name": "new", "host": "127.0.0.1", "group": "General", "service": "Custom Port", "port": 2000})
+                mon.run_once()
+                after = [w.shard for w in mon._pool]
+                self.assertEqual(sum(1 for a, b in zip(before, after) if a != b), 1)
+                self.assertEqual(len(results.snapshot()), 13)
+            finally:
+                mon.close()
+            self.assertTrue(all(w is None for w in mon._pool))
+            with open(os.path.join(d, "monitor.log"), encoding="utf-8") as f:
+                self.assertEqual(len(f.read().splitlines()), 1 + 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
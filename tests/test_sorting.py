@@ -0,0 +1,61 @@
+import unittest
+from ets_tm.results import ResultStore
+from ets_tm.sorting import SortIndex
+
+
+def server_key(srv):
+    return f"{srv.get('host')}:{srv.get('port')}:{srv.get('service')}"
+
+
+def _servers(n):
+    return [
+        {"name": f"srv{i:03d}", "host": f"10.0.0.{i}", "group": "Web" if i % 2 else "DB", "service": "HTTP", "port": 80}
+        for i in range(n)
+    ]
+
+
+class TestSortIndex(unittest.TestCase):
+    def test_static_page_matches_full_sort(self):
+        servers = _servers(50)
+        idx = SortIndex()
+        page, total = idx.view(servers, "name", True, 0, 5, "General", server_key, inventory_version=1)
+        self.assertEqual(total, 50)
+        expected = sorted(servers, key=lambda s: s["name"], reverse=True)[:5]
+        self.assertEqual(page, expected)
+
+    def test_filters_apply_before_paging(self):
+        servers = _servers(20)
+        idx = SortIndex()
+        page, total = idx.view(servers, "name", False, 0, 100, "General", server_key, filters=("DB", None, None))
+        self.assertEqual(total, 10)
+        self.assertTrue(all(s["group"] == "DB" for s in page))
+
+    def test_live_sort_by_p95_puts_missing_last(self):
+        servers = _servers(30)
+        results = ResultStore()
+        for i, s in enumerate(servers[:10]):
+            results.record(server_key(s), float(i * 10), True, 100.0)
+        idx = SortIndex()
+        page, _ = idx.view(servers, "p95", True, 0, 3, "General", server_key, results=results, inventory_version=1)
+        self.assertEqual([s["name"] for s in page], ["srv009", "srv008", "srv007"])
+        page, _ = idx.view(servers, "ping", False, 8, 12, "General", server_key, results=results, inventory_version=1)
+        self.assertEqual([s["name"] for s in page][:2], ["srv008", "srv009"])
+        self.assertNotIn(server_key(page[2]), results.snapshot())
+
+    def test_live_order_invalidated_by_results(self):
+        servers = _servers(4)
+        results = ResultStore()
+        for s in servers:
+            results.record(server_key(s), 10.0, True, 100.0)
+        idx = SortIndex()
+        results.record(server_key(servers[2]), None, False, 50.0)
+        page, _ = idx.view(servers, "status", True, 0, 1, "General", server_key, results=results, inventory_version=1)
+        self.assertEqual(page[0]["name"], "srv002")
+        results.record(server_key(servers[2]), 10.0, True, 60.0)
+        results.record(server_key(servers[3]), None, False, 50.0)
+        page, _ = idx.view(servers, "status", True, 0, 1, "General", server_key, results=results, inventory_version=1)
+        self.assertEqual(page[0]["name"], "srv003")
+
+
+if __name__ == "__main__":
+    unittest.main()
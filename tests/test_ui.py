@@ -1,5 +1,6 @@
 import unittest
-from ets_tm.ui import build_table
+from ets_tm.results import ResultStore
+from ets_tm.ui import TableRenderer, build_table
 
 
 class DummyState:
@@ -46,26 +47,10 @@ def t(k, **kwargs):
     }.get(k, k)
 
 
-def ping_host(host):
-    return 10.0
-
-
-def check_port(host, port, timeout):
-    return True
-
-
 def server_key(srv):
     return f"{srv.get('host')}:{srv.get('port')}:{srv.get('service')}"
 
 
-def update_and_get_uptime(stats, key, is_up):
-    return 100.0
-
-
-def log_status(srv, is_up, rtt, uptime):
-    pass
-
-
 def get_summary_metrics():
     return {
         "1h": {"up": 1, "down": 0, "avg_ping": 10.0, "uptime": 100.0},
@@ -76,22 +61,15 @@ def get_summary_metrics():
 class TestUI(unittest.TestCase):
     def test_build_table_structure(self):
         servers = [{"name": "srv1", "host": "1.1.1.1", "group": "General", "service": "HTTP", "port": 80}]
-        stats = {}
+        results = ResultStore()
+        results.record(server_key(servers[0]), 10.0, True, 100.0)
         table = build_table(
             servers,
-            stats,
             t,
             DummyState(),
-            ping_host,
-            check_port,
-            1.0,
-            5,
+            results,
             10,
-            2,
-            0.1,
             server_key,
-            update_and_get_uptime,
-            log_status,
             get_summary_metrics,
             "ETS TM",
             "example.com",
@@ -99,6 +77,52 @@ class TestUI(unittest.TestCase):
         self.assertEqual(len(table.columns), 8)
         self.assertGreaterEqual(len(table.rows), 1)
 
+    def test_build_table_renders_without_results(self):
+        servers = [
+            {"name": f"srv{i}", "host": f"10.0.0.{i}", "group": "General", "service": "HTTP", "port": 80}
+            for i in range(30)
+        ]
+        state = DummyState()
+        state.current_page = 2
+        table = build_table(
+            servers,
+            t,
+            state,
+            ResultStore(),
+            10,
+            server_key,
+            get_summary_metrics,
+            "ETS TM",
+            "example.com",
+        )
+        self.assertEqual(len(table.rows), 10)
+        self.assertEqual(state.current_page, 2)
+
+    def test_renderer_rebuilds_only_on_change(self):
+        servers = [
+            {"name": f"srv{i}", "host": f"10.0.0.{i}", "group": "General", "service": "HTTP", "port": 80}
+            for i in range(5)
+        ]
+        results = ResultStore()
+        for s in servers:
+            results.record(server_key(s), 10.0, True, 100.0, ts=1000.0)
+        renderer = TableRenderer(t, server_key, get_summary_metrics, "ETS TM", "example.com")
+        state = DummyState()
+        table1, changed1 = renderer.render(servers, state, results, 10, inventory_version=1, locale="en")
+        table2, changed2 = renderer.render(servers, state, results, 10, inventory_version=1, locale="en")
+        self.assertTrue(changed1)
+        self.assertFalse(changed2)
+        self.assertIs(table1, table2)
+        results.record(server_key(servers[0]), 10.04, True, 100.0, ts=1000.0)
+        _, changed3 = renderer.render(servers, state, results, 10, inventory_version=1, locale="en")
+        self.assertFalse(changed3)
+        results.record(server_key(servers[0]), None, False, 80.0, ts=1000.0)
+        table4, changed4 = renderer.render(servers, state, results, 10, inventory_version=1, locale="en")
+        self.assertTrue(changed4)
+        self.assertEqual(renderer.rebuilds, 2)
+        self.assertEqual(renderer.row_misses, 6)
+        self.assertGreaterEqual(renderer.stats()["avg_render_ms"], 0.0)
+
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()